@@ -0,0 +1,153 @@
+"""
+Load-test the CRUD layer against an in-memory Supabase with injected latency.
+
+Each flow runs as a separate scenario: --users virtual users (asyncio
+tasks) repeat the flow --iterations times on a shared AsyncCRUDService, and
+the report shows throughput, latency percentiles and PostgREST/RPC round
+trips per operation. No Supabase project or network is needed.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_crud --latency 5 --users 20 --iterations 50
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import os
+import time
+from datetime import datetime, timezone, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.async_crud import AsyncCRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.models import (
+    ClientCreate, InvoiceCreate, InvoiceItem, InvoiceStatus, InvoiceUpdate, PaymentCreate, PaymentStatus
+)
+from tests.fake_supabase import AsyncFakeSupabase
+
+
+def make_invoice(rng: random.Random, client_id: str) -> InvoiceCreate:
+    now = datetime.now(timezone.utc)
+    items = [
+        InvoiceItem(description=f"Line {i}", quantity=1, unit_price=price, total=price)
+        for i, price in enumerate(round(rng.uniform(5, 500), 2) for _ in range(rng.randint(1, 8)))
+    ]
+    return InvoiceCreate(
+        client_id=client_id, issue_date=now, due_date=now + timedelta(days=30),
+        items=items, tax_rate=rng.choice([0.0, 0.07, 0.19])
+    )
+
+
+async def seed(crud: AsyncCRUDService, rng: random.Random, clients: int, invoices: int):
+    """Create clients and sent invoices; returns (client ids, invoice ids)."""
+    client_ids = []
+    for i in range(clients):
+        client = await crud.create_client(ClientCreate(name=f"Client {i}", email=f"client{i}@example.com"))
+        client_ids.append(client.id)
+    results = await crud.create_invoices_bulk([make_invoice(rng, rng.choice(client_ids)) for _ in range(invoices)])
+    invoice_ids = [result.invoice.id for result in results if result.success]
+    for invoice_id in invoice_ids:
+        await crud.update_invoice(invoice_id, InvoiceUpdate(status=InvoiceStatus.SENT))
+    return client_ids, invoice_ids
+
+
+def build_flows(crud: AsyncCRUDService, client_ids, invoice_ids):
+    """One coroutine factory per flow; each takes the user's state dict."""
+
+    async def create(state):
+        return await crud.create_invoice(make_invoice(state["rng"], state["rng"].choice(client_ids)))
+
+    async def list_page(state):
+        # Walk the invoice list page by page, restarting at the end
+        page = await crud.get_invoices(limit=50, cursor=state.get("cursor"), keyset=True, count=None, trusted=True)
+        state["cursor"] = page.next_cursor
+        return page
+
+    async def detail(state):
+        return await crud.get_invoice(state["rng"].choice(invoice_ids))
+
+    async def payment(state):
+        state["payments"] = state.get("payments", 0) + 1
+        return await crud.record_payment(PaymentCreate(
+            invoice_id=state["rng"].choice(invoice_ids), amount=1.0,
+            payment_date=datetime.now(timezone.utc), payment_method="card",
+            status=PaymentStatus.COMPLETED, transaction_id=f"{state['user']}-{state['payments']}"
+        ))
+
+    return {"create": create, "list": list_page, "detail": detail, "payment": payment}
+
+
+async def run_scenario(flow, users: int, iterations: int, seed_value: int):
+    """Run one flow with concurrent virtual users; returns (latencies in ms, wall seconds, failures)."""
+    latencies = []
+    failures = 0
+
+    async def user(index: int):
+        nonlocal failures
+        state = {"user": f"u{seed_value}-{index}", "rng": random.Random(seed_value * 1000 + index)}
+        for _ in range(iterations):
+            started = time.perf_counter()
+            result = await flow(state)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if result is None:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(users)))
+    return latencies, time.perf_counter() - started, failures
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+async def run(args):
+    db = AsyncFakeSupabase(latency=args.latency / 1000, jitter=args.jitter / 1000)
+    cache = EntityCache(local=LRUCache(), redis_url=None, enabled=not args.no_cache)
+    crud = AsyncCRUDService(client=db, cache=cache)
+    rng = random.Random(42)
+
+    latency, db.latency = db.latency, 0.0
+    client_ids, invoice_ids = await seed(crud, rng, args.clients, args.invoices)
+    db.latency = latency
+    flows = build_flows(crud, client_ids, invoice_ids)
+
+    print(
+        f"{args.users} users x {args.iterations} iterations, {args.latency:g} ms latency "
+        f"(+{args.jitter:g} jitter), cache {'off' if args.no_cache else 'on'}, "
+        f"{args.clients} clients, {args.invoices} invoices"
+    )
+    print(f"{'flow':<8} {'ops':>6} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'trips/op':>9} {'failed':>7}")
+
+    for seed_value, name in enumerate(args.flows, start=1):
+        db.reset_stats()
+        latencies, elapsed, failures = await run_scenario(flows[name], args.users, args.iterations, seed_value)
+        print(
+            f"{name:<8} {len(latencies):>6} {len(latencies) / elapsed:>9.1f} "
+            f"{percentile(latencies, 0.50):>8.2f} {percentile(latencies, 0.95):>8.2f} "
+            f"{percentile(latencies, 0.99):>8.2f} {db.round_trips / len(latencies):>9.2f} {failures:>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=5.0, help="Milliseconds added to every round trip")
+    parser.add_argument("--jitter", type=float, default=1.0, help="Extra random milliseconds per round trip")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=50, help="Operations per user and flow")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--invoices", type=int, default=500, help="Invoices seeded before the run")
+    parser.add_argument("--flows", nargs="+", default=["create", "list", "detail", "payment"],
+                        choices=["create", "list", "detail", "payment"])
+    parser.add_argument("--no-cache", action="store_true", help="Disable the entity cache")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
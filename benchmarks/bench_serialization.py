@@ -0,0 +1,104 @@
+"""
+Benchmark list-response serialization: validated models vs the trusted fast path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization --rows 100 --items 20
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+import uuid
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.database.models import Invoice, PaginatedResponse
+from src.database.pagination import build_page, row_factory
+from src.utils.responses import FastJSONResponse
+
+
+def make_rows(rows: int, items: int):
+    """Invoice rows shaped like PostgREST output."""
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "invoice_number": f"INV-{index:06d}",
+            "client_id": str(uuid.uuid4()),
+            "client_name": "Acme Corp",
+            "client_email": "billing@acme.example",
+            "issue_date": "2025-01-01T00:00:00+00:00",
+            "due_date": "2025-01-31T00:00:00+00:00",
+            "status": "sent",
+            "subtotal": 1000.0,
+            "tax_rate": 0.2,
+            "tax_amount": 200.0,
+            "discount_amount": 0.0,
+            "total_amount": 1200.0,
+            "amount_paid": 0.0,
+            "items": [
+                {
+                    "description": f"Line item {item}",
+                    "quantity": 2,
+                    "unit_price": 25.0,
+                    "total": 50.0
+                }
+                for item in range(items)
+            ],
+            "notes": None,
+            "terms": "Net 30",
+            "pdf_url": None,
+            "attachment_urls": [],
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "updated_at": "2025-01-01T00:00:00+00:00"
+        }
+        for index in range(rows)
+    ]
+
+
+def validated_path(rows, field) -> bytes:
+    """Current path: build models, validate against response_model, dump to JSON."""
+    page = build_page(rows, row_factory(Invoice), 0, len(rows), total=len(rows))
+    content = asyncio.run(serialize_response(field=field, response_content=page))
+    return JSONResponse(content).body
+
+
+def trusted_path(rows) -> bytes:
+    """Fast path: project rows and render them directly."""
+    page = build_page(rows, row_factory(Invoice, trusted=True), 0, len(rows), total=len(rows), trusted=True)
+    return FastJSONResponse(page).body
+
+
+def measure(label: str, func, iterations: int) -> float:
+    func()  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call_ms = (time.perf_counter() - started) * 1000 / iterations
+    print(f"{label:<12} {per_call_ms:8.3f} ms/page")
+    return per_call_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="Rows per page")
+    parser.add_argument("--items", type=int, default=20, help="Line items per invoice")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    
+    rows = make_rows(args.rows, args.items)
+    field = create_response_field(name="Response", type_=PaginatedResponse)
+    
+    print(f"{args.rows} rows x {args.items} items, {args.iterations} iterations")
+    validated = measure("validated", lambda: validated_path(rows, field), args.iterations)
+    trusted = measure("trusted", lambda: trusted_path(rows), args.iterations)
+    print(f"speedup      {validated / trusted:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark invoice totals: the previous float loop vs the cents engine.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_totals --invoices 5000 --items 10
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.money import calculate_totals, calculate_totals_batch, to_cents
+
+
+def float_loop(invoices):
+    """Totals as computed before the money engine (one invoice at a time)."""
+    results = []
+    for items, tax_rate, discount in invoices:
+        subtotal = sum(item["total"] for item in items)
+        tax_amount = subtotal * tax_rate
+        results.append((subtotal, tax_amount, subtotal + tax_amount - discount))
+    return results
+
+
+def make_invoices(count: int, items: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        (
+            [{"total": round(rng.uniform(0.5, 900), 2)} for _ in range(items)],
+            rng.choice([0.0, 0.07, 0.0825, 0.19, 0.2]),
+            rng.choice([0.0, 0.0, 5.0, 12.5])
+        )
+        for _ in range(count)
+    ]
+
+
+def measure(label: str, func, iterations: int) -> float:
+    func()  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed_ms = (time.perf_counter() - started) * 1000 / iterations
+    print(f"{label:<22} {elapsed_ms:9.2f} ms")
+    return elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--invoices", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=10, help="Line items per invoice")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+    
+    invoices = make_invoices(args.invoices, args.items)
+    print(f"{args.invoices} invoices x {args.items} items, {args.iterations} iterations")
+    
+    measure("float loop", lambda: float_loop(invoices), args.iterations)
+    measure("engine, per invoice", lambda: [calculate_totals(*invoice) for invoice in invoices], args.iterations)
+    
+    measure("engine, batch", lambda: calculate_totals_batch(invoices), args.iterations)
+    
+    # How often the float loop disagrees with the exact totals at cent precision
+    exact = calculate_totals_batch(invoices)
+    drift = sum(
+        1 for (_, _, total), totals in zip(float_loop(invoices), exact)
+        if to_cents(round(total, 2)) != totals.total
+    )
+    print(f"float loop totals off by at least one cent: {drift} of {len(invoices)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,46 @@
 """Database module for E-Invoicing application."""
 
-from .supabase_client import get_supabase_client, supabase, test_connection
+from .supabase_client import (
+    get_supabase_client, get_async_supabase_client, get_service_role_client, get_async_service_role_client,
+    supabase, test_connection,
+    get_client_manager, SupabaseClientManager, close_supabase_clients
+)
 from .storage import get_storage_service, initialize_storage, StorageService
 from .crud import get_crud_service, CRUDService
+from .async_crud import get_async_crud_service, AsyncCRUDService
+from .cache import get_entity_cache, EntityCache, LRUCache
+from .loader import BatchLoader, LoaderScopeMiddleware, loader_scope
+from .health import get_health_monitor, HealthMonitor
+from .overdue import get_overdue_sweeper, OverdueSweeper, OVERDUE_SWEEP_ENABLED
+from .documents import (
+    get_document_renderer, DocumentRenderer, PdfRenderRequest, PdfRenderResult
+)
+from .jobs import get_job_queue, JobQueue, JobWorker, Job, JobStatus, job_task
+from .exports import (
+    get_export_service, ExportService, ExportRequest, ExportJob,
+    ExportFormat, ExportStatus
+)
 from .models import (
     Client, ClientCreate, ClientUpdate, ClientResponse,
     Invoice, InvoiceCreate, InvoiceUpdate, InvoiceResponse,
-    Payment, PaymentCreate, PaymentUpdate,
+    InvoiceBatchCreate, InvoiceBatchResult, InvoiceBatchResponse,
+    Payment, PaymentCreate, PaymentUpdate, PaymentRecordResult,
+    ClientSummary, InvoiceSummary, PaymentSummary,
     InvoiceStatus, PaymentStatus, PaginatedResponse,
-    InvoiceItem
+    InvoiceItem, SearchKind, SearchResult
 )
 
 __all__ = [
     # Supabase client
     "get_supabase_client", 
+    "get_async_supabase_client",
+    "get_service_role_client",
+    "get_async_service_role_client",
     "supabase", 
     "test_connection",
+    "get_client_manager",
+    "SupabaseClientManager",
+    "close_supabase_clients",
     
     # Storage service
     "get_storage_service",
@@ -26,10 +51,57 @@ __all__ = [
     "get_crud_service",
     "CRUDService",
     
+    # Async CRUD service
+    "get_async_crud_service",
+    "AsyncCRUDService",
+    
+    # Entity cache
+    "get_entity_cache",
+    "EntityCache",
+    "LRUCache",
+    
+    # Batched lookups
+    "BatchLoader",
+    "LoaderScopeMiddleware",
+    "loader_scope",
+    
+    # Health monitor
+    "get_health_monitor",
+    "HealthMonitor",
+    
+    # Overdue sweeper
+    "get_overdue_sweeper",
+    "OverdueSweeper",
+    "OVERDUE_SWEEP_ENABLED",
+    
+    # PDF rendering
+    "get_document_renderer",
+    "DocumentRenderer",
+    "PdfRenderRequest",
+    "PdfRenderResult",
+    
+    # Job queue
+    "get_job_queue",
+    "JobQueue",
+    "JobWorker",
+    "Job",
+    "JobStatus",
+    "job_task",
+    
+    # Export service
+    "get_export_service",
+    "ExportService",
+    "ExportRequest",
+    "ExportJob",
+    "ExportFormat",
+    "ExportStatus",
+    
     # Models
     "Client", "ClientCreate", "ClientUpdate", "ClientResponse",
     "Invoice", "InvoiceCreate", "InvoiceUpdate", "InvoiceResponse",
-    "Payment", "PaymentCreate", "PaymentUpdate",
+    "InvoiceBatchCreate", "InvoiceBatchResult", "InvoiceBatchResponse",
+    "Payment", "PaymentCreate", "PaymentUpdate", "PaymentRecordResult",
+    "ClientSummary", "InvoiceSummary", "PaymentSummary",
     "InvoiceStatus", "PaymentStatus", "PaginatedResponse",
-    "InvoiceItem"
+    "InvoiceItem", "SearchKind", "SearchResult"
 ] 
\ No newline at end of file
@@ -0,0 +1,819 @@
+"""Async CRUD operations for E-Invoicing application using Supabase."""
+
+from typing import Optional, List, Dict, Any
+import logging
+from supabase import AsyncClient
+from .supabase_client import get_async_supabase_client, get_async_service_role_client
+from .crud import (
+    build_invoice_response, build_invoice_row, calculate_invoice_totals, _chunked,
+    failed_invoice_batch, plan_invoice_batch, build_chunk_results, imported_invoices_query,
+    build_payment_record_result, build_record_payment_params, build_search_params, build_search_page,
+    INVOICE_BATCH_CHUNK_SIZE, CLIENT_LOOKUP_CHUNK_SIZE
+)
+from .pagination import apply_pagination, build_page, decode_cursor, list_projection, validate_count_mode
+from .cache import EntityCache, get_entity_cache
+from .loader import request_loader, peek_request_loader
+from .money import calculate_totals
+from .models import (
+    Client as ClientModel, ClientCreate, ClientUpdate, ClientResponse,
+    Invoice as InvoiceModel, InvoiceCreate, InvoiceUpdate, InvoiceResponse,
+    Payment as PaymentModel, PaymentCreate, PaymentUpdate,
+    InvoiceStatus, PaymentStatus, PaginatedResponse, InvoiceBatchResult, PaymentRecordResult,
+    ClientSummary, InvoiceSummary, PaymentSummary, SearchKind
+)
+from ..utils.metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+@instrumented("crud")
+class AsyncCRUDService:
+    """
+    Async counterpart of CRUDService.
+    
+    Every query is awaited on the async PostgREST client, so route handlers
+    never block the event loop or hold a threadpool slot for the duration
+    of a round trip. The method surface mirrors CRUDService one-to-one.
+    """
+    
+    def __init__(
+        self,
+        client: AsyncClient,
+        cache: Optional[EntityCache] = None,
+        service_client: Optional[AsyncClient] = None
+    ):
+        """
+        Initialize the async CRUD Service.
+        
+        Args:
+            client: Async Supabase client instance. Use
+                   get_async_crud_service() to get one bound to the shared pool.
+            cache: Optional entity cache. If not provided, will use the
+                   process-wide cache.
+            service_client: Optional client for the RPCs only the service
+                   role may execute (record_payment). Defaults to ``client``.
+        """
+        self.client = client
+        self.service_client = service_client or client
+        self.cache = cache or get_entity_cache()
+        # Concurrent cache misses of one request share one in_() query per entity
+        self._fetchers = {"client": self._fetch_clients, "invoice": self._fetch_invoices}
+    
+    # Client CRUD operations
+    async def create_client(self, client_data: ClientCreate) -> Optional[ClientModel]:
+        """
+        Create a new client.
+        
+        Args:
+            client_data: Client creation data
+        
+        Returns:
+            Created client or None if failed
+        """
+        try:
+            data = client_data.model_dump()
+            
+            response = await self.client.table("clients").insert(data).execute()
+            
+            if response.data:
+                return ClientModel(**response.data[0])
+            
+            logger.error(f"Failed to create client: {response}")
+            return None
+        
+        except Exception as e:
+            logger.error(f"Error creating client: {e}")
+            return None
+    
+    async def get_client(self, client_id: str) -> Optional[ClientResponse]:
+        """
+        Get a client by ID with computed fields.
+        
+        Args:
+            client_id: Client ID
+        
+        Returns:
+            Client with computed fields or None if not found
+        """
+        try:
+            cached = await self.cache.aget("client", client_id, ClientResponse)
+            if cached is not None:
+                return cached
+            
+            row = await self._load("client", client_id)
+            
+            if not row:
+                return None
+            
+            client = ClientResponse(**row)
+            await self.cache.aset("client", client_id, client)
+            
+            return client
+        
+        except Exception as e:
+            logger.error(f"Error getting client {client_id}: {e}")
+            return None
+    
+    async def get_clients(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True,
+        cursor: Optional[str] = None,
+        keyset: bool = False,
+        count: Optional[str] = "exact",
+        trusted: bool = False,
+        fields: Optional[str] = None
+    ) -> PaginatedResponse:
+        """
+        Get paginated list of clients.
+        
+        Args:
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            active_only: Whether to return only active clients
+            cursor: Cursor from a previous page; switches to keyset pagination
+            keyset: Page on (created_at, id) instead of offsets
+            count: Total count mode ("exact", "planned", "estimated") or None to skip it
+            trusted: Return rows as plain dicts without per-row validation
+            fields: "summary" or comma-separated columns to select instead of all
+        
+        Returns:
+            Paginated response with clients
+        
+        Raises:
+            ValueError: If the cursor, count mode or fields are invalid
+        """
+        validate_count_mode(count)
+        columns, item_factory = list_projection(ClientModel, ClientSummary, fields, trusted)
+        if cursor:
+            decode_cursor(cursor)
+        
+        try:
+            query = self.client.table("clients").select(columns, count=count)
+            
+            if active_only:
+                query = query.eq("is_active", True)
+            
+            query = apply_pagination(query, skip, limit, cursor, keyset)
+            
+            response = await query.execute()
+            
+            return build_page(
+                response.data or [],
+                item_factory,
+                skip,
+                limit,
+                total=response.count if count else None,
+                cursor=cursor,
+                keyset=keyset,
+                trusted=trusted
+            )
+        
+        except Exception as e:
+            logger.error(f"Error getting clients: {e}")
+            return PaginatedResponse(items=[], total=0, page=1, per_page=limit, pages=0)
+    
+    async def update_client(
+        self,
+        client_id: str,
+        client_data: ClientUpdate
+    ) -> Optional[ClientModel]:
+        """
+        Update a client.
+        
+        Args:
+            client_id: Client ID
+            client_data: Client update data
+        
+        Returns:
+            Updated client or None if failed
+        """
+        try:
+            data = {k: v for k, v in client_data.model_dump().items() if v is not None}
+            
+            if not data:
+                return await self.get_client(client_id)
+            
+            response = await self.client.table("clients").update(data).eq("id", client_id).execute()
+            await self._invalidate("client", client_id)
+            
+            if response.data:
+                return ClientModel(**response.data[0])
+            
+            logger.error(f"Failed to update client {client_id}: {response}")
+            return None
+        
+        except Exception as e:
+            logger.error(f"Error updating client {client_id}: {e}")
+            return None
+    
+    async def delete_client(self, client_id: str) -> bool:
+        """
+        Delete a client (soft delete by setting is_active to False).
+        
+        Args:
+            client_id: Client ID
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            response = await self.client.table("clients").update(
+                {"is_active": False}
+            ).eq("id", client_id).execute()
+            await self._invalidate("client", client_id)
+            
+            return bool(response.data)
+        
+        except Exception as e:
+            logger.error(f"Error deleting client {client_id}: {e}")
+            return False
+    
+    # Invoice CRUD operations
+    async def create_invoice(self, invoice_data: InvoiceCreate) -> Optional[InvoiceModel]:
+        """
+        Create a new invoice.
+        
+        Args:
+            invoice_data: Invoice creation data
+        
+        Returns:
+            Created invoice or None if failed
+        """
+        try:
+            client = await self.get_client(invoice_data.client_id)
+            if not client:
+                logger.error(f"Client {invoice_data.client_id} not found")
+                return None
+            
+            totals = calculate_invoice_totals([invoice_data])[0]
+            
+            data = build_invoice_row(invoice_data, {"name": client.name, "email": client.email}, totals)
+            
+            response = await self.client.table("invoices").insert(data).execute()
+            
+            if response.data:
+                await self._invalidate("client", invoice_data.client_id)
+                return InvoiceModel(**response.data[0])
+            
+            logger.error(f"Failed to create invoice: {response}")
+            return None
+        
+        except Exception as e:
+            logger.error(f"Error creating invoice: {e}")
+            return None
+    
+    async def create_invoices_bulk(
+        self,
+        invoices: List[InvoiceCreate],
+        chunk_size: int = INVOICE_BATCH_CHUNK_SIZE,
+        import_id: Optional[str] = None
+    ) -> List[InvoiceBatchResult]:
+        """
+        Create many invoices with batched lookups and inserts.
+        
+        See CRUDService.create_invoices_bulk for the batching strategy and
+        the idempotency key.
+        
+        Args:
+            invoices: Invoice creation data
+            chunk_size: Maximum number of rows per insert request
+            import_id: Optional idempotency key (UUID) of the import
+            
+        Returns:
+            One result per input invoice, in input order
+        """
+        try:
+            clients = await self._get_clients_by_id({invoice.client_id for invoice in invoices})
+        except Exception as e:
+            logger.error(f"Error resolving clients for invoice batch: {e}")
+            return failed_invoice_batch(len(invoices), "Failed to resolve clients")
+        
+        try:
+            imported = await self._get_imported_invoices(import_id) if import_id else {}
+        except Exception as e:
+            logger.error(f"Error loading invoices of import {import_id}: {e}")
+            return failed_invoice_batch(len(invoices), "Failed to load imported invoices")
+        
+        results, rows = plan_invoice_batch(invoices, clients, imported, import_id)
+        for chunk in _chunked(list(rows), max(1, chunk_size)):
+            for index, outcome in (await self._insert_invoice_chunk(chunk, rows)).items():
+                results[index] = outcome
+        
+        if rows:
+            await self._invalidate("client", *{invoices[index].client_id for index in rows})
+        
+        return results
+    
+    async def get_invoice(self, invoice_id: str) -> Optional[InvoiceResponse]:
+        """
+        Get an invoice by ID with computed fields.
+        
+        Args:
+            invoice_id: Invoice ID
+        
+        Returns:
+            Invoice with computed fields or None if not found
+        """
+        try:
+            cached = await self.cache.aget("invoice", invoice_id, InvoiceResponse)
+            if cached is not None:
+                return cached
+            
+            row = await self._load("invoice", invoice_id)
+            
+            if not row:
+                return None
+            
+            invoice = build_invoice_response(row)
+            await self.cache.aset("invoice", invoice_id, invoice)
+            
+            return invoice
+        
+        except Exception as e:
+            logger.error(f"Error getting invoice {invoice_id}: {e}")
+            return None
+    
+    async def get_invoices(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        client_id: Optional[str] = None,
+        status: Optional[InvoiceStatus] = None,
+        cursor: Optional[str] = None,
+        keyset: bool = False,
+        count: Optional[str] = "exact",
+        trusted: bool = False,
+        fields: Optional[str] = None
+    ) -> PaginatedResponse:
+        """
+        Get paginated list of invoices.
+        
+        Args:
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            client_id: Filter by client ID
+            status: Filter by invoice status
+            cursor: Cursor from a previous page; switches to keyset pagination
+            keyset: Page on (created_at, id) instead of offsets
+            count: Total count mode ("exact", "planned", "estimated") or None to skip it
+            trusted: Return rows as plain dicts without per-row validation
+            fields: "summary" or comma-separated columns to select instead of all
+        
+        Returns:
+            Paginated response with invoices
+        
+        Raises:
+            ValueError: If the cursor, count mode or fields are invalid
+        """
+        validate_count_mode(count)
+        columns, item_factory = list_projection(InvoiceModel, InvoiceSummary, fields, trusted)
+        if cursor:
+            decode_cursor(cursor)
+        
+        try:
+            query = self.client.table("invoices").select(columns, count=count)
+            
+            if client_id:
+                query = query.eq("client_id", client_id)
+            
+            if status:
+                query = query.eq("status", status.value)
+            
+            query = apply_pagination(query, skip, limit, cursor, keyset)
+            
+            response = await query.execute()
+            
+            return build_page(
+                response.data or [],
+                item_factory,
+                skip,
+                limit,
+                total=response.count if count else None,
+                cursor=cursor,
+                keyset=keyset,
+                trusted=trusted
+            )
+        
+        except Exception as e:
+            logger.error(f"Error getting invoices: {e}")
+            return PaginatedResponse(items=[], total=0, page=1, per_page=limit, pages=0)
+    
+    async def update_invoice(
+        self,
+        invoice_id: str,
+        invoice_data: InvoiceUpdate
+    ) -> Optional[InvoiceModel]:
+        """
+        Update an invoice.
+        
+        Args:
+            invoice_id: Invoice ID
+            invoice_data: Invoice update data
+        
+        Returns:
+            Updated invoice or None if failed
+        """
+        try:
+            data = {k: v for k, v in invoice_data.model_dump().items() if v is not None}
+            
+            if not data:
+                current = await self.get_invoice(invoice_id)
+                return InvoiceModel(**current.model_dump()) if current else None
+            
+            # Recalculate financial fields if items, tax rate or discount changed
+            if {"items", "tax_rate", "discount_amount"} & data.keys():
+                missing = [
+                    column for column in ("items", "tax_rate", "discount_amount")
+                    if column not in data
+                ]
+                current = {}
+                if missing:
+                    current_response = await self.client.table("invoices").select(
+                        ", ".join(missing)
+                    ).eq("id", invoice_id).execute()
+                    if current_response.data:
+                        current = current_response.data[0]
+                
+                totals = calculate_totals(
+                    invoice_data.items if invoice_data.items is not None else current.get("items") or [],
+                    data.get("tax_rate", current.get("tax_rate")),
+                    data.get("discount_amount", current.get("discount_amount"))
+                )
+                data.update(totals.as_columns())
+            
+            response = await self.client.table("invoices").update(data).eq("id", invoice_id).execute()
+            await self._invalidate("invoice", invoice_id)
+            
+            if response.data:
+                await self._invalidate("client", response.data[0].get("client_id"))
+                return InvoiceModel(**response.data[0])
+            
+            logger.error(f"Failed to update invoice {invoice_id}: {response}")
+            return None
+        
+        except Exception as e:
+            logger.error(f"Error updating invoice {invoice_id}: {e}")
+            return None
+    
+    async def delete_invoice(self, invoice_id: str) -> bool:
+        """
+        Delete an invoice.
+        
+        Args:
+            invoice_id: Invoice ID
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            response = await self.client.table("invoices").delete().eq("id", invoice_id).execute()
+            await self._invalidate("invoice", invoice_id)
+            if response.data:
+                await self._invalidate("client", response.data[0].get("client_id"))
+            return bool(response.data)
+        
+        except Exception as e:
+            logger.error(f"Error deleting invoice {invoice_id}: {e}")
+            return False
+    
+    # Payment CRUD operations
+    async def create_payment(self, payment_data: PaymentCreate) -> Optional[PaymentModel]:
+        """
+        Create a new payment.
+        
+        Args:
+            payment_data: Payment creation data
+            
+        Returns:
+            Created (or already recorded) payment or None if failed
+        """
+        result = await self.record_payment(payment_data)
+        return result.payment if result else None
+    
+    async def record_payment(self, payment_data: PaymentCreate) -> Optional[PaymentRecordResult]:
+        """
+        Record a payment and apply it to its invoice in one transaction.
+        
+        Runs the ``record_payment`` RPC, which inserts the payment, updates
+        the invoice totals and paid status, and returns both rows in a single
+        round trip. A payment whose ``transaction_id`` was already recorded is
+        returned unchanged with ``created=False``.
+        
+        Args:
+            payment_data: Payment creation data
+            
+        Returns:
+            Payment, updated invoice and whether the payment is new, or None if failed
+        """
+        try:
+            response = await self.service_client.rpc(
+                "record_payment",
+                build_record_payment_params(payment_data)
+            ).execute()
+            
+            if not response.data:
+                logger.error(f"Failed to record payment: {response}")
+                return None
+            
+            result = build_payment_record_result(response.data)
+            if result.created:
+                self._forget("invoice", result.invoice.id)
+                await self.cache.aset("invoice", result.invoice.id, result.invoice)
+                await self._invalidate("client", result.invoice.client_id)
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error recording payment for invoice {payment_data.invoice_id}: {e}")
+            return None
+    
+    async def get_payment(self, payment_id: str) -> Optional[PaymentModel]:
+        """
+        Get a payment by ID.
+        
+        Args:
+            payment_id: Payment ID
+        
+        Returns:
+            Payment or None if not found
+        """
+        try:
+            response = await self.client.table("payments").select("*").eq("id", payment_id).execute()
+            
+            if response.data:
+                return PaymentModel(**response.data[0])
+            
+            return None
+        
+        except Exception as e:
+            logger.error(f"Error getting payment {payment_id}: {e}")
+            return None
+    
+    async def get_payments(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        invoice_id: Optional[str] = None,
+        status: Optional[PaymentStatus] = None,
+        cursor: Optional[str] = None,
+        keyset: bool = False,
+        count: Optional[str] = "exact",
+        trusted: bool = False,
+        fields: Optional[str] = None
+    ) -> PaginatedResponse:
+        """
+        Get paginated list of payments.
+        
+        Args:
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            invoice_id: Filter by invoice ID
+            status: Filter by payment status
+            cursor: Cursor from a previous page; switches to keyset pagination
+            keyset: Page on (created_at, id) instead of offsets
+            count: Total count mode ("exact", "planned", "estimated") or None to skip it
+            trusted: Return rows as plain dicts without per-row validation
+            fields: "summary" or comma-separated columns to select instead of all
+        
+        Returns:
+            Paginated response with payments
+        
+        Raises:
+            ValueError: If the cursor, count mode or fields are invalid
+        """
+        validate_count_mode(count)
+        columns, item_factory = list_projection(PaymentModel, PaymentSummary, fields, trusted)
+        if cursor:
+            decode_cursor(cursor)
+        
+        try:
+            query = self.client.table("payments").select(columns, count=count)
+            
+            if invoice_id:
+                query = query.eq("invoice_id", invoice_id)
+            
+            if status:
+                query = query.eq("status", status.value)
+            
+            query = apply_pagination(query, skip, limit, cursor, keyset)
+            
+            response = await query.execute()
+            
+            return build_page(
+                response.data or [],
+                item_factory,
+                skip,
+                limit,
+                total=response.count if count else None,
+                cursor=cursor,
+                keyset=keyset,
+                trusted=trusted
+            )
+        
+        except Exception as e:
+            logger.error(f"Error getting payments: {e}")
+            return PaginatedResponse(items=[], total=0, page=1, per_page=limit, pages=0)
+    
+    async def update_payment(
+        self,
+        payment_id: str,
+        payment_data: PaymentUpdate
+    ) -> Optional[PaymentModel]:
+        """
+        Update a payment.
+        
+        Args:
+            payment_id: Payment ID
+            payment_data: Payment update data
+        
+        Returns:
+            Updated payment or None if failed
+        """
+        try:
+            data = {k: v for k, v in payment_data.model_dump().items() if v is not None}
+            
+            if not data:
+                return await self.get_payment(payment_id)
+            
+            response = await self.client.table("payments").update(data).eq("id", payment_id).execute()
+            
+            if response.data:
+                await self._invalidate_payment_targets(response.data[0].get("invoice_id"))
+                return PaymentModel(**response.data[0])
+            
+            logger.error(f"Failed to update payment {payment_id}: {response}")
+            return None
+        
+        except Exception as e:
+            logger.error(f"Error updating payment {payment_id}: {e}")
+            return None
+    
+    async def delete_payment(self, payment_id: str) -> bool:
+        """
+        Delete a payment.
+        
+        Args:
+            payment_id: Payment ID
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            response = await self.client.table("payments").delete().eq("id", payment_id).execute()
+            if response.data:
+                await self._invalidate_payment_targets(response.data[0].get("invoice_id"))
+            return bool(response.data)
+        
+        except Exception as e:
+            logger.error(f"Error deleting payment {payment_id}: {e}")
+            return False
+    
+    # Search
+    async def search(
+        self,
+        query: str,
+        kind: Optional[SearchKind] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> PaginatedResponse:
+        """
+        Search clients and invoices, best matches first.
+        
+        Args:
+            query: Search text
+            kind: Restrict results to clients or invoices
+            skip: Number of results to skip
+            limit: Maximum number of results to return
+        
+        Returns:
+            Paginated response with SearchResult items
+        
+        Raises:
+            ValueError: If the query is too short to search
+        """
+        params = build_search_params(query, kind, skip, limit)
+        
+        try:
+            response = await self.client.rpc("search_records", params).execute()
+            return build_search_page(response.data or [], skip, limit)
+        
+        except Exception as e:
+            logger.error(f"Error searching for {query!r}: {e}")
+            return PaginatedResponse(items=[], total=0, page=1, per_page=limit, pages=0)
+    
+    # Helper methods
+    async def _fetch_clients(self, client_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Batch fetch for the client loader."""
+        response = await self.client.table("clients").select("*").in_("id", client_ids).execute()
+        return {row["id"]: row for row in response.data or []}
+    
+    async def _fetch_invoices(self, invoice_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Batch fetch for the invoice loader."""
+        response = await self.client.table("invoices").select("*").in_("id", invoice_ids).execute()
+        return {row["id"]: row for row in response.data or []}
+    
+    async def _load(self, entity: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Load one row through the request's batch loader, or directly outside a request."""
+        fetch = self._fetchers[entity]
+        loader = request_loader(self, entity, fetch, max_batch_size=CLIENT_LOOKUP_CHUNK_SIZE)
+        if loader is None:
+            return (await fetch([entity_id])).get(entity_id)
+        return await loader.load(entity_id)
+    
+    def _forget(self, entity: str, *entity_ids: Optional[str]) -> None:
+        """Detach the request's in-flight loads of rows after a write."""
+        loader = peek_request_loader(self, entity)
+        if loader is not None:
+            loader.forget(*entity_ids)
+    
+    async def _invalidate(self, entity: str, *entity_ids: Optional[str]) -> None:
+        """Drop cached rows and detach in-flight loads of them after a write."""
+        self._forget(entity, *entity_ids)
+        await self.cache.ainvalidate(entity, *entity_ids)
+    
+    async def _get_clients_by_id(self, client_ids: set) -> Dict[str, Dict[str, Any]]:
+        """Fetch id, name and email for many clients keyed by client ID."""
+        clients = {}
+        for chunk in _chunked(sorted(client_ids), CLIENT_LOOKUP_CHUNK_SIZE):
+            response = await self.client.table("clients").select(
+                "id, name, email"
+            ).in_("id", chunk).execute()
+            clients.update({row["id"]: row for row in response.data or []})
+        return clients
+    
+    async def _get_imported_invoices(self, import_id: str) -> Dict[int, Dict[str, Any]]:
+        """Fetch the invoices created under an import key, keyed by input index."""
+        rows: Dict[int, Dict[str, Any]] = {}
+        while True:
+            response = await imported_invoices_query(self.client.table("invoices"), import_id, len(rows)).execute()
+            rows.update({row["import_index"]: row for row in response.data or []})
+            if len(response.data or []) < INVOICE_BATCH_CHUNK_SIZE:
+                return rows
+    
+    async def _insert_invoice_chunk(
+        self,
+        indexes: List[int],
+        rows: Dict[int, Dict[str, Any]]
+    ) -> Dict[int, InvoiceBatchResult]:
+        """Insert one chunk of invoice rows, isolating failures per row."""
+        error = "Insert failed"
+        try:
+            response = await self.client.table("invoices").insert([rows[index] for index in indexes]).execute()
+            outcomes = build_chunk_results(indexes, response.data)
+            if outcomes is not None:
+                return outcomes
+            logger.error(f"Unexpected response inserting invoice chunk: {response}")
+        except Exception as e:
+            error = str(e)
+            if len(indexes) > 1:
+                logger.warning(f"Invoice chunk insert failed, retrying row by row: {e}")
+        
+        if len(indexes) == 1:
+            return {indexes[0]: InvoiceBatchResult(index=indexes[0], success=False, error=error)}
+        
+        outcomes = {}
+        for index in indexes:
+            outcomes.update(await self._insert_invoice_chunk([index], rows))
+        return outcomes
+    
+    async def _invalidate_payment_targets(self, invoice_id: Optional[str]) -> None:
+        """Drop the cached invoice of a payment and the invoice's client (see CRUDService)."""
+        if not invoice_id:
+            return
+        invoice = await self.cache.aget("invoice", invoice_id, InvoiceResponse)
+        await self._invalidate("invoice", invoice_id)
+        client_id = invoice.client_id if invoice else None
+        if client_id is None:
+            try:
+                response = await self.client.table("invoices").select("client_id").eq("id", invoice_id).execute()
+                client_id = response.data[0]["client_id"] if response.data else None
+            except Exception as e:
+                logger.warning(f"Could not resolve the client of invoice {invoice_id}: {e}")
+        if client_id:
+            await self._invalidate("client", client_id)
+
+
+# Global async CRUD service instance
+async_crud_service: Optional[AsyncCRUDService] = None
+
+
+async def get_async_crud_service() -> AsyncCRUDService:
+    """
+    Get or create the global async CRUD service instance.
+    
+    Intended to be used as a FastAPI dependency:
+    ``crud: AsyncCRUDService = Depends(get_async_crud_service)``.
+    
+    Returns:
+        AsyncCRUDService: CRUD service bound to the shared async client
+    """
+    global async_crud_service
+    
+    if async_crud_service is None:
+        async_crud_service = AsyncCRUDService(
+            await get_async_supabase_client(),
+            service_client=await get_async_service_role_client()
+        )
+    
+    return async_crud_service
@@ -0,0 +1,307 @@
+"""Two-tier read-through cache for E-Invoicing entities."""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Type, TypeVar
+from pydantic import BaseModel
+import redis
+import redis.asyncio as aioredis
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_LOCAL_MAX_SIZE: int = int(os.getenv("CACHE_LOCAL_MAX_SIZE", "2048"))
+CACHE_LOCAL_TTL: float = float(os.getenv("CACHE_LOCAL_TTL", "30"))
+CACHE_REDIS_TTL: int = int(os.getenv("CACHE_REDIS_TTL", "300"))
+CACHE_NAMESPACE: str = os.getenv("CACHE_NAMESPACE", "einv")
+REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# After a Redis error the shared tier is skipped for this long
+REDIS_RETRY_AFTER_SECONDS = 30.0
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class LRUCache:
+    """Bounded, thread-safe in-process LRU cache with a per-entry TTL."""
+    
+    def __init__(self, max_size: int = CACHE_LOCAL_MAX_SIZE, ttl: float = CACHE_LOCAL_TTL):
+        """
+        Initialize the LRU cache.
+        
+        Args:
+            max_size: Maximum number of entries kept in memory
+            ttl: Seconds an entry stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: str) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: str) -> None:
+        """Remove a value if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all values."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EntityCache:
+    """
+    Read-through cache for single entities keyed by entity type and id.
+    
+    Lookups go to the in-process LRU first and then to Redis; misses are
+    filled by the caller. The local tier uses a short TTL because other
+    replicas cannot invalidate it, while Redis entries are invalidated
+    explicitly on writes. Redis errors never fail a read: the shared tier
+    is skipped for a while and the cache degrades to local-only.
+    """
+    
+    def __init__(
+        self,
+        local: Optional[LRUCache] = None,
+        redis_url: Optional[str] = REDIS_URL,
+        redis_ttl: int = CACHE_REDIS_TTL,
+        namespace: str = CACHE_NAMESPACE,
+        enabled: bool = CACHE_ENABLED
+    ):
+        """
+        Initialize the entity cache.
+        
+        Args:
+            local: Optional in-process LRU. If not provided, one is created
+                  from the CACHE_LOCAL_* settings.
+            redis_url: Redis URL for the shared tier, or None to disable it
+            redis_ttl: Seconds an entry stays in Redis
+            namespace: Prefix for all cache keys
+            enabled: Whether caching is enabled at all
+        """
+        self.local = local or LRUCache()
+        self.redis_url = redis_url
+        self.redis_ttl = redis_ttl
+        self.namespace = namespace
+        self.enabled = enabled
+        self._redis: Optional[redis.Redis] = None
+        self._async_redis: Optional[aioredis.Redis] = None
+        self._redis_retry_at = 0.0
+        self._counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "redis_errors": 0,
+        }
+    
+    def key(self, entity: str, entity_id: str) -> str:
+        """Build the cache key for an entity."""
+        return f"{self.namespace}:{entity}:{entity_id}"
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters.
+        
+        Returns:
+            Dict with counters, hit ratio and local cache size
+        """
+        lookups = self._counters["local_hits"] + self._counters["redis_hits"] + self._counters["misses"]
+        hits = self._counters["local_hits"] + self._counters["redis_hits"]
+        return {
+            **self._counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_size": len(self.local),
+            "redis_available": self._redis_available(),
+        }
+    
+    # Sync API (CRUDService)
+    def get(self, entity: str, entity_id: str, model: Type[ModelT]) -> Optional[ModelT]:
+        """
+        Look up an entity in the local tier and then in Redis.
+        
+        Args:
+            entity: Entity type, e.g. "client"
+            entity_id: Entity ID
+            model: Pydantic model to deserialize into
+        
+        Returns:
+            Cached model or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        key = self.key(entity, entity_id)
+        cached = self._get_local(key)
+        if cached is None and self._redis_available():
+            try:
+                cached = self._sync_redis().get(key)
+                if cached is not None:
+                    self._counters["redis_hits"] += 1
+                    self.local.set(key, cached)
+            except Exception as e:
+                self._redis_failed(e)
+        
+        return self._load(cached, model)
+    
+    def set(self, entity: str, entity_id: str, value: BaseModel) -> None:
+        """Store an entity in both tiers."""
+        if not self.enabled:
+            return
+        
+        key = self.key(entity, entity_id)
+        payload = value.model_dump_json()
+        self.local.set(key, payload)
+        if self._redis_available():
+            try:
+                self._sync_redis().set(key, payload, ex=self.redis_ttl)
+            except Exception as e:
+                self._redis_failed(e)
+    
+    def invalidate(self, entity: str, *entity_ids: Optional[str]) -> None:
+        """Drop entities from both tiers."""
+        keys = self._invalidate_local(entity, entity_ids)
+        if keys and self._redis_available():
+            try:
+                self._sync_redis().delete(*keys)
+            except Exception as e:
+                self._redis_failed(e)
+    
+    # Async API (AsyncCRUDService)
+    async def aget(self, entity: str, entity_id: str, model: Type[ModelT]) -> Optional[ModelT]:
+        """Async variant of get()."""
+        if not self.enabled:
+            return None
+        
+        key = self.key(entity, entity_id)
+        cached = self._get_local(key)
+        if cached is None and self._redis_available():
+            try:
+                cached = await self._async_redis_client().get(key)
+                if cached is not None:
+                    self._counters["redis_hits"] += 1
+                    self.local.set(key, cached)
+            except Exception as e:
+                self._redis_failed(e)
+        
+        return self._load(cached, model)
+    
+    async def aset(self, entity: str, entity_id: str, value: BaseModel) -> None:
+        """Async variant of set()."""
+        if not self.enabled:
+            return
+        
+        key = self.key(entity, entity_id)
+        payload = value.model_dump_json()
+        self.local.set(key, payload)
+        if self._redis_available():
+            try:
+                await self._async_redis_client().set(key, payload, ex=self.redis_ttl)
+            except Exception as e:
+                self._redis_failed(e)
+    
+    async def ainvalidate(self, entity: str, *entity_ids: Optional[str]) -> None:
+        """Async variant of invalidate()."""
+        keys = self._invalidate_local(entity, entity_ids)
+        if keys and self._redis_available():
+            try:
+                await self._async_redis_client().delete(*keys)
+            except Exception as e:
+                self._redis_failed(e)
+    
+    # Helper methods
+    def _get_local(self, key: str) -> Optional[str]:
+        cached = self.local.get(key)
+        if cached is not None:
+            self._counters["local_hits"] += 1
+        return cached
+    
+    def _load(self, cached: Optional[str], model: Type[ModelT]) -> Optional[ModelT]:
+        if cached is None:
+            self._counters["misses"] += 1
+            return None
+        return model.model_validate_json(cached)
+    
+    def _invalidate_local(self, entity: str, entity_ids) -> list:
+        keys = [self.key(entity, entity_id) for entity_id in entity_ids if entity_id]
+        for key in keys:
+            self.local.delete(key)
+        self._counters["invalidations"] += len(keys)
+        return keys
+    
+    def _redis_available(self) -> bool:
+        return bool(self.redis_url) and time.monotonic() >= self._redis_retry_at
+    
+    def _redis_failed(self, error: Exception) -> None:
+        self._counters["redis_errors"] += 1
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+        logger.warning(f"Redis cache tier unavailable, using local cache only: {error}")
+    
+    def _sync_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=0.25,
+                socket_timeout=0.25
+            )
+        return self._redis
+    
+    def _async_redis_client(self) -> aioredis.Redis:
+        if self._async_redis is None:
+            self._async_redis = aioredis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=0.25,
+                socket_timeout=0.25
+            )
+        return self._async_redis
+
+
+# Global entity cache instance
+entity_cache: Optional[EntityCache] = None
+
+
+def get_entity_cache() -> EntityCache:
+    """
+    Get or create the global entity cache instance.
+    
+    Returns:
+        EntityCache: Cache shared by the CRUD services of this process
+    """
+    global entity_cache
+    
+    if entity_cache is None:
+        entity_cache = EntityCache()
+    
+    return entity_cache
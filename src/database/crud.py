@@ -1,31 +1,264 @@
 """CRUD operations for E-Invoicing application using Supabase."""
 
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple
 from datetime import datetime
 import logging
 from supabase import Client
-from .supabase_client import get_supabase_client
+import os
+from .supabase_client import get_supabase_client, get_service_role_client
+from .pagination import apply_pagination, build_page, decode_cursor, list_projection, validate_count_mode
+from .cache import EntityCache, get_entity_cache
+from .money import calculate_totals, calculate_totals_batch
 from .models import (
     Client as ClientModel, ClientCreate, ClientUpdate, ClientResponse,
     Invoice as InvoiceModel, InvoiceCreate, InvoiceUpdate, InvoiceResponse,
     Payment as PaymentModel, PaymentCreate, PaymentUpdate,
-    InvoiceStatus, PaymentStatus, PaginatedResponse
+    InvoiceStatus, PaymentStatus, PaginatedResponse, InvoiceBatchResult, PaymentRecordResult,
+    ClientSummary, InvoiceSummary, PaymentSummary, SearchKind, SearchResult
 )
+from ..utils.metrics import instrumented
 
 logger = logging.getLogger(__name__)
 
+# Bulk operation tuning
+INVOICE_BATCH_CHUNK_SIZE: int = int(os.getenv("INVOICE_BATCH_CHUNK_SIZE", "500"))
+CLIENT_LOOKUP_CHUNK_SIZE = 200  # keeps in_() filters well below URL length limits
+SEARCH_MIN_QUERY_LENGTH = 2  # enforced by search_records() as well
+
+
+def build_invoice_response(invoice_dict: Dict[str, Any]) -> InvoiceResponse:
+    """
+    Build an invoice response from an ``invoices`` row.
+    
+    Args:
+        invoice_dict: Invoice row including the trigger-maintained ``amount_paid``
+        
+    Returns:
+        Invoice with amount due and payment status filled in
+    """
+    amount_paid = float(invoice_dict.get("amount_paid") or 0)
+    total_amount = float(invoice_dict.get("total_amount", 0))
+    amount_due = max(0, total_amount - amount_paid)
+    
+    # Determine payment status
+    payment_status = PaymentStatus.PENDING
+    if amount_paid >= total_amount:
+        payment_status = PaymentStatus.COMPLETED
+    elif amount_paid > 0:
+        payment_status = PaymentStatus.PENDING  # Partially paid
+    
+    invoice_dict.update({
+        "payment_status": payment_status,
+        "amount_paid": amount_paid,
+        "amount_due": amount_due
+    })
+    
+    return InvoiceResponse(**invoice_dict)
+
+
+def build_record_payment_params(payment_data: PaymentCreate) -> Dict[str, Any]:
+    """Map a payment creation request onto the ``record_payment`` RPC arguments."""
+    return {
+        "p_invoice_id": payment_data.invoice_id,
+        "p_amount": payment_data.amount,
+        "p_payment_date": payment_data.payment_date.isoformat(),
+        "p_payment_method": payment_data.payment_method,
+        "p_status": payment_data.status.value,
+        "p_transaction_id": payment_data.transaction_id,
+        "p_notes": payment_data.notes
+    }
+
+
+def build_search_params(query: str, kind: Optional[SearchKind], skip: int, limit: int) -> Dict[str, Any]:
+    """
+    Map a search request onto the ``search_records`` RPC arguments.
+    
+    Raises:
+        ValueError: If the query is too short to search
+    """
+    query = query.strip()
+    if len(query) < SEARCH_MIN_QUERY_LENGTH:
+        raise ValueError(f"Search query must be at least {SEARCH_MIN_QUERY_LENGTH} characters")
+    return {
+        "p_query": query,
+        "p_kind": kind.value if kind else None,
+        "p_limit": limit,
+        "p_offset": skip
+    }
+
+
+def build_search_page(rows: List[Dict[str, Any]], skip: int, limit: int) -> PaginatedResponse:
+    """Build a page of search results; every row carries the total match count."""
+    # A page past the last match has no row to read the total from
+    total = rows[0]["total_count"] if rows else (0 if skip == 0 else None)
+    return build_page(rows, lambda row: SearchResult(**row), skip, limit, total=total)
+
+
+def build_payment_record_result(data: Dict[str, Any]) -> PaymentRecordResult:
+    """Build a payment record result from the ``record_payment`` RPC response."""
+    return PaymentRecordResult(
+        payment=PaymentModel(**data["payment"]),
+        invoice=build_invoice_response(data["invoice"]),
+        created=data["created"]
+    )
+
+
+def calculate_invoice_totals(invoices: List[InvoiceCreate]) -> List[Dict[str, float]]:
+    """
+    Compute subtotal, tax and total amounts for a batch of invoices.
+    
+    Args:
+        invoices: Invoice creation data
+        
+    Returns:
+        One dict with subtotal, tax_amount and total_amount per invoice
+    """
+    totals = calculate_totals_batch([
+        (invoice.items, invoice.tax_rate, invoice.discount_amount)
+        for invoice in invoices
+    ])
+    return [invoice_totals.as_columns() for invoice_totals in totals]
+
+
+def build_invoice_row(
+    invoice_data: InvoiceCreate,
+    client: Dict[str, Any],
+    totals: Dict[str, float]
+) -> Dict[str, Any]:
+    """
+    Build the ``invoices`` row for a new invoice.
+    
+    The row has no ``invoice_number``: the database assigns the next number
+    of the issue year on insert (see 005_create_invoice_number_counters.sql).
+    
+    Args:
+        invoice_data: Invoice creation data
+        client: Client row (or dict) providing name and email for denormalization
+        totals: Financial fields from calculate_invoice_totals()
+        
+    Returns:
+        Row ready to be inserted
+    """
+    data = invoice_data.model_dump()
+    data.update(totals)
+    data.update({
+        "client_name": client.get("name"),
+        "client_email": client.get("email"),
+        "items": [item.model_dump() for item in invoice_data.items],
+        # Convert datetime objects to ISO format strings
+        "issue_date": invoice_data.issue_date.isoformat(),
+        "due_date": invoice_data.due_date.isoformat()
+    })
+    return data
+
+
+def failed_invoice_batch(count: int, error: str) -> List[InvoiceBatchResult]:
+    """Results for a batch of ``count`` invoices that failed as a whole."""
+    return [InvoiceBatchResult(index=index, success=False, error=error) for index in range(count)]
+
+
+def plan_invoice_batch(
+    invoices: List[InvoiceCreate],
+    clients: Dict[str, Dict[str, Any]],
+    imported: Dict[int, Dict[str, Any]],
+    import_id: Optional[str] = None
+) -> Tuple[List[Optional[InvoiceBatchResult]], Dict[int, Dict[str, Any]]]:
+    """
+    Split a bulk create into known results and rows still to be inserted.
+    
+    Invoices an earlier run of the import already created are successes and
+    invoices of unknown clients are failures. Every other invoice gets a row,
+    tagged with the import key and its input index when there is one.
+    
+    Args:
+        invoices: Invoice creation data
+        clients: Referenced clients keyed by ID (see _get_clients_by_id())
+        imported: Rows already created under ``import_id``, keyed by input index
+        import_id: Optional idempotency key of the import
+        
+    Returns:
+        Tuple of (results in input order, None where a row must be inserted;
+        rows to insert keyed by input index, in input order)
+    """
+    results: List[Optional[InvoiceBatchResult]] = [None] * len(invoices)
+    for index, row in imported.items():
+        if index < len(invoices):
+            results[index] = InvoiceBatchResult(index=index, success=True, invoice=InvoiceModel(**row))
+    
+    # Only invoices with a known client are inserted
+    pending = []
+    for index, invoice in enumerate(invoices):
+        if results[index] is not None:
+            continue
+        if invoice.client_id in clients:
+            pending.append(index)
+        else:
+            results[index] = InvoiceBatchResult(
+                index=index, success=False, error=f"Client {invoice.client_id} not found"
+            )
+    
+    totals = calculate_invoice_totals([invoices[index] for index in pending])
+    rows = {
+        index: build_invoice_row(invoices[index], clients[invoices[index].client_id], total)
+        for index, total in zip(pending, totals)
+    }
+    if import_id:
+        for index, row in rows.items():
+            row.update({"import_id": import_id, "import_index": index})
+    
+    return results, rows
+
+
+def build_chunk_results(
+    indexes: List[int],
+    data: Optional[List[Dict[str, Any]]]
+) -> Optional[Dict[int, InvoiceBatchResult]]:
+    """Results of an inserted chunk, or None if the response does not cover every row."""
+    if not data or len(data) != len(indexes):
+        return None
+    return {
+        index: InvoiceBatchResult(index=index, success=True, invoice=InvoiceModel(**row))
+        for index, row in zip(indexes, data)
+    }
+
+
+def imported_invoices_query(query, import_id: str, offset: int):
+    """Page of the invoices created under an import key, in input order."""
+    return query.select("*").eq("import_id", import_id).order("import_index").range(
+        offset, offset + INVOICE_BATCH_CHUNK_SIZE - 1
+    )
+
+
+def _chunked(values: List[Any], size: int) -> List[List[Any]]:
+    """Split a list into consecutive chunks of at most ``size`` elements."""
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+@instrumented("crud")
 class CRUDService:
     """Service class for CRUD operations using Supabase."""
     
-    def __init__(self, client: Optional[Client] = None):
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        cache: Optional[EntityCache] = None,
+        service_client: Optional[Client] = None
+    ):
         """
         Initialize the CRUD Service.
         
         Args:
             client: Optional Supabase client instance. If not provided, 
                    will use the default client.
+            cache: Optional entity cache. If not provided, will use the
+                   process-wide cache.
+            service_client: Optional client for the RPCs only the service
+                   role may execute (record_payment). Defaults to ``client``
+                   when one is given, else to the service role client.
         """
         self.client = client or get_supabase_client()
+        self.service_client = service_client or client
+        self.cache = cache or get_entity_cache()
     
     # Client CRUD operations
     def create_client(self, client_data: ClientCreate) -> Optional[ClientModel]:
@@ -67,33 +300,20 @@ class CRUDService:
             Client with computed fields or None if not found
         """
         try:
-            # Get client data
+            cached = self.cache.get("client", client_id, ClientResponse)
+            if cached is not None:
+                return cached
+            
+            # Computed fields are trigger-maintained columns on the client row
             response = self.client.table("clients").select("*").eq("id", client_id).execute()
             
             if not response.data:
                 return None
             
-            client_dict = response.data[0]
-            
-            # Get computed fields (total invoices and amount due)
-            invoice_stats = self.client.table("invoices").select(
-                "id, total_amount, status"
-            ).eq("client_id", client_id).execute()
-            
-            total_invoices = len(invoice_stats.data) if invoice_stats.data else 0
-            total_amount_due = sum(
-                float(inv.get("total_amount", 0)) 
-                for inv in invoice_stats.data or []
-                if inv.get("status") in ["sent", "overdue"]
-            )
-            
-            # Create response model
-            client_dict.update({
-                "total_invoices": total_invoices,
-                "total_amount_due": total_amount_due
-            })
+            client = ClientResponse(**response.data[0])
+            self.cache.set("client", client_id, client)
             
-            return ClientResponse(**client_dict)
+            return client
             
         except Exception as e:
             logger.error(f"Error getting client {client_id}: {e}")
@@ -103,7 +323,12 @@ class CRUDService:
         self, 
         skip: int = 0, 
         limit: int = 100,
-        active_only: bool = True
+        active_only: bool = True,
+        cursor: Optional[str] = None,
+        keyset: bool = False,
+        count: Optional[str] = "exact",
+        trusted: bool = False,
+        fields: Optional[str] = None
     ) -> PaginatedResponse:
         """
         Get paginated list of clients.
@@ -112,31 +337,44 @@ class CRUDService:
             skip: Number of records to skip
             limit: Maximum number of records to return
             active_only: Whether to return only active clients
+            cursor: Cursor from a previous page; switches to keyset pagination
+            keyset: Page on (created_at, id) instead of offsets
+            count: Total count mode ("exact", "planned", "estimated") or None to skip it
+            trusted: Return rows as plain dicts without per-row validation
+            fields: "summary" or comma-separated columns to select instead of all
             
         Returns:
             Paginated response with clients
+            
+        Raises:
+            ValueError: If the cursor, count mode or fields are invalid
         """
+        validate_count_mode(count)
+        columns, item_factory = list_projection(ClientModel, ClientSummary, fields, trusted)
+        if cursor:
+            decode_cursor(cursor)
+        
         try:
             # Build query
-            query = self.client.table("clients").select("*", count="exact")
+            query = self.client.table("clients").select(columns, count=count)
             
             if active_only:
                 query = query.eq("is_active", True)
             
             # Apply pagination
-            query = query.range(skip, skip + limit - 1).order("created_at", desc=True)
+            query = apply_pagination(query, skip, limit, cursor, keyset)
             
             response = query.execute()
             
-            clients = [ClientModel(**client) for client in response.data or []]
-            total = response.count or 0
-            
-            return PaginatedResponse(
-                items=clients,
-                total=total,
-                page=(skip // limit) + 1,
-                per_page=limit,
-                pages=(total + limit - 1) // limit
+            return build_page(
+                response.data or [],
+                item_factory,
+                skip,
+                limit,
+                total=response.count if count else None,
+                cursor=cursor,
+                keyset=keyset,
+                trusted=trusted
             )
             
         except Exception as e:
@@ -168,6 +406,7 @@ class CRUDService:
             
             # Update in database
             response = self.client.table("clients").update(data).eq("id", client_id).execute()
+            self.cache.invalidate("client", client_id)
             
             if response.data:
                 client_dict = response.data[0]
@@ -194,6 +433,7 @@ class CRUDService:
             response = self.client.table("clients").update(
                 {"is_active": False}
             ).eq("id", client_id).execute()
+            self.cache.invalidate("client", client_id)
             
             return bool(response.data)
             
@@ -220,33 +460,16 @@ class CRUDService:
                 return None
             
             # Calculate financial fields
-            subtotal = sum(item.total for item in invoice_data.items)
-            tax_amount = subtotal * invoice_data.tax_rate
-            total_amount = subtotal + tax_amount - invoice_data.discount_amount
-            
-            # Generate invoice number (simple implementation)
-            count_response = self.client.table("invoices").select("id", count="exact").execute()
-            invoice_number = f"INV-{(count_response.count or 0) + 1:06d}"
-            
-            # Prepare data with proper datetime serialization
-            data = invoice_data.model_dump()
-            data.update({
-                "invoice_number": invoice_number,
-                "client_name": client.name,
-                "client_email": client.email,
-                "subtotal": subtotal,
-                "tax_amount": tax_amount,
-                "total_amount": total_amount,
-                "items": [item.model_dump() for item in invoice_data.items],
-                # Convert datetime objects to ISO format strings
-                "issue_date": invoice_data.issue_date.isoformat(),
-                "due_date": invoice_data.due_date.isoformat()
-            })
+            totals = calculate_invoice_totals([invoice_data])[0]
             
-            # Insert into database
+            data = build_invoice_row(invoice_data, {"name": client.name, "email": client.email}, totals)
+            
+            # Insert into database; the invoice number is assigned by a trigger
             response = self.client.table("invoices").insert(data).execute()
             
             if response.data:
+                # Invoice count of the client changed
+                self.cache.invalidate("client", invoice_data.client_id)
                 invoice_dict = response.data[0]
                 return InvoiceModel(**invoice_dict)
             
@@ -257,6 +480,56 @@ class CRUDService:
             logger.error(f"Error creating invoice: {e}")
             return None
     
+    def create_invoices_bulk(
+        self,
+        invoices: List[InvoiceCreate],
+        chunk_size: int = INVOICE_BATCH_CHUNK_SIZE,
+        import_id: Optional[str] = None
+    ) -> List[InvoiceBatchResult]:
+        """
+        Create many invoices with batched lookups and inserts.
+        
+        Referenced clients are resolved with in_() queries and rows are
+        inserted ``chunk_size`` at a time; the database numbers them in input
+        order. A failing chunk is retried row by row so one bad invoice does
+        not abort the rest of the batch.
+        
+        With an ``import_id`` every row is tagged with the key and its input
+        index, which are unique together in the database. Invoices an earlier
+        run already created under the same key are returned as they are, so
+        running the same import again (e.g. a retried job) neither duplicates
+        them nor numbers them again.
+        
+        Args:
+            invoices: Invoice creation data
+            chunk_size: Maximum number of rows per insert request
+            import_id: Optional idempotency key (UUID) of the import
+            
+        Returns:
+            One result per input invoice, in input order
+        """
+        try:
+            clients = self._get_clients_by_id({invoice.client_id for invoice in invoices})
+        except Exception as e:
+            logger.error(f"Error resolving clients for invoice batch: {e}")
+            return failed_invoice_batch(len(invoices), "Failed to resolve clients")
+        
+        try:
+            imported = self._get_imported_invoices(import_id) if import_id else {}
+        except Exception as e:
+            logger.error(f"Error loading invoices of import {import_id}: {e}")
+            return failed_invoice_batch(len(invoices), "Failed to load imported invoices")
+        
+        results, rows = plan_invoice_batch(invoices, clients, imported, import_id)
+        for chunk in _chunked(list(rows), max(1, chunk_size)):
+            for index, outcome in self._insert_invoice_chunk(chunk, rows).items():
+                results[index] = outcome
+        
+        if rows:
+            self.cache.invalidate("client", *{invoices[index].client_id for index in rows})
+        
+        return results
+    
     def get_invoice(self, invoice_id: str) -> Optional[InvoiceResponse]:
         """
         Get an invoice by ID with computed fields.
@@ -268,44 +541,20 @@ class CRUDService:
             Invoice with computed fields or None if not found
         """
         try:
-            # Get invoice data
+            cached = self.cache.get("invoice", invoice_id, InvoiceResponse)
+            if cached is not None:
+                return cached
+            
+            # amount_paid is a trigger-maintained column on the invoice row
             response = self.client.table("invoices").select("*").eq("id", invoice_id).execute()
             
             if not response.data:
                 return None
             
-            invoice_dict = response.data[0]
-            
-            # Get payment information
-            payments_response = self.client.table("payments").select(
-                "amount, status"
-            ).eq("invoice_id", invoice_id).execute()
-            
-            payments = payments_response.data or []
-            amount_paid = sum(
-                float(payment.get("amount", 0)) 
-                for payment in payments 
-                if payment.get("status") == "completed"
-            )
-            
-            total_amount = float(invoice_dict.get("total_amount", 0))
-            amount_due = max(0, total_amount - amount_paid)
+            invoice = build_invoice_response(response.data[0])
+            self.cache.set("invoice", invoice_id, invoice)
             
-            # Determine payment status
-            payment_status = PaymentStatus.PENDING
-            if amount_paid >= total_amount:
-                payment_status = PaymentStatus.COMPLETED
-            elif amount_paid > 0:
-                payment_status = PaymentStatus.PENDING  # Partially paid
-            
-            # Create response model
-            invoice_dict.update({
-                "payment_status": payment_status,
-                "amount_paid": amount_paid,
-                "amount_due": amount_due
-            })
-            
-            return InvoiceResponse(**invoice_dict)
+            return invoice
             
         except Exception as e:
             logger.error(f"Error getting invoice {invoice_id}: {e}")
@@ -316,7 +565,12 @@ class CRUDService:
         skip: int = 0,
         limit: int = 100,
         client_id: Optional[str] = None,
-        status: Optional[InvoiceStatus] = None
+        status: Optional[InvoiceStatus] = None,
+        cursor: Optional[str] = None,
+        keyset: bool = False,
+        count: Optional[str] = "exact",
+        trusted: bool = False,
+        fields: Optional[str] = None
     ) -> PaginatedResponse:
         """
         Get paginated list of invoices.
@@ -326,13 +580,26 @@ class CRUDService:
             limit: Maximum number of records to return
             client_id: Filter by client ID
             status: Filter by invoice status
+            cursor: Cursor from a previous page; switches to keyset pagination
+            keyset: Page on (created_at, id) instead of offsets
+            count: Total count mode ("exact", "planned", "estimated") or None to skip it
+            trusted: Return rows as plain dicts without per-row validation
+            fields: "summary" or comma-separated columns to select instead of all
             
         Returns:
             Paginated response with invoices
+            
+        Raises:
+            ValueError: If the cursor, count mode or fields are invalid
         """
+        validate_count_mode(count)
+        columns, item_factory = list_projection(InvoiceModel, InvoiceSummary, fields, trusted)
+        if cursor:
+            decode_cursor(cursor)
+        
         try:
             # Build query
-            query = self.client.table("invoices").select("*", count="exact")
+            query = self.client.table("invoices").select(columns, count=count)
             
             if client_id:
                 query = query.eq("client_id", client_id)
@@ -341,19 +608,19 @@ class CRUDService:
                 query = query.eq("status", status.value)
             
             # Apply pagination
-            query = query.range(skip, skip + limit - 1).order("created_at", desc=True)
+            query = apply_pagination(query, skip, limit, cursor, keyset)
             
             response = query.execute()
             
-            invoices = [InvoiceModel(**invoice) for invoice in response.data or []]
-            total = response.count or 0
-            
-            return PaginatedResponse(
-                items=invoices,
-                total=total,
-                page=(skip // limit) + 1,
-                per_page=limit,
-                pages=(total + limit - 1) // limit
+            return build_page(
+                response.data or [],
+                item_factory,
+                skip,
+                limit,
+                total=response.count if count else None,
+                cursor=cursor,
+                keyset=keyset,
+                trusted=trusted
             )
             
         except Exception as e:
@@ -384,34 +651,35 @@ class CRUDService:
                 current = self.get_invoice(invoice_id)
                 return InvoiceModel(**current.model_dump()) if current else None
             
-            # Recalculate financial fields if items changed
-            if "items" in data:
-                items = data["items"]
-                subtotal = sum(item["total"] for item in items)
-                
-                # Get current tax rate if not provided
-                if "tax_rate" not in data:
-                    current_response = self.client.table("invoices").select("tax_rate").eq("id", invoice_id).execute()
+            # Recalculate financial fields if items, tax rate or discount changed
+            if {"items", "tax_rate", "discount_amount"} & data.keys():
+                missing = [
+                    column for column in ("items", "tax_rate", "discount_amount")
+                    if column not in data
+                ]
+                current = {}
+                if missing:
+                    current_response = self.client.table("invoices").select(
+                        ", ".join(missing)
+                    ).eq("id", invoice_id).execute()
                     if current_response.data:
-                        data["tax_rate"] = current_response.data[0]["tax_rate"]
-                
-                tax_rate = data.get("tax_rate", 0)
-                discount_amount = data.get("discount_amount", 0)
-                
-                tax_amount = subtotal * tax_rate
-                total_amount = subtotal + tax_amount - discount_amount
+                        current = current_response.data[0]
                 
-                data.update({
-                    "subtotal": subtotal,
-                    "tax_amount": tax_amount,
-                    "total_amount": total_amount
-                })
+                totals = calculate_totals(
+                    invoice_data.items if invoice_data.items is not None else current.get("items") or [],
+                    data.get("tax_rate", current.get("tax_rate")),
+                    data.get("discount_amount", current.get("discount_amount"))
+                )
+                data.update(totals.as_columns())
             
             # Update in database
             response = self.client.table("invoices").update(data).eq("id", invoice_id).execute()
+            self.cache.invalidate("invoice", invoice_id)
             
             if response.data:
                 invoice_dict = response.data[0]
+                # Status and totals feed the client's amount due
+                self.cache.invalidate("client", invoice_dict.get("client_id"))
                 return InvoiceModel(**invoice_dict)
             
             logger.error(f"Failed to update invoice {invoice_id}: {response}")
@@ -433,6 +701,9 @@ class CRUDService:
         """
         try:
             response = self.client.table("invoices").delete().eq("id", invoice_id).execute()
+            self.cache.invalidate("invoice", invoice_id)
+            if response.data:
+                self.cache.invalidate("client", response.data[0].get("client_id"))
             return bool(response.data)
             
         except Exception as e:
@@ -448,41 +719,45 @@ class CRUDService:
             payment_data: Payment creation data
             
         Returns:
-            Created payment or None if failed
+            Created (or already recorded) payment or None if failed
+        """
+        result = self.record_payment(payment_data)
+        return result.payment if result else None
+    
+    def record_payment(self, payment_data: PaymentCreate) -> Optional[PaymentRecordResult]:
+        """
+        Record a payment and apply it to its invoice in one transaction.
+        
+        Runs the ``record_payment`` RPC, which inserts the payment, updates
+        the invoice totals and paid status, and returns both rows in a single
+        round trip. A payment whose ``transaction_id`` was already recorded is
+        returned unchanged with ``created=False``.
+        
+        Args:
+            payment_data: Payment creation data
+            
+        Returns:
+            Payment, updated invoice and whether the payment is new, or None if failed
         """
         try:
-            # Verify invoice exists
-            invoice = self.get_invoice(payment_data.invoice_id)
-            if not invoice:
-                logger.error(f"Invoice {payment_data.invoice_id} not found")
+            response = self._get_service_client().rpc(
+                "record_payment",
+                build_record_payment_params(payment_data)
+            ).execute()
+            
+            if not response.data:
+                logger.error(f"Failed to record payment: {response}")
                 return None
             
-            # Convert Pydantic model to dict with proper datetime serialization
-            data = payment_data.model_dump()
-            # Convert datetime to ISO format string
-            data["payment_date"] = payment_data.payment_date.isoformat()
+            result = build_payment_record_result(response.data)
+            if result.created:
+                self.cache.set("invoice", result.invoice.id, result.invoice)
+                self.cache.invalidate("client", result.invoice.client_id)
             
-            # Insert into database
-            response = self.client.table("payments").insert(data).execute()
-            
-            if response.data:
-                payment_dict = response.data[0]
-                
-                # Update invoice status if fully paid
-                total_paid = self._calculate_total_payments(payment_data.invoice_id)
-                if total_paid >= invoice.total_amount:
-                    self.update_invoice(
-                        payment_data.invoice_id,
-                        InvoiceUpdate(status=InvoiceStatus.PAID)
-                    )
-                
-                return PaymentModel(**payment_dict)
-            
-            logger.error(f"Failed to create payment: {response}")
-            return None
+            return result
             
         except Exception as e:
-            logger.error(f"Error creating payment: {e}")
+            logger.error(f"Error recording payment for invoice {payment_data.invoice_id}: {e}")
             return None
     
     def get_payment(self, payment_id: str) -> Optional[PaymentModel]:
@@ -513,7 +788,12 @@ class CRUDService:
         skip: int = 0,
         limit: int = 100,
         invoice_id: Optional[str] = None,
-        status: Optional[PaymentStatus] = None
+        status: Optional[PaymentStatus] = None,
+        cursor: Optional[str] = None,
+        keyset: bool = False,
+        count: Optional[str] = "exact",
+        trusted: bool = False,
+        fields: Optional[str] = None
     ) -> PaginatedResponse:
         """
         Get paginated list of payments.
@@ -523,13 +803,26 @@ class CRUDService:
             limit: Maximum number of records to return
             invoice_id: Filter by invoice ID
             status: Filter by payment status
+            cursor: Cursor from a previous page; switches to keyset pagination
+            keyset: Page on (created_at, id) instead of offsets
+            count: Total count mode ("exact", "planned", "estimated") or None to skip it
+            trusted: Return rows as plain dicts without per-row validation
+            fields: "summary" or comma-separated columns to select instead of all
             
         Returns:
             Paginated response with payments
+            
+        Raises:
+            ValueError: If the cursor, count mode or fields are invalid
         """
+        validate_count_mode(count)
+        columns, item_factory = list_projection(PaymentModel, PaymentSummary, fields, trusted)
+        if cursor:
+            decode_cursor(cursor)
+        
         try:
             # Build query
-            query = self.client.table("payments").select("*", count="exact")
+            query = self.client.table("payments").select(columns, count=count)
             
             if invoice_id:
                 query = query.eq("invoice_id", invoice_id)
@@ -538,19 +831,19 @@ class CRUDService:
                 query = query.eq("status", status.value)
             
             # Apply pagination
-            query = query.range(skip, skip + limit - 1).order("created_at", desc=True)
+            query = apply_pagination(query, skip, limit, cursor, keyset)
             
             response = query.execute()
             
-            payments = [PaymentModel(**payment) for payment in response.data or []]
-            total = response.count or 0
-            
-            return PaginatedResponse(
-                items=payments,
-                total=total,
-                page=(skip // limit) + 1,
-                per_page=limit,
-                pages=(total + limit - 1) // limit
+            return build_page(
+                response.data or [],
+                item_factory,
+                skip,
+                limit,
+                total=response.count if count else None,
+                cursor=cursor,
+                keyset=keyset,
+                trusted=trusted
             )
             
         except Exception as e:
@@ -585,6 +878,7 @@ class CRUDService:
             
             if response.data:
                 payment_dict = response.data[0]
+                self._invalidate_payment_targets(payment_dict.get("invoice_id"))
                 return PaymentModel(**payment_dict)
             
             logger.error(f"Failed to update payment {payment_id}: {response}")
@@ -606,25 +900,123 @@ class CRUDService:
         """
         try:
             response = self.client.table("payments").delete().eq("id", payment_id).execute()
+            if response.data:
+                self._invalidate_payment_targets(response.data[0].get("invoice_id"))
             return bool(response.data)
             
         except Exception as e:
             logger.error(f"Error deleting payment {payment_id}: {e}")
             return False
     
+    # Search
+    def search(
+        self,
+        query: str,
+        kind: Optional[SearchKind] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> PaginatedResponse:
+        """
+        Search clients and invoices, best matches first.
+        
+        Matches whole words in client names, emails and tax IDs, invoice
+        numbers, notes and line-item descriptions, and partial or misspelled
+        names, emails, tax IDs and invoice numbers (see 009_create_search_indexes.sql).
+        
+        Args:
+            query: Search text
+            kind: Restrict results to clients or invoices
+            skip: Number of results to skip
+            limit: Maximum number of results to return
+        
+        Returns:
+            Paginated response with SearchResult items
+        
+        Raises:
+            ValueError: If the query is too short to search
+        """
+        params = build_search_params(query, kind, skip, limit)
+        
+        try:
+            response = self.client.rpc("search_records", params).execute()
+            return build_search_page(response.data or [], skip, limit)
+        
+        except Exception as e:
+            logger.error(f"Error searching for {query!r}: {e}")
+            return PaginatedResponse(items=[], total=0, page=1, per_page=limit, pages=0)
+    
     # Helper methods
-    def _calculate_total_payments(self, invoice_id: str) -> float:
-        """Calculate total completed payments for an invoice."""
+    def _get_service_client(self) -> Client:
+        if self.service_client is None:
+            self.service_client = get_service_role_client()
+        return self.service_client
+    
+    def _get_clients_by_id(self, client_ids: set) -> Dict[str, Dict[str, Any]]:
+        """Fetch id, name and email for many clients keyed by client ID."""
+        clients = {}
+        for chunk in _chunked(sorted(client_ids), CLIENT_LOOKUP_CHUNK_SIZE):
+            response = self.client.table("clients").select(
+                "id, name, email"
+            ).in_("id", chunk).execute()
+            clients.update({row["id"]: row for row in response.data or []})
+        return clients
+    
+    def _get_imported_invoices(self, import_id: str) -> Dict[int, Dict[str, Any]]:
+        """Fetch the invoices created under an import key, keyed by input index."""
+        rows: Dict[int, Dict[str, Any]] = {}
+        while True:
+            response = imported_invoices_query(self.client.table("invoices"), import_id, len(rows)).execute()
+            rows.update({row["import_index"]: row for row in response.data or []})
+            if len(response.data or []) < INVOICE_BATCH_CHUNK_SIZE:
+                return rows
+    
+    def _insert_invoice_chunk(
+        self,
+        indexes: List[int],
+        rows: Dict[int, Dict[str, Any]]
+    ) -> Dict[int, InvoiceBatchResult]:
+        """Insert one chunk of invoice rows, isolating failures per row."""
+        error = "Insert failed"
         try:
-            response = self.client.table("payments").select("amount").eq(
-                "invoice_id", invoice_id
-            ).eq("status", "completed").execute()
-            
-            return sum(float(payment.get("amount", 0)) for payment in response.data or [])
-            
+            response = self.client.table("invoices").insert([rows[index] for index in indexes]).execute()
+            outcomes = build_chunk_results(indexes, response.data)
+            if outcomes is not None:
+                return outcomes
+            logger.error(f"Unexpected response inserting invoice chunk: {response}")
         except Exception as e:
-            logger.error(f"Error calculating total payments for invoice {invoice_id}: {e}")
-            return 0.0
+            error = str(e)
+            if len(indexes) > 1:
+                logger.warning(f"Invoice chunk insert failed, retrying row by row: {e}")
+        
+        if len(indexes) == 1:
+            return {indexes[0]: InvoiceBatchResult(index=indexes[0], success=False, error=error)}
+        
+        outcomes = {}
+        for index in indexes:
+            outcomes.update(self._insert_invoice_chunk([index], rows))
+        return outcomes
+    
+    def _invalidate_payment_targets(self, invoice_id: Optional[str]) -> None:
+        """
+        Drop the cached invoice of a payment and the invoice's client.
+        
+        Both carry trigger-maintained totals (amount_paid, total_amount_due).
+        The client id comes from the cached invoice or, when the invoice is
+        not cached, from a lookup by primary key.
+        """
+        if not invoice_id:
+            return
+        invoice = self.cache.get("invoice", invoice_id, InvoiceResponse)
+        self.cache.invalidate("invoice", invoice_id)
+        client_id = invoice.client_id if invoice else None
+        if client_id is None:
+            try:
+                response = self.client.table("invoices").select("client_id").eq("id", invoice_id).execute()
+                client_id = response.data[0]["client_id"] if response.data else None
+            except Exception as e:
+                logger.warning(f"Could not resolve the client of invoice {invoice_id}: {e}")
+        if client_id:
+            self.cache.invalidate("client", client_id)
 
 
 # Global CRUD service instance
@@ -0,0 +1,444 @@
+"""PDF invoice rendering for E-Invoicing application."""
+
+import os
+import io
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
+from pydantic import BaseModel, Field
+from jinja2.sandbox import SandboxedEnvironment
+from supabase import Client
+from .supabase_client import get_supabase_client
+from .storage import StorageService, get_storage_service, STORAGE_BATCH_CONCURRENCY
+from .crud import CRUDService, get_crud_service, _chunked, CLIENT_LOOKUP_CHUNK_SIZE
+from .cache import LRUCache
+from .models import InvoiceUpdate
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Renderer configuration
+PDF_RENDER_WORKERS: int = int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+PDF_DEFAULT_TEMPLATE: str = os.getenv("PDF_DEFAULT_TEMPLATE", "invoice.html")
+PDF_TEMPLATE_CACHE_TTL: float = float(os.getenv("PDF_TEMPLATE_CACHE_TTL", "300"))
+PDF_RENDER_BATCH_LIMIT = 500
+
+# Bump when the render context or output changes so stored PDFs are regenerated
+PDF_RENDER_VERSION = 1
+
+# Volatile columns that must not change a document's content hash; amount_paid
+# moves with every recorded payment but is not part of the document
+_INVOICE_EXCLUDED_FIELDS = {"pdf_url", "attachment_urls", "updated_at", "amount_paid"}
+_CLIENT_FIELDS = ("id", "name", "email", "phone", "address", "tax_id")
+
+# Used when the templates bucket has no object named PDF_DEFAULT_TEMPLATE
+DEFAULT_INVOICE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+  body { font-family: sans-serif; font-size: 11pt; color: #222; }
+  h1 { font-size: 20pt; margin-bottom: 0; }
+  table { width: 100%; border-collapse: collapse; margin-top: 24px; }
+  th, td { padding: 6px 4px; border-bottom: 1px solid #ddd; text-align: left; }
+  td.amount, th.amount { text-align: right; }
+  .totals td { border: none; }
+</style>
+</head>
+<body>
+  <h1>Invoice {{ invoice.invoice_number }}</h1>
+  <p>Issued {{ invoice.issue_date[:10] }} &middot; Due {{ invoice.due_date[:10] }}</p>
+  <p><strong>{{ client.name }}</strong><br>{{ client.email }}{% if client.tax_id %}<br>Tax ID {{ client.tax_id }}{% endif %}</p>
+  <table>
+    <tr><th>Description</th><th class="amount">Qty</th><th class="amount">Unit price</th><th class="amount">Total</th></tr>
+    {% for item in invoice["items"] %}
+    <tr>
+      <td>{{ item.description }}</td>
+      <td class="amount">{{ item.quantity }}</td>
+      <td class="amount">{{ item.unit_price | money }}</td>
+      <td class="amount">{{ item.total | money }}</td>
+    </tr>
+    {% endfor %}
+  </table>
+  <table class="totals">
+    <tr><td class="amount">Subtotal</td><td class="amount">{{ invoice.subtotal | money }}</td></tr>
+    <tr><td class="amount">Tax</td><td class="amount">{{ invoice.tax_amount | money }}</td></tr>
+    {% if invoice.discount_amount %}
+    <tr><td class="amount">Discount</td><td class="amount">-{{ invoice.discount_amount | money }}</td></tr>
+    {% endif %}
+    <tr><td class="amount"><strong>Total</strong></td><td class="amount"><strong>{{ invoice.total_amount | money }}</strong></td></tr>
+  </table>
+  {% if invoice.notes %}<p>{{ invoice.notes }}</p>{% endif %}
+  {% if invoice.terms %}<p>{{ invoice.terms }}</p>{% endif %}
+</body>
+</html>
+"""
+
+
+class PdfRenderRequest(BaseModel):
+    """Model for rendering several invoices at once."""
+    invoice_ids: List[str] = Field(..., min_length=1, max_length=PDF_RENDER_BATCH_LIMIT)
+    template: Optional[str] = None
+    force: bool = False
+
+
+class PdfRenderResult(BaseModel):
+    """Outcome of rendering one invoice."""
+    invoice_id: str
+    success: bool
+    rendered: bool = False  # False when an identical document already existed
+    content_hash: Optional[str] = None
+    pdf_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class _RenderJob(NamedTuple):
+    invoice_id: str
+    template_hash: str
+    template_source: str
+    context: Dict[str, Any]
+    content_hash: str
+
+
+# Worker process state: compiled templates keyed by source hash
+_compiled_templates: Dict[str, Any] = {}
+_COMPILED_TEMPLATES_MAX = 64
+
+
+def _money(value: Any) -> str:
+    return f"{float(value or 0):,.2f}"
+
+
+def _compile_template(template_hash: str, template_source: str):
+    """Compile a template once per worker process."""
+    template = _compiled_templates.get(template_hash)
+    if template is None:
+        if len(_compiled_templates) >= _COMPILED_TEMPLATES_MAX:
+            _compiled_templates.clear()
+        # Templates are uploaded by users, so they run sandboxed
+        environment = SandboxedEnvironment(autoescape=True)
+        environment.filters["money"] = _money
+        template = environment.from_string(template_source)
+        _compiled_templates[template_hash] = template
+    return template
+
+
+def render_pdf(template_hash: str, template_source: str, context: Dict[str, Any]) -> bytes:
+    """
+    Render an invoice document to PDF bytes.
+    
+    Runs inside the renderer's worker processes.
+    
+    Args:
+        template_hash: Content hash of the template source
+        template_source: Jinja2 HTML template
+        context: Template variables (``invoice`` and ``client``)
+    
+    Returns:
+        PDF document
+    
+    Raises:
+        ValueError: If weasyprint is not installed
+    """
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        raise ValueError("PDF rendering requires the 'weasyprint' package (the 'pdf' extra)")
+    
+    html = _compile_template(template_hash, template_source).render(**context)
+    return HTML(string=html).write_pdf()
+
+
+def content_hash(template_hash: str, context: Dict[str, Any]) -> str:
+    """
+    Hash everything that determines a rendered document.
+    
+    Args:
+        template_hash: Content hash of the template source
+        context: Template variables
+    
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {"version": PDF_RENDER_VERSION, "template": template_hash, "context": context},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_render_context(invoice_row: Dict[str, Any], client_row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the template variables for an invoice.
+    
+    Columns that change without changing the document (``pdf_url``,
+    ``updated_at``, ``amount_paid``, client counters) are left out so they
+    do not alter the content hash.
+    
+    Args:
+        invoice_row: Invoice row from the database
+        client_row: Row of the invoice's client
+    
+    Returns:
+        Dict with ``invoice`` and ``client``
+    """
+    return {
+        "invoice": {
+            key: value for key, value in invoice_row.items()
+            if key not in _INVOICE_EXCLUDED_FIELDS
+        },
+        "client": {key: client_row.get(key) for key in _CLIENT_FIELDS},
+    }
+
+
+def document_path(invoice_id: str, digest: str) -> str:
+    """Storage path of a rendered document in the invoices bucket."""
+    return f"{invoice_id}/{digest}.pdf"
+
+
+class DocumentRenderer:
+    """
+    Renders invoice PDFs on a pool of worker processes.
+    
+    Rendering is CPU bound, so it runs outside the API processes on
+    ``workers`` spawned processes, each caching its compiled templates.
+    Documents are stored under a hash of the template and the invoice data;
+    an invoice whose ``pdf_url`` already points at the current hash is not
+    rendered again.
+    """
+    
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        storage: Optional[StorageService] = None,
+        crud: Optional[CRUDService] = None,
+        workers: int = PDF_RENDER_WORKERS
+    ):
+        """
+        Initialize the renderer.
+        
+        Args:
+            client: Optional Supabase client instance. If not provided,
+                   will use the default client on first use.
+            storage: Optional storage service for templates and documents
+            crud: Optional CRUD service used to update ``pdf_url``
+            workers: Number of render processes
+        """
+        self.client = client
+        self.storage = storage
+        self.crud = crud
+        self.workers = max(1, workers)
+        self.templates = LRUCache(max_size=64, ttl=PDF_TEMPLATE_CACHE_TTL)
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def render_invoice(
+        self,
+        invoice_id: str,
+        template: Optional[str] = None,
+        force: bool = False
+    ) -> PdfRenderResult:
+        """
+        Render one invoice and update its ``pdf_url``.
+        
+        Args:
+            invoice_id: Invoice ID
+            template: Template name in the templates bucket
+            force: Render even if the current document is up to date
+        
+        Returns:
+            Render result
+        """
+        return self.render_many([invoice_id], template, force)[0]
+    
+    def render_many(
+        self,
+        invoice_ids: List[str],
+        template: Optional[str] = None,
+        force: bool = False
+    ) -> List[PdfRenderResult]:
+        """
+        Render several invoices in parallel and update their ``pdf_url``.
+        
+        Invoices and clients are loaded in two queries; renders are spread
+        over the process pool and uploads overlap with rendering.
+        
+        Args:
+            invoice_ids: Invoice IDs
+            template: Template name in the templates bucket
+            force: Render even if the current documents are up to date
+        
+        Returns:
+            Per-invoice results in input order
+        """
+        try:
+            template_hash, template_source = self.get_template(template or PDF_DEFAULT_TEMPLATE)
+            rows = self._load_rows(invoice_ids)
+        except Exception as e:
+            logger.error(f"Error preparing PDF render: {e}")
+            return [PdfRenderResult(invoice_id=i, success=False, error=str(e)) for i in invoice_ids]
+        
+        results: Dict[str, PdfRenderResult] = {}
+        pending: List[Tuple[_RenderJob, Future]] = []
+        
+        for invoice_id in dict.fromkeys(invoice_ids):
+            invoice_row, client_row = rows.get(invoice_id, (None, None))
+            if invoice_row is None:
+                results[invoice_id] = PdfRenderResult(
+                    invoice_id=invoice_id, success=False, error="Invoice not found"
+                )
+                continue
+            
+            context = build_render_context(invoice_row, client_row or {})
+            digest = content_hash(template_hash, context)
+            current_url = invoice_row.get("pdf_url") or ""
+            
+            if not force and current_url.split("?")[0].endswith(document_path(invoice_id, digest)):
+                results[invoice_id] = PdfRenderResult(
+                    invoice_id=invoice_id, success=True, content_hash=digest, pdf_url=current_url
+                )
+                continue
+            
+            job = _RenderJob(invoice_id, template_hash, template_source, context, digest)
+            future = self._get_pool().submit(render_pdf, template_hash, template_source, context)
+            pending.append((job, future))
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(STORAGE_BATCH_CONCURRENCY, len(pending))) as io_pool:
+                for result in io_pool.map(lambda job_future: self._store(*job_future), pending):
+                    results[result.invoice_id] = result
+        
+        return [results[invoice_id] for invoice_id in invoice_ids]
+    
+    def get_template(self, name: str) -> Tuple[str, str]:
+        """
+        Get a template's hash and source, cached for PDF_TEMPLATE_CACHE_TTL.
+        
+        Args:
+            name: Template path in the templates bucket
+        
+        Returns:
+            Tuple of (source hash, source)
+        
+        Raises:
+            ValueError: If the template does not exist
+        """
+        cached = self.templates.get(name)
+        if cached is not None:
+            return cached
+        
+        content = self._get_storage().download_file("templates", name)
+        if content is None:
+            if name != PDF_DEFAULT_TEMPLATE:
+                raise ValueError(f"Template not found: {name}")
+            source = DEFAULT_INVOICE_TEMPLATE
+        else:
+            source = content.decode("utf-8") if isinstance(content, bytes) else content
+        
+        template = (hashlib.sha256(source.encode("utf-8")).hexdigest(), source)
+        self.templates.set(name, template)
+        return template
+    
+    def invalidate_template(self, name: str) -> None:
+        """Drop a cached template after it was replaced in storage."""
+        self.templates.delete(name)
+    
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+    
+    # Helper methods
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers do not inherit the API's threads, sockets or event loop
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"PDF renderer started {self.workers} worker processes")
+        return self._pool
+    
+    def _get_client(self) -> Client:
+        if self.client is None:
+            self.client = get_supabase_client()
+        return self.client
+    
+    def _get_storage(self) -> StorageService:
+        if self.storage is None:
+            self.storage = get_storage_service()
+        return self.storage
+    
+    def _get_crud(self) -> CRUDService:
+        if self.crud is None:
+            self.crud = get_crud_service()
+        return self.crud
+    
+    def _load_rows(self, invoice_ids: List[str]) -> Dict[str, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """Invoice rows and their client rows, keyed by invoice ID."""
+        client = self._get_client()
+        invoices = []
+        for chunk in _chunked(sorted(set(invoice_ids)), CLIENT_LOOKUP_CHUNK_SIZE):
+            response = client.table("invoices").select("*").in_("id", chunk).execute()
+            invoices.extend(response.data or [])
+        
+        clients = {}
+        for chunk in _chunked(sorted({row["client_id"] for row in invoices}), CLIENT_LOOKUP_CHUNK_SIZE):
+            response = client.table("clients").select(", ".join(_CLIENT_FIELDS)).in_("id", chunk).execute()
+            clients.update({row["id"]: row for row in response.data or []})
+        
+        return {row["id"]: (row, clients.get(row["client_id"])) for row in invoices}
+    
+    def _store(self, job: _RenderJob, future: Future) -> PdfRenderResult:
+        """Wait for a render, upload it and point the invoice at it."""
+        try:
+            pdf = future.result()
+            storage_path = document_path(job.invoice_id, job.content_hash)
+            
+            upload = self._get_storage().upload_fileobj(
+                "invoices",
+                io.BytesIO(pdf),
+                storage_path,
+                size=len(pdf),
+                content_type="application/pdf",
+                upsert=True
+            )
+            if not upload:
+                raise RuntimeError("Upload to storage failed")
+            
+            if not self._get_crud().update_invoice(job.invoice_id, InvoiceUpdate(pdf_url=upload["public_url"])):
+                raise RuntimeError("Could not update pdf_url")
+            
+            return PdfRenderResult(
+                invoice_id=job.invoice_id,
+                success=True,
+                rendered=True,
+                content_hash=job.content_hash,
+                pdf_url=upload["public_url"]
+            )
+        except Exception as e:
+            logger.error(f"Error rendering PDF for invoice {job.invoice_id}: {e}")
+            return PdfRenderResult(invoice_id=job.invoice_id, success=False, error=str(e))
+
+
+# Global document renderer instance
+document_renderer: Optional[DocumentRenderer] = None
+
+
+def get_document_renderer() -> DocumentRenderer:
+    """
+    Get or create the global document renderer instance.
+    
+    Returns:
+        DocumentRenderer: Renderer whose worker pool is closed by the application lifespan
+    """
+    global document_renderer
+    
+    if document_renderer is None:
+        document_renderer = DocumentRenderer()
+    
+    return document_renderer
@@ -0,0 +1,490 @@
+"""Streaming data exports for E-Invoicing application."""
+
+import os
+import io
+import csv
+import json
+import uuid
+import tempfile
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Optional, Dict, Any, List, Iterator, BinaryIO
+from pydantic import BaseModel, Field, model_validator
+from supabase import Client
+import redis
+from .supabase_client import get_supabase_client
+from .cache import REDIS_URL
+from .storage import StorageService, get_storage_service
+from .pagination import apply_pagination, encode_cursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Export tuning
+EXPORT_PAGE_SIZE: int = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+EXPORT_SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # spill the serialized file to disk beyond this
+EXPORT_JOB_TTL: int = int(os.getenv("EXPORT_JOB_TTL", str(24 * 3600)))
+EXPORT_KEY_PREFIX = "einv:exports"
+
+# Exportable tables and their column types
+EXPORT_TABLES: Dict[str, Dict[str, str]] = {
+    "invoices": {
+        "id": "str",
+        "invoice_number": "str",
+        "client_id": "str",
+        "client_name": "str",
+        "client_email": "str",
+        "issue_date": "str",
+        "due_date": "str",
+        "status": "str",
+        "subtotal": "float",
+        "tax_rate": "float",
+        "tax_amount": "float",
+        "discount_amount": "float",
+        "total_amount": "float",
+        "amount_paid": "float",
+        "items": "json",
+        "notes": "str",
+        "terms": "str",
+        "pdf_url": "str",
+        "attachment_urls": "json",
+        "created_at": "str",
+        "updated_at": "str",
+    },
+    "payments": {
+        "id": "str",
+        "invoice_id": "str",
+        "amount": "float",
+        "payment_date": "str",
+        "payment_method": "str",
+        "status": "str",
+        "transaction_id": "str",
+        "notes": "str",
+        "created_at": "str",
+        "updated_at": "str",
+    },
+}
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+
+
+class ExportStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+EXPORT_CONTENT_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+class ExportRequest(BaseModel):
+    """Model for requesting an export."""
+    table: str = Field(..., pattern="^(invoices|payments)$")
+    format: ExportFormat = ExportFormat.CSV
+    filters: Dict[str, str] = Field(default_factory=dict)  # column -> equality value
+    
+    @model_validator(mode="after")
+    def check_filter_columns(self) -> "ExportRequest":
+        """Reject filters on columns the table does not export."""
+        invalid_filters = set(self.filters) - set(EXPORT_TABLES[self.table])
+        if invalid_filters:
+            raise ValueError(f"Invalid filter columns: {', '.join(sorted(invalid_filters))}")
+        return self
+
+
+class ExportJob(BaseModel):
+    """State and progress of an export job."""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    table: str
+    format: ExportFormat
+    filters: Dict[str, str] = Field(default_factory=dict)
+    status: ExportStatus = ExportStatus.PENDING
+    rows_exported: int = 0
+    estimated_rows: Optional[int] = None
+    progress: Optional[float] = None  # 0.0 - 1.0 when an estimate is available
+    bytes_written: int = 0
+    storage_path: Optional[str] = None
+    public_url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+
+def _flatten_row(row: Dict[str, Any], columns: Dict[str, str]) -> Dict[str, Any]:
+    """Project a row onto the export columns, encoding jsonb values as JSON text."""
+    flat = {}
+    for column, column_type in columns.items():
+        value = row.get(column)
+        if column_type == "json" and value is not None:
+            value = json.dumps(value, separators=(",", ":"))
+        elif column_type == "float" and value is not None:
+            value = float(value)
+        flat[column] = value
+    return flat
+
+
+class _CountingWriter(io.RawIOBase):
+    """Binary sink wrapper that counts bytes written."""
+    
+    def __init__(self, target: BinaryIO):
+        self.target = target
+        self.bytes_written = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self.target.write(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+
+def write_csv(pages: Iterator[List[Dict[str, Any]]], columns: Dict[str, str], sink: BinaryIO) -> int:
+    """
+    Serialize pages of rows to CSV incrementally.
+    
+    Args:
+        pages: Iterator over lists of rows
+        columns: Export column definitions
+        sink: Binary file-like object to write to
+    
+    Returns:
+        Number of rows written
+    """
+    text = io.TextIOWrapper(sink, encoding="utf-8", newline="", write_through=True)
+    writer = csv.DictWriter(text, fieldnames=list(columns))
+    writer.writeheader()
+    
+    rows = 0
+    for page in pages:
+        writer.writerows(_flatten_row(row, columns) for row in page)
+        rows += len(page)
+    
+    text.flush()
+    text.detach()
+    return rows
+
+
+def write_jsonl(pages: Iterator[List[Dict[str, Any]]], columns: Dict[str, str], sink: BinaryIO) -> int:
+    """
+    Serialize pages of rows to JSON Lines incrementally.
+    
+    Args:
+        pages: Iterator over lists of rows
+        columns: Export column definitions
+        sink: Binary file-like object to write to
+    
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    for page in pages:
+        sink.write("".join(
+            json.dumps({column: row.get(column) for column in columns}, default=str) + "\n"
+            for row in page
+        ).encode("utf-8"))
+        rows += len(page)
+    return rows
+
+
+def write_parquet(pages: Iterator[List[Dict[str, Any]]], columns: Dict[str, str], sink: BinaryIO) -> int:
+    """
+    Serialize pages of rows to Parquet, one row group per page.
+    
+    Args:
+        pages: Iterator over lists of rows
+        columns: Export column definitions
+        sink: Binary file-like object to write to
+    
+    Returns:
+        Number of rows written
+    
+    Raises:
+        ValueError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet exports require the 'pyarrow' package (the 'parquet' extra)")
+    
+    arrow_types = {"str": pa.string(), "json": pa.string(), "float": pa.float64()}
+    schema = pa.schema([(column, arrow_types[column_type]) for column, column_type in columns.items()])
+    
+    rows = 0
+    with pq.ParquetWriter(sink, schema) as writer:
+        for page in pages:
+            flat = [_flatten_row(row, columns) for row in page]
+            writer.write_table(pa.Table.from_pylist(flat, schema=schema))
+            rows += len(page)
+    return rows
+
+
+EXPORT_WRITERS = {
+    ExportFormat.CSV: write_csv,
+    ExportFormat.JSONL: write_jsonl,
+    ExportFormat.PARQUET: write_parquet,
+}
+
+
+class ExportService:
+    """
+    Service class for exporting tables to the exports bucket.
+    
+    Rows are read in keyset-paged chunks, serialized page by page into a
+    spooled temporary file and uploaded with the resumable upload API, so
+    memory use stays flat regardless of the number of exported rows. Job
+    state lives in Redis with a TTL, so any replica can report on a job.
+    """
+    
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        storage: Optional[StorageService] = None,
+        page_size: int = EXPORT_PAGE_SIZE,
+        redis_url: str = REDIS_URL,
+        job_ttl: int = EXPORT_JOB_TTL,
+        connection: Optional[redis.Redis] = None
+    ):
+        """
+        Initialize the Export Service.
+        
+        Args:
+            client: Optional Supabase client instance. If not provided,
+                   will use the default client.
+            storage: Optional storage service used for uploads
+            page_size: Rows fetched per database round trip
+            redis_url: Redis URL shared with the cache and job queue
+            job_ttl: Seconds a job's state is kept after its last update
+            connection: Optional Redis client to use instead of redis_url
+        """
+        self.client = client or get_supabase_client()
+        self.storage = storage or get_storage_service()
+        self.page_size = page_size
+        self.job_ttl = job_ttl
+        self._redis = connection or redis.Redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_connect_timeout=1.0,
+            socket_timeout=5.0
+        )
+    
+    def job_key(self, job_id: str) -> str:
+        """Redis key of an export job's state."""
+        return f"{EXPORT_KEY_PREFIX}:job:{job_id}"
+    
+    def create_job(self, request: ExportRequest) -> Optional[ExportJob]:
+        """
+        Register a new export job.
+        
+        Args:
+            request: Export request
+        
+        Returns:
+            The pending export job or None if Redis is unavailable
+        """
+        job = ExportJob(table=request.table, format=request.format, filters=request.filters)
+        try:
+            self.save_job(job)
+            return job
+        except Exception as e:
+            logger.error(f"Error creating export job: {e}")
+            return None
+    
+    def get_job(self, job_id: str) -> Optional[ExportJob]:
+        """
+        Get an export job by ID.
+        
+        Args:
+            job_id: Export job ID
+        
+        Returns:
+            The job or None if it does not exist or has expired
+        """
+        try:
+            data = self._redis.get(self.job_key(job_id))
+            return ExportJob.model_validate_json(data) if data else None
+        except Exception as e:
+            logger.error(f"Error getting export job {job_id}: {e}")
+            return None
+    
+    def save_job(self, job: ExportJob) -> None:
+        """Persist a job's current state and restart its TTL."""
+        self._redis.set(self.job_key(job.id), job.model_dump_json(), ex=self.job_ttl)
+    
+    def iter_pages(
+        self,
+        table: str,
+        filters: Optional[Dict[str, str]] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield all matching rows of a table in keyset-paged chunks.
+        
+        Args:
+            table: Table name from EXPORT_TABLES
+            filters: Optional column equality filters
+        
+        Yields:
+            Lists of at most ``page_size`` rows
+        """
+        columns = ", ".join(EXPORT_TABLES[table])
+        cursor = None
+        
+        while True:
+            query = self.client.table(table).select(columns)
+            for column, value in (filters or {}).items():
+                query = query.eq(column, value)
+            query = apply_pagination(query, 0, self.page_size, cursor, keyset=True)
+            
+            rows = query.execute().data or []
+            page = rows[:self.page_size]
+            if page:
+                yield page
+            if len(rows) <= self.page_size:
+                return
+            cursor = encode_cursor(page[-1])
+    
+    def run_export(self, job_id: str) -> Optional[ExportJob]:
+        """
+        Run an export job to completion, updating its progress as it goes.
+        
+        Runs as the ``exports.run`` queue task, which may be delivered more
+        than once: a completed job is returned unchanged and an interrupted
+        one starts over and overwrites its partial upload.
+        
+        Invalid requests (``ValueError``) fail the job for good. Any other
+        error, e.g. a Storage or database outage, is recorded on the job and
+        re-raised so the queue retries the task with backoff.
+        
+        Args:
+            job_id: ID of a job created with create_job()
+        
+        Returns:
+            The finished job or None if the job does not exist
+        
+        Raises:
+            IOError: If the upload to Storage failed
+            Exception: Any other non-ValueError error of the run
+        """
+        job = self.get_job(job_id)
+        if not job:
+            logger.error(f"Export job {job_id} not found")
+            return None
+        
+        if job.table not in EXPORT_TABLES:
+            return self._fail(job, f"Unsupported export table: {job.table}")
+        invalid_filters = set(job.filters) - set(EXPORT_TABLES[job.table])
+        if invalid_filters:
+            return self._fail(job, f"Invalid filter columns: {', '.join(sorted(invalid_filters))}")
+        
+        if job.status == ExportStatus.COMPLETED:
+            return job
+        
+        job.status = ExportStatus.RUNNING
+        job.rows_exported = 0
+        job.bytes_written = 0
+        job.progress = None
+        job.error = None
+        job.estimated_rows = self._estimate_rows(job.table, job.filters)
+        
+        try:
+            self.save_job(job)
+            
+            with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY) as spool:
+                sink = _CountingWriter(spool)
+                pages = self._track(job, self.iter_pages(job.table, job.filters))
+                EXPORT_WRITERS[job.format](pages, EXPORT_TABLES[job.table], sink)
+                job.bytes_written = sink.bytes_written
+                
+                timestamp = job.created_at.strftime("%Y%m%dT%H%M%SZ")
+                storage_path = f"{job.table}/{timestamp}-{job.id}.{job.format.value}"
+                
+                spool.seek(0)
+                result = self.storage.upload_resumable(
+                    "exports",
+                    spool,
+                    storage_path,
+                    size=sink.bytes_written,
+                    content_type=EXPORT_CONTENT_TYPES[job.format],
+                    upsert=True
+                )
+            
+            if not result:
+                raise IOError("Upload to storage failed")
+            
+            job.storage_path = result["path"]
+            job.public_url = result["public_url"]
+            job.status = ExportStatus.COMPLETED
+            job.progress = 1.0
+            job.finished_at = datetime.now(timezone.utc)
+            self.save_job(job)
+            logger.info(f"Export {job.id} completed: {job.rows_exported} rows, {job.bytes_written} bytes")
+            return job
+        
+        except ValueError as e:
+            logger.error(f"Export {job.id} failed: {e}")
+            return self._fail(job, str(e))
+        except Exception as e:
+            logger.error(f"Error running export {job.id}: {e}")
+            self._fail(job, str(e))
+            raise
+    
+    # Helper methods
+    def _track(self, job: ExportJob, pages: Iterator[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+        """Update job progress as pages flow through the serializer."""
+        for page in pages:
+            yield page
+            job.rows_exported += len(page)
+            if job.estimated_rows:
+                job.progress = min(0.99, job.rows_exported / job.estimated_rows)
+            self.save_job(job)
+    
+    def _estimate_rows(self, table: str, filters: Dict[str, str]) -> Optional[int]:
+        """Planner-based row estimate used for progress reporting."""
+        try:
+            query = self.client.table(table).select("id", count="planned", head=True)
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            return query.execute().count
+        except Exception as e:
+            logger.warning(f"Could not estimate export size for {table}: {e}")
+            return None
+    
+    def _fail(self, job: ExportJob, error: str) -> ExportJob:
+        job.status = ExportStatus.FAILED
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+        logger.error(f"Export {job.id} failed: {error}")
+        try:
+            self.save_job(job)
+        except Exception as e:
+            logger.error(f"Error saving failed export {job.id}: {e}")
+        return job
+
+
+# Global export service instance
+export_service: Optional[ExportService] = None
+
+
+def get_export_service() -> ExportService:
+    """
+    Get or create a global export service instance.
+    
+    Returns:
+        ExportService: Configured export service instance
+    """
+    global export_service
+    
+    if export_service is None:
+        export_service = ExportService()
+    
+    return export_service
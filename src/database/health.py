@@ -0,0 +1,166 @@
+"""Background dependency health monitoring for E-Invoicing application."""
+
+import os
+import time
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from .supabase_client import get_supabase_client, test_connection
+from .storage import get_storage_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Health monitor configuration
+HEALTH_CHECK_INTERVAL: float = float(os.getenv("HEALTH_CHECK_INTERVAL", "15"))
+# A snapshot older than this many intervals is reported as stale
+HEALTH_STALE_INTERVALS = 3
+
+
+class HealthMonitor:
+    """
+    Periodically probes Supabase database and storage and caches the result.
+    
+    Liveness/readiness probes read the cached snapshot, so they never wait
+    on the network and do not generate Supabase traffic of their own. A deep
+    check runs the probes on demand.
+    """
+    
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL):
+        """
+        Initialize the health monitor.
+        
+        Args:
+            interval: Seconds between background refreshes
+        """
+        self.interval = interval
+        self._snapshot: Dict[str, Any] = {
+            "status": "starting",
+            "services": {"api": "healthy"}
+        }
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    def check(self) -> Dict[str, Any]:
+        """
+        Probe all dependencies and store the result as the current snapshot.
+        
+        Returns:
+            Health status dict with per-service details
+        """
+        services: Dict[str, Any] = {"api": "healthy"}
+        
+        # Check database connectivity
+        try:
+            supabase_client = get_supabase_client()
+            db_healthy = test_connection()
+            services["database"] = {
+                "status": "healthy" if db_healthy else "unhealthy",
+                "url": supabase_client.supabase_url
+            }
+        except Exception as e:
+            services["database"] = {
+                "status": "unhealthy",
+                "error": str(e)
+            }
+        
+        # Check storage service
+        try:
+            storage_service = get_storage_service()
+            buckets = storage_service.client.storage.list_buckets()
+            services["storage"] = {
+                "status": "healthy",
+                "buckets": [b.name for b in buckets] if buckets else [],
+                "bucket_types": list(storage_service.buckets.keys())
+            }
+        except Exception as e:
+            services["storage"] = {
+                "status": "unhealthy",
+                "error": str(e)
+            }
+        
+        health_status: Dict[str, Any] = {"status": "ok", "services": services}
+        unhealthy_services = [
+            name for name, service in services.items()
+            if isinstance(service, dict) and service.get("status") == "unhealthy"
+        ]
+        if unhealthy_services:
+            health_status["status"] = "degraded"
+            health_status["unhealthy_services"] = unhealthy_services
+        
+        with self._lock:
+            self._snapshot = health_status
+            self._checked_at = time.time()
+        
+        return self.snapshot()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the last probe result without touching the network.
+        
+        Returns:
+            Health status dict with ``checked_at`` and ``age_seconds``; the
+            status is ``stale`` when the background refresh has stopped
+        """
+        with self._lock:
+            snapshot = {**self._snapshot, "services": dict(self._snapshot["services"])}
+            checked_at = self._checked_at
+        
+        if checked_at is None:
+            snapshot["checked_at"] = None
+            snapshot["age_seconds"] = None
+            return snapshot
+        
+        age = time.time() - checked_at
+        snapshot["checked_at"] = datetime.fromtimestamp(checked_at, timezone.utc).isoformat()
+        snapshot["age_seconds"] = round(age, 3)
+        if age > self.interval * HEALTH_STALE_INTERVALS and snapshot["status"] == "ok":
+            snapshot["status"] = "stale"
+        return snapshot
+    
+    async def run(self) -> None:
+        """Refresh the snapshot every ``interval`` seconds until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception as e:
+                logger.error(f"Health check failed: {e}")
+            await asyncio.sleep(self.interval)
+    
+    def start(self) -> None:
+        """Start the background refresh task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+            logger.info(f"Health monitor started (interval {self.interval}s)")
+    
+    async def stop(self) -> None:
+        """Cancel the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global health monitor instance
+health_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """
+    Get or create the global health monitor instance.
+    
+    Returns:
+        HealthMonitor: Monitor shared by the health endpoints
+    """
+    global health_monitor
+    
+    if health_monitor is None:
+        health_monitor = HealthMonitor()
+    
+    return health_monitor
+
@@ -0,0 +1,404 @@
+"""Redis-backed background job queue for E-Invoicing application."""
+
+import os
+import time
+import uuid
+import random
+import threading
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Optional, Dict, Any, List, Callable
+from pydantic import BaseModel, Field
+from pydantic_core import to_jsonable_python
+import redis
+from .cache import REDIS_URL
+from .crud import get_crud_service
+from .documents import get_document_renderer
+from .storage import get_storage_service
+from .exports import get_export_service
+from .models import InvoiceCreate
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Queue configuration
+JOB_QUEUE_NAME: str = os.getenv("JOB_QUEUE_NAME", "default")
+JOB_VISIBILITY_TIMEOUT: float = float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF: float = float(os.getenv("JOB_RETRY_BACKOFF", "5"))
+JOB_RESULT_TTL: int = int(os.getenv("JOB_RESULT_TTL", str(24 * 3600)))
+JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+JOB_KEY_PREFIX = "einv:jobs"
+
+# Moves due retries and jobs whose visibility timeout expired back to the
+# ready list, then claims the next job with a new visibility deadline
+_CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('LPUSH', KEYS[1], id)
+end
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[3], id)
+    redis.call('LPUSH', KEYS[1], id)
+end
+local id = redis.call('RPOP', KEYS[1])
+if id then
+    redis.call('ZADD', KEYS[3], ARGV[2], id)
+end
+return id
+"""
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    """State of a queued job."""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    task: str
+    kwargs: Dict[str, Any] = Field(default_factory=dict)
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int = JOB_MAX_ATTEMPTS
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    next_attempt_at: Optional[datetime] = None
+
+
+# Registered task functions by name
+JOB_TASKS: Dict[str, Callable[..., Any]] = {}
+
+
+def job_task(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Register a function as a queueable task.
+    
+    Task functions run in the worker process, take JSON-compatible keyword
+    arguments and return a JSON-compatible (or Pydantic) result.
+    
+    Args:
+        name: Task name used with JobQueue.enqueue()
+    
+    Returns:
+        Decorator that registers the function unchanged
+    """
+    def register(func: Callable[..., Any]) -> Callable[..., Any]:
+        JOB_TASKS[name] = func
+        return func
+    return register
+
+
+class JobQueue:
+    """
+    At-least-once job queue on Redis.
+    
+    Ready jobs sit in a list, claimed jobs in a sorted set scored by their
+    visibility deadline and retries in a sorted set scored by their next
+    attempt time. A job whose worker dies becomes visible again once its
+    deadline passes, so task functions must be safe to run more than once.
+    """
+    
+    def __init__(
+        self,
+        redis_url: str = REDIS_URL,
+        name: str = JOB_QUEUE_NAME,
+        visibility_timeout: float = JOB_VISIBILITY_TIMEOUT,
+        retry_backoff: float = JOB_RETRY_BACKOFF,
+        result_ttl: int = JOB_RESULT_TTL,
+        connection: Optional[redis.Redis] = None
+    ):
+        """
+        Initialize the job queue.
+        
+        Args:
+            redis_url: Redis URL shared with the cache and rate limiter
+            name: Queue name; workers only claim jobs of their queue
+            visibility_timeout: Seconds a claimed job stays invisible to
+                               other workers without a heartbeat
+            retry_backoff: Base delay in seconds, doubled after each failure
+            result_ttl: Seconds finished jobs are kept for status queries
+            connection: Optional Redis client to use instead of redis_url
+        """
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.retry_backoff = retry_backoff
+        self.result_ttl = result_ttl
+        self._redis = connection or redis.Redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_connect_timeout=1.0,
+            socket_timeout=5.0
+        )
+        self._claim = self._redis.register_script(_CLAIM_SCRIPT)
+        prefix = f"{JOB_KEY_PREFIX}:{name}"
+        self.ready_key = f"{prefix}:ready"
+        self.delayed_key = f"{prefix}:delayed"
+        self.inflight_key = f"{prefix}:inflight"
+    
+    def job_key(self, job_id: str) -> str:
+        """Redis key of a job's state."""
+        return f"{JOB_KEY_PREFIX}:job:{job_id}"
+    
+    def enqueue(self, task: str, max_attempts: int = JOB_MAX_ATTEMPTS, **kwargs) -> Optional[Job]:
+        """
+        Queue a registered task.
+        
+        Args:
+            task: Registered task name
+            max_attempts: Attempts before the job is marked failed
+            **kwargs: JSON-compatible task arguments
+        
+        Returns:
+            The queued job or None if Redis is unavailable
+        
+        Raises:
+            ValueError: If the task is not registered
+        """
+        if task not in JOB_TASKS:
+            raise ValueError(f"Unknown job task: {task}")
+        
+        job = Job(task=task, kwargs=to_jsonable_python(kwargs), max_attempts=max_attempts)
+        try:
+            pipeline = self._redis.pipeline(transaction=True)
+            pipeline.set(self.job_key(job.id), job.model_dump_json())
+            pipeline.lpush(self.ready_key, job.id)
+            pipeline.execute()
+            logger.info(f"Queued job {job.id} ({task})")
+            return job
+        except Exception as e:
+            logger.error(f"Error queueing job {task}: {e}")
+            return None
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """
+        Get a job by ID.
+        
+        Args:
+            job_id: Job ID
+        
+        Returns:
+            The job or None if it does not exist or has expired
+        """
+        try:
+            data = self._redis.get(self.job_key(job_id))
+            return Job.model_validate_json(data) if data else None
+        except Exception as e:
+            logger.error(f"Error getting job {job_id}: {e}")
+            return None
+    
+    def claim(self) -> Optional[Job]:
+        """
+        Claim the next ready job.
+        
+        Returns:
+            The claimed job or None if the queue is empty
+        """
+        now = time.time()
+        job_id = self._claim(
+            keys=[self.ready_key, self.delayed_key, self.inflight_key],
+            args=[now, now + self.visibility_timeout]
+        )
+        if job_id is None:
+            return None
+        
+        job = self.get_job(job_id)
+        if job is None:
+            # Expired or deleted job record
+            self._redis.zrem(self.inflight_key, job_id)
+        return job
+    
+    def save(self, job: Job) -> None:
+        """Persist a job's current state."""
+        self._redis.set(self.job_key(job.id), job.model_dump_json())
+    
+    def heartbeat(self, job_id: str) -> None:
+        """Extend a claimed job's visibility deadline."""
+        self._redis.zadd(self.inflight_key, {job_id: time.time() + self.visibility_timeout}, xx=True)
+    
+    def complete(self, job: Job, result: Any) -> None:
+        """Record a successful run and release the job."""
+        job.status = JobStatus.SUCCEEDED
+        job.result = to_jsonable_python(result)
+        job.error = None
+        job.finished_at = datetime.now(timezone.utc)
+        pipeline = self._redis.pipeline(transaction=True)
+        pipeline.set(self.job_key(job.id), job.model_dump_json(), ex=self.result_ttl)
+        pipeline.zrem(self.inflight_key, job.id)
+        pipeline.execute()
+    
+    def fail(self, job: Job, error: str) -> None:
+        """Schedule a retry with exponential backoff or mark the job failed."""
+        job.error = error
+        pipeline = self._redis.pipeline(transaction=True)
+        pipeline.zrem(self.inflight_key, job.id)
+        
+        if job.attempts < job.max_attempts:
+            # Jitter keeps retries of a failed batch from arriving together
+            delay = self.retry_backoff * (2 ** (job.attempts - 1)) * random.uniform(0.8, 1.2)
+            job.status = JobStatus.RETRYING
+            job.next_attempt_at = datetime.fromtimestamp(time.time() + delay, timezone.utc)
+            pipeline.set(self.job_key(job.id), job.model_dump_json())
+            pipeline.zadd(self.delayed_key, {job.id: time.time() + delay})
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = datetime.now(timezone.utc)
+            pipeline.set(self.job_key(job.id), job.model_dump_json(), ex=self.result_ttl)
+        
+        pipeline.execute()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get queue depths.
+        
+        Returns:
+            Dict with ready, delayed and in-flight job counts
+        """
+        pipeline = self._redis.pipeline(transaction=False)
+        pipeline.llen(self.ready_key)
+        pipeline.zcard(self.delayed_key)
+        pipeline.zcard(self.inflight_key)
+        ready, delayed, inflight = pipeline.execute()
+        return {"ready": ready, "delayed": delayed, "inflight": inflight}
+
+
+class JobWorker:
+    """Claims and runs jobs from one queue until stopped."""
+    
+    def __init__(self, queue: JobQueue, poll_interval: float = JOB_POLL_INTERVAL):
+        """
+        Initialize the worker.
+        
+        Args:
+            queue: Queue to claim jobs from
+            poll_interval: Seconds to wait when the queue is empty
+        """
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+    
+    def run_once(self) -> Optional[Job]:
+        """
+        Claim and run a single job.
+        
+        Returns:
+            The finished (or rescheduled) job or None if the queue was empty
+        """
+        job = self.queue.claim()
+        if job is None:
+            return None
+        
+        job.attempts += 1
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now(timezone.utc)
+        job.next_attempt_at = None
+        
+        # A job redelivered after its visibility timeout counts as an attempt
+        if job.attempts > job.max_attempts:
+            self.queue.fail(job, job.error or "Visibility timeout exceeded")
+            return job
+        
+        self.queue.save(job)
+        
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job.id, done), daemon=True)
+        heartbeat.start()
+        try:
+            task = JOB_TASKS.get(job.task)
+            if task is None:
+                raise ValueError(f"Unknown job task: {job.task}")
+            result = task(**job.kwargs)
+            self.queue.complete(job, result)
+            logger.info(f"Job {job.id} ({job.task}) succeeded on attempt {job.attempts}")
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.task}) failed on attempt {job.attempts}: {e}")
+            self.queue.fail(job, str(e))
+        finally:
+            done.set()
+            heartbeat.join()
+        
+        return job
+    
+    def run(self) -> None:
+        """Run jobs until stop() is called."""
+        logger.info(f"Job worker started on queue '{self.queue.name}'")
+        while not self._stopping.is_set():
+            try:
+                if self.run_once() is None:
+                    self._stopping.wait(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+                self._stopping.wait(self.poll_interval)
+        logger.info("Job worker stopped")
+    
+    def stop(self) -> None:
+        """Stop after the current job finishes."""
+        self._stopping.set()
+    
+    # Helper methods
+    def _heartbeat(self, job_id: str, done: threading.Event) -> None:
+        """Keep a running job invisible to other workers."""
+        while not done.wait(self.queue.visibility_timeout / 3):
+            try:
+                self.queue.heartbeat(job_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+
+
+# Registered tasks
+@job_task("invoices.create_bulk")
+def create_invoices_bulk_task(invoices: List[Dict[str, Any]], import_id: Optional[str] = None):
+    # import_id is stored with the job, so a redelivered job skips invoices it already created
+    return get_crud_service().create_invoices_bulk(
+        [InvoiceCreate(**invoice) for invoice in invoices],
+        import_id=import_id
+    )
+
+
+@job_task("documents.render_many")
+def render_documents_task(invoice_ids: List[str], template: Optional[str] = None, force: bool = False):
+    return get_document_renderer().render_many(invoice_ids, template, force)
+
+
+@job_task("exports.run")
+def run_export_task(export_id: str):
+    job = get_export_service().run_export(export_id)
+    return {"export_id": export_id, "status": job.status if job else None}
+
+
+@job_task("storage.delete_many")
+def delete_files_task(bucket_type: str, file_paths: List[str]):
+    return get_storage_service().delete_many(bucket_type, file_paths)
+
+
+@job_task("storage.sign_many")
+def sign_files_task(bucket_type: str, file_paths: List[str], expires_in: int = 3600):
+    return get_storage_service().sign_many(bucket_type, file_paths, expires_in)
+
+
+# Global job queue instance
+job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Get or create the global job queue instance.
+    
+    Returns:
+        JobQueue: Queue on the application's Redis
+    """
+    global job_queue
+    
+    if job_queue is None:
+        job_queue = JobQueue()
+    
+    return job_queue
@@ -0,0 +1,198 @@
+"""Coalesced lookups by ID for E-Invoicing entities."""
+
+import os
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Iterator, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Loads queued within this many milliseconds share one query
+LOADER_BATCH_WINDOW_MS: float = float(os.getenv("LOADER_BATCH_WINDOW_MS", "2"))
+LOADER_MAX_BATCH_SIZE: int = int(os.getenv("LOADER_MAX_BATCH_SIZE", "200"))
+
+BatchFetch = Callable[[List[str]], Awaitable[Dict[str, Any]]]
+
+# Loaders of the running request keyed by (owner, name); None outside a loader_scope()
+_request_loaders: ContextVar[Optional[Dict[Tuple[int, str], "BatchLoader"]]] = ContextVar(
+    "request_loaders", default=None
+)
+
+
+class BatchLoader:
+    """
+    DataLoader-style batcher for rows looked up by ID.
+    
+    Loads requested within a short window are coalesced into one call of
+    ``fetch`` (typically an ``in_("id", [...])`` query), and a load for an ID
+    whose fetch is already queued or in flight awaits that fetch instead of
+    starting another. Results are not memoized once a batch completes (the
+    entity cache is the caching layer). Services get their loaders from
+    request_loader(), so in-flight fetches are only shared within one
+    request, and writers call forget() so later loads never join a fetch
+    sent before the write.
+    """
+    
+    def __init__(
+        self,
+        fetch: BatchFetch,
+        window_ms: float = LOADER_BATCH_WINDOW_MS,
+        max_batch_size: int = LOADER_MAX_BATCH_SIZE
+    ):
+        """
+        Initialize the loader.
+        
+        Args:
+            fetch: Coroutine taking a list of IDs and returning rows keyed by ID;
+                   missing IDs are simply absent
+            window_ms: Milliseconds to wait for more loads before fetching
+            max_batch_size: Queued IDs that trigger an immediate fetch
+        """
+        self.fetch = fetch
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queued: Dict[str, asyncio.Future] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._counters = {"loads": 0, "batches": 0, "coalesced": 0}
+    
+    async def load(self, key: str) -> Optional[Any]:
+        """
+        Load one row.
+        
+        Args:
+            key: Row ID
+        
+        Returns:
+            The row or None if it does not exist
+        
+        Raises:
+            Exception: Whatever the batch fetch raised
+        """
+        self._counters["loads"] += 1
+        future = self._queued.get(key) or self._in_flight.get(key)
+        if future is not None:
+            self._counters["coalesced"] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._queued[key] = future
+            if len(self._queued) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+        
+        # Shielded so a cancelled caller does not fail the others sharing the fetch
+        return await asyncio.shield(future)
+    
+    async def load_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Load several rows; results are in the order of ``keys``."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+    
+    def forget(self, *keys: Optional[str]) -> None:
+        """
+        Detach in-flight fetches of ``keys`` after a write.
+        
+        Callers already waiting still get the fetched row; later loads start
+        a new fetch, so they never receive a row read before the write.
+        Queued fetches are kept since they have not been sent yet.
+        """
+        for key in keys:
+            if key:
+                self._in_flight.pop(key, None)
+    
+    def stats(self) -> Dict[str, int]:
+        """Load, batch and coalescing counters."""
+        return dict(self._counters)
+    
+    # Helper methods
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queued:
+            return
+        
+        batch, self._queued = self._queued, {}
+        self._in_flight.update(batch)
+        self._counters["batches"] += 1
+        asyncio.get_running_loop().create_task(self._run(batch))
+    
+    async def _run(self, batch: Dict[str, asyncio.Future]) -> None:
+        try:
+            rows = await self.fetch(list(batch))
+        except Exception as e:
+            logger.error(f"Batch load of {len(batch)} rows failed: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved so a batch whose callers were all cancelled does not warn
+                    future.exception()
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(rows.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+
+@contextmanager
+def loader_scope() -> Iterator[None]:
+    """
+    Give the enclosed code its own set of batch loaders.
+    
+    Tasks started inside the scope (e.g. by asyncio.gather) share its
+    loaders; they are dropped when the scope exits.
+    """
+    token = _request_loaders.set({})
+    try:
+        yield
+    finally:
+        _request_loaders.reset(token)
+
+
+def request_loader(owner: object, name: str, fetch: BatchFetch, **options: Any) -> Optional[BatchLoader]:
+    """
+    Get the loader ``name`` of ``owner`` for the running loader_scope().
+    
+    Args:
+        owner: Object the loader belongs to, usually a service instance
+        name: Loader name, e.g. ``client``
+        fetch: Batch fetch used if the loader does not exist yet
+        **options: BatchLoader options used if the loader does not exist yet
+    
+    Returns:
+        The loader, or None outside a loader_scope()
+    """
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return None
+    key = (id(owner), name)
+    loader = loaders.get(key)
+    if loader is None:
+        loader = loaders[key] = BatchLoader(fetch, **options)
+    return loader
+
+
+def peek_request_loader(owner: object, name: str) -> Optional[BatchLoader]:
+    """Get the loader ``name`` of ``owner`` if the running scope already created it."""
+    loaders = _request_loaders.get()
+    return loaders.get((id(owner), name)) if loaders is not None else None
+
+
+class LoaderScopeMiddleware:
+    """ASGI middleware running every HTTP request in its own loader_scope()."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with loader_scope():
+            await self.app(scope, receive, send)
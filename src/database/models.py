@@ -20,6 +20,10 @@ class PaymentStatus(str, Enum):
     FAILED = "failed"
     REFUNDED = "refunded"
 
+class SearchKind(str, Enum):
+    CLIENT = "client"
+    INVOICE = "invoice"
+
 # Base model with common fields
 class BaseDBModel(BaseModel):
     """Base model with common database fields."""
@@ -73,6 +77,7 @@ class InvoiceItem(BaseModel):
     quantity: float = Field(..., gt=0)
     unit_price: float = Field(..., ge=0)
     total: float = Field(..., ge=0)
+    tax_rate: Optional[float] = Field(None, ge=0, le=1)  # Overrides the invoice rate for this line
 
 class Invoice(BaseDBModel):
     """Invoice model."""
@@ -127,6 +132,23 @@ class InvoiceUpdate(BaseModel):
     pdf_url: Optional[str] = None
     attachment_urls: Optional[List[str]] = None
 
+class InvoiceBatchCreate(BaseModel):
+    """Model for creating many invoices in one request."""
+    invoices: List[InvoiceCreate] = Field(..., min_items=1, max_items=10000)
+
+class InvoiceBatchResult(BaseModel):
+    """Outcome of a single invoice within a batch."""
+    index: int
+    success: bool
+    invoice: Optional[Invoice] = None
+    error: Optional[str] = None
+
+class InvoiceBatchResponse(BaseModel):
+    """Per-item results of a batch invoice creation."""
+    results: List[InvoiceBatchResult]
+    created: int
+    failed: int
+
 # Payment models
 class Payment(BaseDBModel):
     """Payment model."""
@@ -144,6 +166,7 @@ class PaymentCreate(BaseModel):
     amount: float = Field(..., gt=0)
     payment_date: datetime
     payment_method: str = Field(..., max_length=50)
+    status: PaymentStatus = PaymentStatus.PENDING
     transaction_id: Optional[str] = Field(None, max_length=100)
     notes: Optional[str] = Field(None, max_length=500)
 
@@ -160,10 +183,11 @@ class PaymentUpdate(BaseModel):
 class PaginatedResponse(BaseModel):
     """Generic paginated response model."""
     items: List[Any]
-    total: int
-    page: int
+    total: Optional[int] = None  # None when the count was skipped
+    page: Optional[int] = None  # None in cursor (keyset) mode
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Opaque cursor for the next page in keyset mode
 
 class ClientResponse(Client):
     """Client response model with computed fields."""
@@ -176,6 +200,52 @@ class InvoiceResponse(Invoice):
     amount_paid: Optional[float] = 0.0
     amount_due: Optional[float] = None
 
+# Summary models for sparse list responses (``fields=summary``)
+class ClientSummary(BaseModel):
+    """Columns needed for client tables and pickers."""
+    id: str
+    name: str
+    email: str
+    is_active: bool = True
+    created_at: Optional[datetime] = None
+
+class InvoiceSummary(BaseModel):
+    """Columns needed for invoice tables, without items, notes or terms."""
+    id: str
+    invoice_number: str
+    client_id: str
+    client_name: Optional[str] = None
+    due_date: datetime
+    status: InvoiceStatus
+    total_amount: float
+    amount_paid: float = 0.0
+    created_at: Optional[datetime] = None
+
+class PaymentSummary(BaseModel):
+    """Columns needed for payment tables."""
+    id: str
+    invoice_id: str
+    amount: float
+    payment_date: datetime
+    status: PaymentStatus
+    created_at: Optional[datetime] = None
+
+class PaymentRecordResult(BaseModel):
+    """Outcome of recording a payment through the record_payment RPC."""
+    payment: Payment
+    invoice: InvoiceResponse
+    created: bool  # False when the transaction_id was already recorded
+
+class SearchResult(BaseModel):
+    """One ranked match returned by the search_records RPC."""
+    kind: SearchKind
+    id: str
+    title: str  # Client name or invoice number
+    subtitle: Optional[str] = None  # Client email or the invoice's client name
+    status: Optional[InvoiceStatus] = None  # Invoices only
+    client_id: Optional[str] = None
+    rank: float
+
 # Database table schemas (for Supabase table creation)
 CLIENT_TABLE_SCHEMA = {
     "table_name": "clients",
@@ -191,6 +261,8 @@ CLIENT_TABLE_SCHEMA = {
         "country": "varchar(100)",
         "tax_id": "varchar(50)",
         "is_active": "boolean DEFAULT true",
+        "total_invoices": "integer NOT NULL DEFAULT 0",
+        "total_amount_due": "decimal(12,2) NOT NULL DEFAULT 0",
         "created_at": "timestamp with time zone DEFAULT now()",
         "updated_at": "timestamp with time zone DEFAULT now()"
     }
@@ -212,6 +284,7 @@ INVOICE_TABLE_SCHEMA = {
         "tax_amount": "decimal(10,2) NOT NULL",
         "discount_amount": "decimal(10,2) DEFAULT 0.0",
         "total_amount": "decimal(10,2) NOT NULL",
+        "amount_paid": "decimal(12,2) NOT NULL DEFAULT 0",
         "items": "jsonb NOT NULL",
         "notes": "text",
         "terms": "text",
@@ -0,0 +1,138 @@
+"""Exact invoice totals for E-Invoicing application."""
+
+from functools import lru_cache
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, List, Dict, Any, Iterable, NamedTuple, Sequence, Tuple, Union
+
+# Tax rates are held as integer parts per million (0.0825 -> 82500)
+RATE_SCALE = 1_000_000
+
+Number = Union[int, float, str, Decimal]
+
+
+class TaxLine(NamedTuple):
+    """Tax charged at one rate on an invoice."""
+    rate: float
+    taxable: int  # cents
+    tax: int  # cents
+
+
+class InvoiceTotals(NamedTuple):
+    """Totals of one invoice in integer cents."""
+    subtotal: int
+    tax: int
+    discount: int
+    total: int
+    tax_lines: Tuple[TaxLine, ...]
+    
+    def as_columns(self) -> Dict[str, float]:
+        """Financial columns of the ``invoices`` row."""
+        return {
+            "subtotal": from_cents(self.subtotal),
+            "tax_amount": from_cents(self.tax),
+            "total_amount": from_cents(self.total)
+        }
+
+
+def to_cents(value: Number) -> int:
+    """
+    Convert an amount to integer cents, rounding half up.
+    
+    Floats are interpreted by their shortest decimal representation, so
+    ``0.285`` becomes 29 cents rather than the 28 its binary value implies.
+    """
+    if isinstance(value, float):
+        scaled = value * 100
+        nearest = round(scaled)
+        # Exact for amounts that already have at most two decimals
+        if abs(scaled - nearest) < 1e-6:
+            return int(nearest)
+        value = repr(value)
+    return int((Decimal(value) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> float:
+    """Convert integer cents to the float the API models expose."""
+    return cents / 100
+
+
+@lru_cache(maxsize=256)
+def rate_to_ppm(rate: Optional[Number]) -> int:
+    """Convert a tax rate fraction to integer parts per million."""
+    if not rate:
+        return 0
+    if isinstance(rate, float):
+        rate = repr(rate)
+    return int((Decimal(rate) * RATE_SCALE).to_integral_value(ROUND_HALF_UP))
+
+
+def _tax_for(taxable: int, ppm: int) -> int:
+    """Tax in cents on a taxable amount, rounded half up once per rate."""
+    return (taxable * ppm * 2 + RATE_SCALE) // (2 * RATE_SCALE)
+
+
+def calculate_totals(
+    items: Iterable[Any],
+    tax_rate: Optional[Number] = 0,
+    discount_amount: Optional[Number] = 0
+) -> InvoiceTotals:
+    """
+    Calculate the totals of one invoice.
+    
+    Args:
+        items: InvoiceItem models or item dicts
+        tax_rate: Invoice tax rate applied to lines without their own rate
+        discount_amount: Discount subtracted after tax
+    
+    Returns:
+        Invoice totals in cents
+    """
+    return calculate_totals_batch([(items, tax_rate, discount_amount)])[0]
+
+
+def calculate_totals_batch(
+    invoices: Sequence[Tuple[Iterable[Any], Optional[Number], Optional[Number]]]
+) -> List[InvoiceTotals]:
+    """
+    Calculate totals for many invoices in one pass.
+    
+    Rounding rules: every line total is rounded to cents; lines are grouped
+    by tax rate (a line's own ``tax_rate`` or the invoice rate) and tax is
+    rounded half up once per rate group; the discount is subtracted from
+    subtotal plus tax.
+    
+    Args:
+        invoices: (items, tax_rate, discount_amount) per invoice
+    
+    Returns:
+        Invoice totals in input order
+    """
+    results = []
+    for items, tax_rate, discount_amount in invoices:
+        invoice_ppm = rate_to_ppm(tax_rate)
+        taxable: Dict[int, int] = {}
+        for item in items:
+            if isinstance(item, dict):
+                total, item_rate = item["total"], item.get("tax_rate")
+            else:
+                total, item_rate = item.total, getattr(item, "tax_rate", None)
+            ppm = invoice_ppm if item_rate is None else rate_to_ppm(item_rate)
+            # Inlined fast path of to_cents() for amounts with at most two decimals
+            if type(total) is float:
+                scaled = total * 100
+                cents = round(scaled)
+                if abs(scaled - cents) >= 1e-6:
+                    cents = to_cents(total)
+            else:
+                cents = to_cents(total)
+            taxable[ppm] = taxable.get(ppm, 0) + cents
+        
+        tax_lines = tuple(
+            TaxLine(ppm / RATE_SCALE, amount, _tax_for(amount, ppm))
+            for ppm, amount in sorted(taxable.items())
+        )
+        subtotal = sum(taxable.values())
+        tax = sum(line.tax for line in tax_lines)
+        discount = to_cents(discount_amount) if discount_amount else 0
+        results.append(InvoiceTotals(subtotal, tax, discount, subtotal + tax - discount, tax_lines))
+    return results
@@ -0,0 +1,203 @@
+"""Scheduled overdue-invoice sweeper for E-Invoicing application."""
+
+import os
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from supabase import Client
+import redis
+from .supabase_client import get_service_role_client
+from .cache import EntityCache, get_entity_cache, REDIS_URL
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sweeper configuration
+OVERDUE_SWEEP_ENABLED: bool = os.getenv("OVERDUE_SWEEP_ENABLED", "true").lower() == "true"
+OVERDUE_SWEEP_INTERVAL: float = float(os.getenv("OVERDUE_SWEEP_INTERVAL", "300"))
+OVERDUE_SWEEP_BATCH_SIZE: int = int(os.getenv("OVERDUE_SWEEP_BATCH_SIZE", "1000"))
+OVERDUE_SWEEP_MAX_BATCHES: int = int(os.getenv("OVERDUE_SWEEP_MAX_BATCHES", "100"))
+OVERDUE_SWEEP_LOCK_KEY = "einv:locks:overdue-sweep"
+
+
+class OverdueSweeper:
+    """
+    Moves past-due ``sent`` invoices to ``overdue`` in bounded batches.
+    
+    Each batch is one call to the ``mark_overdue_invoices`` RPC, a single
+    set-based UPDATE. A Redis lock keeps the sweep to one replica per
+    interval; if Redis is unreachable the sweep runs anyway, which is safe
+    because the update is idempotent and skips locked rows.
+    """
+    
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        cache: Optional[EntityCache] = None,
+        redis_url: Optional[str] = REDIS_URL,
+        interval: float = OVERDUE_SWEEP_INTERVAL,
+        batch_size: int = OVERDUE_SWEEP_BATCH_SIZE,
+        max_batches: int = OVERDUE_SWEEP_MAX_BATCHES
+    ):
+        """
+        Initialize the sweeper.
+        
+        Args:
+            client: Optional Supabase client instance. If not provided, a
+                   service role client is created on first use.
+            cache: Optional entity cache to invalidate. If not provided,
+                   will use the process-wide cache.
+            redis_url: Redis URL for the cross-replica lock, or None to run
+                      without a lock
+            interval: Seconds between sweeps
+            batch_size: Maximum invoices updated per RPC call
+            max_batches: Maximum RPC calls per sweep
+        """
+        self.client = client
+        self.cache = cache or get_entity_cache()
+        self.redis_url = redis_url
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._redis: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            "runs": 0,
+            "skipped_runs": 0,
+            "failed_runs": 0,
+            "invoices_marked": 0,
+            "last_run_at": None,
+            "last_run_marked": None,
+            "last_run_batches": None,
+            "last_run_ms": None,
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get sweep counters and timings.
+        
+        Returns:
+            Dict with run counts, totals and the last run's results
+        """
+        return dict(self._stats)
+    
+    def sweep(self) -> Dict[str, Any]:
+        """
+        Run one sweep if no other replica holds the lock.
+        
+        Returns:
+            Dict with ``marked``, ``batches``, ``duration_ms`` and ``skipped``
+        """
+        if not self._try_lock():
+            self._stats["skipped_runs"] += 1
+            logger.debug("Overdue sweep skipped, another replica holds the lock")
+            return {"marked": 0, "batches": 0, "duration_ms": 0.0, "skipped": True}
+        
+        started = time.perf_counter()
+        marked = 0
+        batches = 0
+        try:
+            client = self._get_client()
+            while batches < self.max_batches:
+                response = client.rpc(
+                    "mark_overdue_invoices",
+                    {"p_batch_size": self.batch_size}
+                ).execute()
+                rows = response.data or []
+                batches += 1
+                marked += len(rows)
+                
+                self.cache.invalidate("invoice", *{row["id"] for row in rows})
+                self.cache.invalidate("client", *{row["client_id"] for row in rows})
+                
+                if len(rows) < self.batch_size:
+                    break
+        except Exception as e:
+            self._stats["failed_runs"] += 1
+            logger.error(f"Overdue sweep failed after {batches} batches: {e}")
+        
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._stats["runs"] += 1
+        self._stats["invoices_marked"] += marked
+        self._stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        self._stats["last_run_marked"] = marked
+        self._stats["last_run_batches"] = batches
+        self._stats["last_run_ms"] = duration_ms
+        
+        logger.info(f"Overdue sweep marked {marked} invoices in {batches} batches ({duration_ms} ms)")
+        return {"marked": marked, "batches": batches, "duration_ms": duration_ms, "skipped": False}
+    
+    async def run(self) -> None:
+        """Sweep every ``interval`` seconds until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"Overdue sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+    
+    def start(self) -> None:
+        """Start the background sweep task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+            logger.info(f"Overdue sweeper started (interval {self.interval}s)")
+    
+    async def stop(self) -> None:
+        """Cancel the background sweep task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    # Helper methods
+    def _get_client(self) -> Client:
+        if self.client is None:
+            self.client = get_service_role_client()
+        return self.client
+    
+    def _try_lock(self) -> bool:
+        """Return False only if another replica already swept this interval."""
+        if not self.redis_url:
+            return True
+        try:
+            if self._redis is None:
+                self._redis = redis.Redis.from_url(
+                    self.redis_url,
+                    socket_connect_timeout=0.5,
+                    socket_timeout=0.5
+                )
+            # The lock is never released; it expires just before the next
+            # interval, so exactly one replica sweeps per interval
+            return bool(self._redis.set(
+                OVERDUE_SWEEP_LOCK_KEY,
+                str(os.getpid()),
+                nx=True,
+                px=int(max(1.0, self.interval * 0.9) * 1000)
+            ))
+        except Exception as e:
+            logger.warning(f"Overdue sweep lock unavailable, sweeping without it: {e}")
+            return True
+
+
+# Global overdue sweeper instance
+overdue_sweeper: Optional[OverdueSweeper] = None
+
+
+def get_overdue_sweeper() -> OverdueSweeper:
+    """
+    Get or create the global overdue sweeper instance.
+    
+    Returns:
+        OverdueSweeper: Sweeper started by the application lifespan
+    """
+    global overdue_sweeper
+    
+    if overdue_sweeper is None:
+        overdue_sweeper = OverdueSweeper()
+    
+    return overdue_sweeper
+
@@ -0,0 +1,234 @@
+"""Offset and keyset pagination helpers for E-Invoicing list queries."""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, List, Any, Dict, Tuple, Callable, Type
+from pydantic import BaseModel
+from .models import PaginatedResponse
+
+# Columns every fieldset includes so keyset cursors can always be built
+KEYSET_COLUMNS = ("id", "created_at")
+
+# Supported values for the ``count`` argument of list queries.
+# None skips counting entirely; "planned"/"estimated" use planner statistics
+# instead of a full scan.
+COUNT_MODES = ("exact", "planned", "estimated")
+
+
+def validate_count_mode(count: Optional[str]) -> Optional[str]:
+    """
+    Validate a count mode for a PostgREST select.
+
+    Args:
+        count: One of COUNT_MODES or None
+
+    Returns:
+        The count mode unchanged
+
+    Raises:
+        ValueError: If the count mode is not supported
+    """
+    if count is not None and count not in COUNT_MODES:
+        raise ValueError(f"Invalid count mode '{count}', expected one of {', '.join(COUNT_MODES)}")
+    return count
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """
+    Encode the keyset position of a row as an opaque cursor.
+
+    Args:
+        row: Row containing ``created_at`` and ``id``
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Args:
+        cursor: Opaque cursor string
+
+    Both values end up in a PostgREST filter, so the timestamp must parse as
+    ISO 8601 and the id as a UUID; anything else is rejected rather than
+    passed through.
+
+    Returns:
+        Tuple of (created_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        datetime.fromisoformat(created_at)
+        return created_at, str(uuid.UUID(row_id))
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def apply_pagination(
+    query,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    keyset: bool = False
+):
+    """
+    Apply ordering and pagination to a PostgREST select query.
+
+    Keyset mode pages on ``(created_at, id)`` descending and fetches one
+    extra row to detect whether a next page exists, so the cost of a page
+    does not depend on how deep it is.
+
+    Args:
+        query: PostgREST select query builder
+        skip: Number of records to skip (offset mode only)
+        limit: Maximum number of records to return
+        cursor: Cursor of the previous page (implies keyset mode)
+        keyset: Whether to use keyset pagination
+
+    Returns:
+        The query with ordering and pagination applied
+    """
+    if not (keyset or cursor):
+        return query.range(skip, skip + limit - 1).order("created_at", desc=True)
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # The redundant upper bound becomes the index condition; without it
+        # the OR below is only a filter and the scan walks every newer row.
+        query = query.lte("created_at", created_at).or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt.{row_id})'
+        )
+
+    return query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+
+
+def row_factory(
+    model: Type[BaseModel],
+    trusted: bool = False,
+    columns: Optional[List[str]] = None
+) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Get a converter from database rows to list items.
+
+    Trusted rows come straight from PostgREST, whose column types already
+    match the models, so the fast path skips validation and only projects
+    each row onto the model's fields. The result is a plain dict that a
+    JSON response can serialize directly.
+
+    Args:
+        model: Pydantic model describing the items
+        trusted: Whether to skip validation
+        columns: Columns to project onto instead of the model's fields
+
+    Returns:
+        Callable converting a row into a model instance or a dict
+    """
+    if not trusted:
+        return lambda row: model(**row)
+
+    names = tuple(columns or model.model_fields)
+    return lambda row: {name: row.get(name) for name in names}
+
+
+def list_projection(
+    model: Type[BaseModel],
+    summary_model: Type[BaseModel],
+    fields: Optional[str] = None,
+    trusted: bool = False
+) -> Tuple[str, Callable[[Dict[str, Any]], Any]]:
+    """
+    Resolve a ``fields`` parameter into a select clause and a row converter.
+
+    Args:
+        model: Full item model
+        summary_model: Lightweight item model used for ``fields="summary"``
+        fields: None for all columns, ``"summary"``, or a comma-separated
+               list of columns from either model
+        trusted: Whether to skip validation (see row_factory())
+
+    Returns:
+        Tuple of (PostgREST select clause, row converter). Custom fieldsets
+        yield plain dicts with just the requested columns.
+
+    Raises:
+        ValueError: If a requested column is not part of the models
+    """
+    if not fields:
+        return "*", row_factory(model, trusted)
+
+    if fields == "summary":
+        columns = list(summary_model.model_fields)
+        return ",".join(columns), row_factory(summary_model, trusted)
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    allowed = set(model.model_fields) | set(summary_model.model_fields)
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    columns = list(dict.fromkeys([*KEYSET_COLUMNS, *requested]))
+    return ",".join(columns), row_factory(model, trusted=True, columns=columns)
+
+
+def build_page(
+    rows: List[Dict[str, Any]],
+    item_factory: Callable[[Dict[str, Any]], Any],
+    skip: int,
+    limit: int,
+    total: Optional[int] = None,
+    cursor: Optional[str] = None,
+    keyset: bool = False,
+    trusted: bool = False
+) -> PaginatedResponse:
+    """
+    Build a paginated response from the rows of a paginated query.
+
+    Args:
+        rows: Rows returned by a query built with apply_pagination()
+        item_factory: Callable converting a row into a response item
+        skip: Number of records skipped (offset mode only)
+        limit: Maximum number of records requested
+        total: Total row count, if it was requested
+        cursor: Cursor of the current page (implies keyset mode)
+        keyset: Whether keyset pagination was used
+        trusted: Skip validation of the page envelope (see row_factory())
+
+    Returns:
+        Paginated response; ``next_cursor`` is set in keyset mode when more
+        rows are available
+    """
+    pages = (total + limit - 1) // limit if total is not None else None
+    page_model = PaginatedResponse.model_construct if trusted else PaginatedResponse
+
+    if not (keyset or cursor):
+        return page_model(
+            items=[item_factory(row) for row in rows],
+            total=total,
+            page=(skip // limit) + 1,
+            per_page=limit,
+            pages=pages
+        )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return page_model(
+        items=[item_factory(row) for row in rows],
+        total=total,
+        page=None,
+        per_page=limit,
+        pages=pages,
+        next_cursor=encode_cursor(rows[-1]) if has_more and rows else None
+    )
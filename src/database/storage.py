@@ -1,15 +1,42 @@
 """Supabase Storage service for E-Invoicing application."""
 
 import os
+import time
+import base64
+import asyncio
+import shutil
+import tempfile
 import mimetypes
-from typing import Optional, Dict, Any, List
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from io import BufferedReader, FileIO
+from typing import Optional, Dict, Any, List, BinaryIO, Iterator, AsyncIterator, Callable, Tuple
 from pathlib import Path
+import httpx
+from fastapi.responses import StreamingResponse
 from supabase import Client
 from .supabase_client import get_supabase_client
+from ..utils.metrics import instrumented
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Supabase's resumable endpoint requires 6 MB chunks (except the last one)
+RESUMABLE_CHUNK_SIZE = 6 * 1024 * 1024
+RESUMABLE_MAX_RETRIES = 3
+
+# Objects at or above this size use the resumable upload protocol
+RESUMABLE_UPLOAD_THRESHOLD: int = int(os.getenv("STORAGE_RESUMABLE_THRESHOLD", str(20 * 1024 * 1024)))
+STREAM_CHUNK_SIZE = 256 * 1024
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # in-memory buffer before spilling to a temp file
+
+# Batch operation tuning
+STORAGE_BATCH_CONCURRENCY: int = int(os.getenv("STORAGE_BATCH_CONCURRENCY", "8"))
+STORAGE_BATCH_MAX_RETRIES: int = int(os.getenv("STORAGE_BATCH_MAX_RETRIES", "2"))
+STORAGE_BATCH_RETRY_DELAY = 0.5
+STORAGE_BATCH_PATH_LIMIT = 1000  # paths per remove/sign request accepted by the storage API
+
+@instrumented("storage")
 class StorageService:
     """Service class for handling Supabase Storage operations."""
     
@@ -36,29 +63,38 @@ class StorageService:
         Returns:
             Dict[str, bool]: Status of bucket creation for each bucket
         """
+        # List once; a failure here means no bucket can be verified
+        try:
+            existing_buckets = {b.name for b in self.client.storage.list_buckets()}
+        except Exception as e:
+            logger.error(f"Failed to list storage buckets: {e}")
+            return {bucket_name: False for bucket_name in self.buckets.values()}
+        
         results = {}
+        missing = []
+        for bucket_name in self.buckets.values():
+            if bucket_name in existing_buckets:
+                results[bucket_name] = True
+                logger.info(f"Storage bucket already exists: {bucket_name}")
+            else:
+                missing.append(bucket_name)
         
-        for bucket_type, bucket_name in self.buckets.items():
+        def create(bucket_name: str) -> bool:
             try:
-                # Check if bucket already exists
-                existing_buckets = self.client.storage.list_buckets()
-                bucket_exists = any(b.name == bucket_name for b in existing_buckets)
-                
-                if not bucket_exists:
-                    # Create bucket with public access for easy development
-                    response = self.client.storage.create_bucket(
-                        bucket_name,
-                        options={"public": True}
-                    )
-                    results[bucket_name] = True
-                    logger.info(f"Created storage bucket: {bucket_name}")
-                else:
-                    results[bucket_name] = True
-                    logger.info(f"Storage bucket already exists: {bucket_name}")
-                    
+                # Create bucket with public access for easy development
+                self.client.storage.create_bucket(
+                    bucket_name,
+                    options={"public": True}
+                )
+                logger.info(f"Created storage bucket: {bucket_name}")
+                return True
             except Exception as e:
                 logger.error(f"Failed to create bucket {bucket_name}: {e}")
-                results[bucket_name] = False
+                return False
+        
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                results.update(zip(missing, pool.map(create, missing)))
                 
         return results
     
@@ -99,23 +135,97 @@ class StorageService:
             # Create storage path
             storage_path = f"{folder}/{file_name}" if folder else file_name
             
-            # Read file content
-            with open(file_path, 'rb') as file:
-                file_content = file.read()
-            
             # Get MIME type
             mime_type, _ = mimetypes.guess_type(file_path)
             if not mime_type:
                 mime_type = 'application/octet-stream'
             
-            # Upload file
+            # Stream the file from disk instead of reading it into memory
+            with open(file_path, 'rb') as file:
+                return self.upload_fileobj(
+                    bucket_type,
+                    file,
+                    storage_path,
+                    size=os.path.getsize(file_path),
+                    content_type=mime_type
+                )
+                
+        except Exception as e:
+            logger.error(f"Error uploading file {file_path}: {e}")
+            return None
+    
+    def upload_fileobj(
+        self,
+        bucket_type: str,
+        file_obj: BinaryIO,
+        storage_path: str,
+        size: Optional[int] = None,
+        content_type: str = 'application/octet-stream',
+        upsert: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload a binary file-like object without buffering it in memory.
+        
+        Open files below RESUMABLE_UPLOAD_THRESHOLD are streamed in a single
+        request; larger objects use the resumable protocol. Streams of
+        unknown length are first spooled to a temporary file.
+        
+        Args:
+            bucket_type: Type of bucket ('invoices', 'receipts', 'templates', 'exports')
+            file_obj: Binary file-like object positioned at the start of the data
+            storage_path: Destination path within the bucket
+            size: Number of bytes to upload, if known; data past it is not
+                  uploaded and a shorter object fails the upload
+            content_type: MIME type stored with the object
+            upsert: Whether to overwrite an existing object
+            
+        Returns:
+            Dict with upload result information or None if failed
+        """
+        if bucket_type not in self.buckets:
+            logger.error(f"Invalid bucket type: {bucket_type}")
+            return None
+            
+        bucket_name = self.buckets[bucket_type]
+        
+        try:
+            if size is None:
+                size = _remaining_size(file_obj)
+            
+            if size is None:
+                with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+                    shutil.copyfileobj(file_obj, spool, STREAM_CHUNK_SIZE)
+                    size = spool.tell()
+                    spool.seek(0)
+                    return self.upload_resumable(
+                        bucket_type, spool, storage_path, size, content_type, upsert
+                    )
+            
+            if size >= RESUMABLE_UPLOAD_THRESHOLD:
+                return self.upload_resumable(
+                    bucket_type, file_obj, storage_path, size, content_type, upsert
+                )
+            
+            # httpx streams real file handles to EOF, so only hand one over
+            # when it holds exactly ``size`` bytes; otherwise read them once
+            if isinstance(file_obj, (BufferedReader, FileIO)) and _remaining_size(file_obj) == size:
+                file = file_obj
+            else:
+                file = file_obj.read(size)
+                if len(file) < size:
+                    raise IOError(f"Expected {size} bytes but only {len(file)} were available")
+            
+            file_options = {
+                "content-type": content_type,
+                "cache-control": "3600"
+            }
+            if upsert:
+                file_options["upsert"] = "true"
+            
             response = self.client.storage.from_(bucket_name).upload(
                 path=storage_path,
-                file=file_content,
-                file_options={
-                    "content-type": mime_type,
-                    "cache-control": "3600"
-                }
+                file=file,
+                file_options=file_options
             )
             
             if response.path:
@@ -126,8 +236,8 @@ class StorageService:
                     "success": True,
                     "bucket": bucket_name,
                     "path": storage_path,
-                    "size": len(file_content),
-                    "mime_type": mime_type,
+                    "size": size,
+                    "mime_type": content_type,
                     "public_url": public_url
                 }
                 logger.info(f"Successfully uploaded file: {storage_path}")
@@ -137,7 +247,123 @@ class StorageService:
                 return None
                 
         except Exception as e:
-            logger.error(f"Error uploading file {file_path}: {e}")
+            logger.error(f"Error uploading file {storage_path}: {e}")
+            return None
+    
+    async def upload_stream(
+        self,
+        bucket_type: str,
+        chunks: AsyncIterator[bytes],
+        storage_path: str,
+        content_type: str = 'application/octet-stream',
+        upsert: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload data produced by an async iterator, e.g. ``request.stream()``.
+        
+        Chunks are spooled into a temporary file that only keeps
+        SPOOL_MAX_MEMORY bytes in memory; the upload itself runs in a
+        worker thread so the event loop is never blocked.
+        
+        Args:
+            bucket_type: Type of bucket
+            chunks: Async iterator of byte chunks
+            storage_path: Destination path within the bucket
+            content_type: MIME type stored with the object
+            upsert: Whether to overwrite an existing object
+            
+        Returns:
+            Dict with upload result information or None if failed
+        """
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+            async for chunk in chunks:
+                spool.write(chunk)
+            size = spool.tell()
+            spool.seek(0)
+            
+            return await asyncio.to_thread(
+                self.upload_fileobj, bucket_type, spool, storage_path, size, content_type, upsert
+            )
+    
+    def upload_resumable(
+        self,
+        bucket_type: str,
+        file_obj: BinaryIO,
+        storage_path: str,
+        size: int,
+        content_type: str = 'application/octet-stream',
+        upsert: bool = False,
+        chunk_size: int = RESUMABLE_CHUNK_SIZE
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload a file-like object with the TUS resumable upload protocol.
+        
+        Only one chunk is held in memory at a time. A failed chunk is
+        retried after asking the server for its current offset, so large
+        uploads survive transient network errors without starting over.
+        
+        Args:
+            bucket_type: Type of bucket ('invoices', 'receipts', 'templates', 'exports')
+            file_obj: Binary file-like object positioned at the start of the data
+            storage_path: Destination path within the bucket
+            size: Total number of bytes to upload
+            content_type: MIME type stored with the object
+            upsert: Whether to overwrite an existing object
+            chunk_size: Bytes per PATCH request
+            
+        Returns:
+            Dict with upload result information or None if failed
+        """
+        if bucket_type not in self.buckets:
+            logger.error(f"Invalid bucket type: {bucket_type}")
+            return None
+            
+        bucket_name = self.buckets[bucket_type]
+        
+        try:
+            metadata = {
+                "bucketName": bucket_name,
+                "objectName": storage_path,
+                "contentType": content_type,
+                "cacheControl": "3600"
+            }
+            create_response = self._http_client().post(
+                f"{self.client.storage_url}/upload/resumable",
+                headers={
+                    "Tus-Resumable": "1.0.0",
+                    "Upload-Length": str(size),
+                    "Upload-Metadata": ",".join(
+                        f"{key} {base64.b64encode(value.encode()).decode()}"
+                        for key, value in metadata.items()
+                    ),
+                    "x-upsert": "true" if upsert else "false"
+                }
+            )
+            create_response.raise_for_status()
+            upload_url = create_response.headers["Location"]
+            
+            offset = 0
+            start = file_obj.tell() if hasattr(file_obj, "tell") else 0
+            while offset < size:
+                chunk = file_obj.read(min(chunk_size, size - offset))
+                if not chunk:
+                    raise IOError(f"Unexpected end of data at byte {offset} of {size}")
+                offset = self._patch_resumable_chunk(upload_url, chunk, offset)
+                if hasattr(file_obj, "seek"):
+                    file_obj.seek(start + offset)
+            
+            logger.info(f"Successfully uploaded file (resumable): {storage_path}")
+            return {
+                "success": True,
+                "bucket": bucket_name,
+                "path": storage_path,
+                "size": size,
+                "mime_type": content_type,
+                "public_url": self.client.storage.from_(bucket_name).get_public_url(storage_path)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error uploading file {storage_path} (resumable): {e}")
             return None
     
     def download_file(
@@ -164,24 +390,102 @@ class StorageService:
         bucket_name = self.buckets[bucket_type]
         
         try:
-            # Download file
-            response = self.client.storage.from_(bucket_name).download(file_path)
-            
             if local_path:
-                # Save to local file
-                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                # Stream to a local file chunk by chunk
+                os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
                 with open(local_path, 'wb') as f:
-                    f.write(response)
+                    for chunk in self.iter_download(bucket_type, file_path):
+                        f.write(chunk)
                 logger.info(f"Downloaded file to: {local_path}")
                 return local_path
             else:
                 # Return content
-                return response
+                return self.client.storage.from_(bucket_name).download(file_path)
                 
         except Exception as e:
             logger.error(f"Error downloading file {file_path}: {e}")
             return None
     
+    def iter_download(
+        self,
+        bucket_type: str,
+        file_path: str,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Stream a stored object in chunks.
+        
+        Args:
+            bucket_type: Type of bucket
+            file_path: Path to file in storage
+            chunk_size: Bytes per yielded chunk
+            
+        Yields:
+            Chunks of the object body
+            
+        Raises:
+            ValueError: If the bucket type is invalid
+            httpx.HTTPStatusError: If the object cannot be downloaded
+        """
+        if bucket_type not in self.buckets:
+            raise ValueError(f"Invalid bucket type: {bucket_type}")
+        
+        url = self._object_url(self.buckets[bucket_type], file_path)
+        with self._http_client().stream("GET", url) as response:
+            response.raise_for_status()
+            yield from response.iter_bytes(chunk_size)
+    
+    def stream_download_response(
+        self,
+        bucket_type: str,
+        file_path: str,
+        download_name: Optional[str] = None
+    ) -> Optional[StreamingResponse]:
+        """
+        Build a FastAPI response that relays a stored object without buffering it.
+        
+        Args:
+            bucket_type: Type of bucket
+            file_path: Path to file in storage
+            download_name: Optional filename for a Content-Disposition attachment
+            
+        Returns:
+            StreamingResponse or None if the object is missing or unreadable
+        """
+        if bucket_type not in self.buckets:
+            logger.error(f"Invalid bucket type: {bucket_type}")
+            return None
+        
+        http = self._http_client()
+        try:
+            request = http.build_request("GET", self._object_url(self.buckets[bucket_type], file_path))
+            response = http.send(request, stream=True)
+            if response.status_code >= 400:
+                response.close()
+                logger.error(f"Error streaming file {file_path}: HTTP {response.status_code}")
+                return None
+        except Exception as e:
+            logger.error(f"Error streaming file {file_path}: {e}")
+            return None
+        
+        headers = {}
+        if "content-length" in response.headers:
+            headers["Content-Length"] = response.headers["content-length"]
+        if download_name:
+            headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+        
+        def body() -> Iterator[bytes]:
+            try:
+                yield from response.iter_bytes(STREAM_CHUNK_SIZE)
+            finally:
+                response.close()
+        
+        return StreamingResponse(
+            body(),
+            media_type=response.headers.get("content-type", "application/octet-stream"),
+            headers=headers
+        )
+    
     def delete_file(self, bucket_type: str, file_path: str) -> bool:
         """
         Delete a file from storage.
@@ -281,6 +585,314 @@ class StorageService:
         except Exception as e:
             logger.error(f"Error getting file URL for {file_path}: {e}")
             return None
+    
+    # Batch operations
+    def upload_many(
+        self,
+        bucket_type: str,
+        files: List[Tuple[str, str]],
+        concurrency: int = STORAGE_BATCH_CONCURRENCY,
+        retries: int = STORAGE_BATCH_MAX_RETRIES
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload several local files concurrently.
+        
+        Args:
+            bucket_type: Type of bucket
+            files: List of (local file path, storage path) tuples
+            concurrency: Maximum number of uploads in flight
+            retries: Retries per file after the first attempt
+            
+        Returns:
+            Per-file results in input order, each with ``path``, ``success``,
+            ``attempts``, ``result`` (the upload_file() dict) and ``error``
+        """
+        storage_paths = [storage_path for _, storage_path in files]
+        if bucket_type not in self.buckets:
+            logger.error(f"Invalid bucket type: {bucket_type}")
+            return [_batch_result(path, 0, error="Invalid bucket type") for path in storage_paths]
+        
+        outcomes = _run_with_retries(
+            files,
+            lambda item: self.upload_file(bucket_type, item[0], item[1]),
+            concurrency,
+            retries
+        )
+        return [
+            _batch_result(path, attempts, result, error)
+            for path, (attempts, result, error) in zip(storage_paths, outcomes)
+        ]
+    
+    def download_many(
+        self,
+        bucket_type: str,
+        file_paths: List[str],
+        local_dir: Optional[str] = None,
+        concurrency: int = STORAGE_BATCH_CONCURRENCY,
+        retries: int = STORAGE_BATCH_MAX_RETRIES
+    ) -> List[Dict[str, Any]]:
+        """
+        Download several files concurrently.
+        
+        Args:
+            bucket_type: Type of bucket
+            file_paths: Paths to files in storage
+            local_dir: Optional directory to stream the files into, keeping
+                      their storage paths. If not provided, contents are
+                      returned as bytes.
+            concurrency: Maximum number of downloads in flight
+            retries: Retries per file after the first attempt
+            
+        Returns:
+            Per-file results in input order; ``result`` is the local path or
+            the file content. Paths that would land outside ``local_dir``
+            are not downloaded and reported as failures.
+        """
+        if bucket_type not in self.buckets:
+            logger.error(f"Invalid bucket type: {bucket_type}")
+            return [_batch_result(path, 0, error="Invalid bucket type") for path in file_paths]
+        
+        local_paths = {path: _local_path(local_dir, path) for path in file_paths} if local_dir else {}
+        allowed = [path for path in file_paths if not local_dir or local_paths[path]]
+        
+        def download(file_path: str):
+            return self.download_file(bucket_type, file_path, local_paths.get(file_path))
+        
+        outcomes = dict(zip(allowed, _run_with_retries(allowed, download, concurrency, retries)))
+        results = []
+        for path in file_paths:
+            if path not in outcomes:
+                logger.error(f"Refusing to download {path} outside {local_dir}")
+                results.append(_batch_result(path, 0, error="Path escapes local_dir"))
+            else:
+                attempts, result, error = outcomes[path]
+                results.append(_batch_result(path, attempts, result, error))
+        return results
+    
+    def delete_many(
+        self,
+        bucket_type: str,
+        file_paths: List[str],
+        concurrency: int = STORAGE_BATCH_CONCURRENCY,
+        retries: int = STORAGE_BATCH_MAX_RETRIES
+    ) -> List[Dict[str, Any]]:
+        """
+        Delete several files with multi-path remove requests.
+        
+        Paths are sent in chunks of STORAGE_BATCH_PATH_LIMIT, so a thousand
+        files cost one round trip instead of a thousand.
+        
+        Args:
+            bucket_type: Type of bucket
+            file_paths: Paths to files in storage
+            concurrency: Maximum number of remove requests in flight
+            retries: Retries per request after the first attempt
+            
+        Returns:
+            Per-file results in input order; files that did not exist are
+            reported as failures
+        """
+        if bucket_type not in self.buckets:
+            logger.error(f"Invalid bucket type: {bucket_type}")
+            return [_batch_result(path, 0, error="Invalid bucket type") for path in file_paths]
+        
+        bucket = self.client.storage.from_(self.buckets[bucket_type])
+        chunks = _chunk_paths(file_paths)
+        outcomes = _run_with_retries(chunks, bucket.remove, concurrency, retries)
+        
+        results = []
+        for chunk, (attempts, removed, error) in zip(chunks, outcomes):
+            deleted = {item.get("name") for item in removed or []}
+            for path in chunk:
+                if error:
+                    results.append(_batch_result(path, attempts, error=error))
+                elif path in deleted:
+                    results.append(_batch_result(path, attempts, True))
+                else:
+                    results.append(_batch_result(path, attempts, error="File not found"))
+        
+        logger.info(f"Deleted {sum(r['success'] for r in results)} of {len(file_paths)} files from {bucket_type}")
+        return results
+    
+    def sign_many(
+        self,
+        bucket_type: str,
+        file_paths: List[str],
+        expires_in: int = 3600,
+        concurrency: int = STORAGE_BATCH_CONCURRENCY,
+        retries: int = STORAGE_BATCH_MAX_RETRIES
+    ) -> List[Dict[str, Any]]:
+        """
+        Create signed URLs for several files with multi-path sign requests.
+        
+        Args:
+            bucket_type: Type of bucket
+            file_paths: Paths to files in storage
+            expires_in: Seconds until the URLs expire
+            concurrency: Maximum number of sign requests in flight
+            retries: Retries per request after the first attempt
+            
+        Returns:
+            Per-file results in input order; ``result`` is the signed URL
+        """
+        if bucket_type not in self.buckets:
+            logger.error(f"Invalid bucket type: {bucket_type}")
+            return [_batch_result(path, 0, error="Invalid bucket type") for path in file_paths]
+        
+        bucket = self.client.storage.from_(self.buckets[bucket_type])
+        chunks = _chunk_paths(file_paths)
+        outcomes = _run_with_retries(
+            chunks,
+            lambda chunk: bucket.create_signed_urls(chunk, expires_in),
+            concurrency,
+            retries
+        )
+        
+        results = []
+        for chunk, (attempts, signed, error) in zip(chunks, outcomes):
+            signed_by_path = {item.get("path"): item for item in signed or []}
+            for path in chunk:
+                item = signed_by_path.get(path)
+                if error:
+                    results.append(_batch_result(path, attempts, error=error))
+                elif item and item.get("signedURL") and not item.get("error"):
+                    results.append(_batch_result(path, attempts, item["signedURL"]))
+                else:
+                    results.append(_batch_result(path, attempts, error=(item or {}).get("error") or "File not found"))
+        
+        return results
+
+    
+    # Helper methods
+    def _http_client(self) -> httpx.Client:
+        """
+        HTTP client for storage endpoints the Supabase SDK does not wrap.
+        
+        This is the SDK's own storage session, so direct requests share its
+        pooled connections and auth headers.
+        """
+        return self.client.storage.session
+    
+    def _object_url(self, bucket_name: str, file_path: str) -> str:
+        """Authenticated object URL for direct HTTP access."""
+        return f"{self.client.storage_url}/object/{bucket_name}/{urllib.parse.quote(file_path)}"
+    
+    def _patch_resumable_chunk(self, upload_url: str, chunk: bytes, offset: int) -> int:
+        """Send one TUS chunk, resuming from the server offset on failure."""
+        for attempt in range(RESUMABLE_MAX_RETRIES + 1):
+            try:
+                response = self._http_client().patch(
+                    upload_url,
+                    content=chunk,
+                    headers={
+                        "Tus-Resumable": "1.0.0",
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream"
+                    }
+                )
+                response.raise_for_status()
+                return int(response.headers["Upload-Offset"])
+            except Exception as e:
+                if attempt == RESUMABLE_MAX_RETRIES:
+                    raise
+                logger.warning(f"Resumable chunk at offset {offset} failed, retrying: {e}")
+                time.sleep(2 ** attempt)
+                
+                # The server may have stored part of the chunk; continue from its offset
+                head = self._http_client().head(upload_url, headers={"Tus-Resumable": "1.0.0"})
+                head.raise_for_status()
+                server_offset = int(head.headers["Upload-Offset"])
+                chunk = chunk[server_offset - offset:]
+                offset = server_offset
+                if not chunk:
+                    return offset
+        return offset
+
+
+def _remaining_size(file_obj: BinaryIO) -> Optional[int]:
+    """Bytes left in a seekable file object, or None if it cannot seek."""
+    try:
+        position = file_obj.tell()
+        end = file_obj.seek(0, os.SEEK_END)
+        file_obj.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _local_path(local_dir: str, file_path: str) -> Optional[str]:
+    """Local target of a storage path under ``local_dir``, or None if it would escape it."""
+    root = os.path.realpath(local_dir)
+    target = os.path.realpath(os.path.join(root, file_path))
+    if os.path.commonpath([root, target]) != root or target == root:
+        return None
+    return target
+
+
+def _chunk_paths(file_paths: List[str]) -> List[List[str]]:
+    """Split paths into request-sized chunks."""
+    return [
+        file_paths[start:start + STORAGE_BATCH_PATH_LIMIT]
+        for start in range(0, len(file_paths), STORAGE_BATCH_PATH_LIMIT)
+    ]
+
+
+def _batch_result(
+    path: str,
+    attempts: int,
+    result: Any = None,
+    error: Optional[str] = None
+) -> Dict[str, Any]:
+    """Per-item result of a batch storage operation."""
+    return {
+        "path": path,
+        "success": error is None,
+        "attempts": attempts,
+        "result": result,
+        "error": error
+    }
+
+
+def _run_with_retries(
+    items: List[Any],
+    operation: Callable[[Any], Any],
+    concurrency: int,
+    retries: int
+) -> List[Tuple[int, Any, Optional[str]]]:
+    """
+    Run an operation for each item on a bounded thread pool.
+    
+    An attempt fails when the operation raises or returns None/False; failed
+    items are retried with exponential backoff.
+    
+    Args:
+        items: Items to process
+        operation: Callable applied to each item
+        concurrency: Maximum number of operations in flight
+        retries: Retries per item after the first attempt
+    
+    Returns:
+        (attempts, result, error) tuples in input order
+    """
+    if not items:
+        return []
+    
+    def run(item: Any) -> Tuple[int, Any, Optional[str]]:
+        error = None
+        for attempt in range(1, retries + 2):
+            try:
+                result = operation(item)
+                if result is not None and result is not False:
+                    return attempt, result, None
+                error = "Operation failed"
+            except Exception as e:
+                error = str(e)
+            if attempt <= retries:
+                time.sleep(STORAGE_BATCH_RETRY_DELAY * 2 ** (attempt - 1))
+        return retries + 1, None, error
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as pool:
+        return list(pool.map(run, items))
 
 
 # Global storage service instance
@@ -1,9 +1,15 @@
 """Supabase client configuration for E-Invoicing application."""
 
 import os
-from typing import Optional
-from supabase import create_client, Client
+import asyncio
+import threading
+from typing import Optional, Dict, List, Union
+import httpx
+from postgrest.utils import SyncClient as PostgrestSession, AsyncClient as AsyncPostgrestSession
+from storage3.utils import SyncClient as StorageSession, AsyncClient as AsyncStorageSession
+from supabase import create_client, Client, create_async_client, AsyncClient
 from dotenv import load_dotenv
+from ..utils.metrics import MeteredTransport, AsyncMeteredTransport
 
 # Load environment variables
 load_dotenv()
@@ -13,10 +19,236 @@ SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
 SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
-# Global Supabase client instance
+# HTTP pool configuration (one pool per role and API, shared by every service)
+SUPABASE_MAX_CONNECTIONS: int = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100"))
+SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+SUPABASE_KEEPALIVE_EXPIRY: float = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_HTTP_TIMEOUT: float = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "30"))
+SUPABASE_CONNECT_TIMEOUT: float = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_STORAGE_TIMEOUT: float = float(os.getenv("SUPABASE_STORAGE_TIMEOUT", "120"))
+SUPABASE_HTTP_RETRIES: int = int(os.getenv("SUPABASE_HTTP_RETRIES", "2"))  # connection failures only
+SUPABASE_HTTP2: bool = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+
+ANON_ROLE = "anon"
+SERVICE_ROLE = "service_role"
+
+
+class SupabaseClientManager:
+    """
+    Owns the Supabase clients and their HTTP connection pools.
+    
+    There is one sync and one async client per role (anon and service
+    role). Their PostgREST and Storage sessions are replaced with tuned
+    keep-alive pools, so every service using a role shares warm connections
+    and only the first request pays for the TLS handshake. The pools' metered
+    transports record every round trip for /metrics.
+    """
+    
+    def __init__(
+        self,
+        url: str = SUPABASE_URL,
+        anon_key: str = SUPABASE_KEY,
+        service_role_key: str = SUPABASE_SERVICE_ROLE_KEY
+    ):
+        """
+        Initialize the client manager.
+        
+        Args:
+            url: Supabase project URL
+            anon_key: Anon (public) API key
+            service_role_key: Service role API key for admin operations
+        """
+        self.url = url
+        self.keys = {ANON_ROLE: anon_key, SERVICE_ROLE: service_role_key}
+        self._clients: Dict[str, Client] = {}
+        self._async_clients: Dict[str, AsyncClient] = {}
+        self._sessions: List[Union[httpx.Client, httpx.AsyncClient]] = []
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+    
+    def get_client(self, role: str = ANON_ROLE) -> Client:
+        """
+        Get the shared sync client of a role, creating it on first use.
+        
+        Args:
+            role: ANON_ROLE or SERVICE_ROLE
+            
+        Returns:
+            Client: Supabase client using the role's pooled sessions
+            
+        Raises:
+            ValueError: If the URL or the role's key is not set
+            ConnectionError: If the client cannot be created
+        """
+        client = self._clients.get(role)
+        if client is not None:
+            return client
+        
+        key = self._require_key(role)
+        with self._lock:
+            if role not in self._clients:
+                try:
+                    client = create_client(self.url, key)
+                except Exception as e:
+                    raise ConnectionError(f"Failed to create Supabase {role} client: {str(e)}")
+                
+                client.postgrest.session = self._replace_session(
+                    client.postgrest.session, PostgrestSession, SUPABASE_HTTP_TIMEOUT
+                )
+                # The bucket API keeps its own reference to the session
+                client.storage.session = client.storage._client = self._replace_session(
+                    client.storage.session, StorageSession, SUPABASE_STORAGE_TIMEOUT
+                )
+                self._clients[role] = client
+            return self._clients[role]
+    
+    async def get_async_client(self, role: str = ANON_ROLE) -> AsyncClient:
+        """
+        Get the shared async client of a role, creating it on first use.
+        
+        Args:
+            role: ANON_ROLE or SERVICE_ROLE
+            
+        Returns:
+            AsyncClient: Async Supabase client using the role's pooled sessions
+            
+        Raises:
+            ValueError: If the URL or the role's key is not set
+            ConnectionError: If the client cannot be created
+        """
+        client = self._async_clients.get(role)
+        if client is not None:
+            return client
+        
+        key = self._require_key(role)
+        async with self._async_lock:
+            if role not in self._async_clients:
+                try:
+                    client = await create_async_client(self.url, key)
+                except Exception as e:
+                    raise ConnectionError(f"Failed to create async Supabase {role} client: {str(e)}")
+                
+                default_session = client.postgrest.session
+                client.postgrest.session = self._async_session(
+                    default_session, AsyncPostgrestSession, SUPABASE_HTTP_TIMEOUT
+                )
+                await default_session.aclose()
+                
+                default_session = client.storage.session
+                client.storage.session = client.storage._client = self._async_session(
+                    default_session, AsyncStorageSession, SUPABASE_STORAGE_TIMEOUT
+                )
+                await default_session.aclose()
+                
+                self._async_clients[role] = client
+            return self._async_clients[role]
+    
+    def settings(self) -> Dict[str, Union[int, float, bool]]:
+        """
+        Get the pool settings applied to every session.
+        
+        Returns:
+            Dict of pool sizes, timeouts and retry settings
+        """
+        return {
+            "max_connections": SUPABASE_MAX_CONNECTIONS,
+            "max_keepalive_connections": SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": SUPABASE_KEEPALIVE_EXPIRY,
+            "timeout": SUPABASE_HTTP_TIMEOUT,
+            "connect_timeout": SUPABASE_CONNECT_TIMEOUT,
+            "storage_timeout": SUPABASE_STORAGE_TIMEOUT,
+            "retries": SUPABASE_HTTP_RETRIES,
+            "http2": SUPABASE_HTTP2,
+        }
+    
+    async def aclose(self) -> None:
+        """Close every pooled session; clients are recreated on next use."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+            self._clients.clear()
+            self._async_clients.clear()
+        
+        for session in sessions:
+            try:
+                if isinstance(session, httpx.AsyncClient):
+                    await session.aclose()
+                else:
+                    session.close()
+            except Exception:
+                pass
+    
+    # Helper methods
+    def _require_key(self, role: str) -> str:
+        if role not in self.keys:
+            raise ValueError(f"Unknown Supabase role: {role}")
+        if not self.url or not self.keys[role]:
+            key_name = "SUPABASE_SERVICE_ROLE_KEY" if role == SERVICE_ROLE else "SUPABASE_KEY"
+            raise ValueError(
+                f"SUPABASE_URL and {key_name} environment variables must be set"
+            )
+        return self.keys[role]
+    
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+        )
+    
+    def _replace_session(self, default_session: httpx.Client, session_class, timeout: float) -> httpx.Client:
+        """Pooled copy of an SDK session, keeping its base URL and headers."""
+        session = session_class(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=httpx.Timeout(timeout, connect=SUPABASE_CONNECT_TIMEOUT),
+            transport=MeteredTransport(
+                http2=SUPABASE_HTTP2,
+                limits=self._limits(),
+                retries=SUPABASE_HTTP_RETRIES,
+            ),
+            follow_redirects=True,
+        )
+        default_session.close()
+        self._sessions.append(session)
+        return session
+    
+    def _async_session(self, default_session: httpx.AsyncClient, session_class, timeout: float) -> httpx.AsyncClient:
+        """Async variant of _replace_session(); the caller closes the SDK session."""
+        session = session_class(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=httpx.Timeout(timeout, connect=SUPABASE_CONNECT_TIMEOUT),
+            transport=AsyncMeteredTransport(
+                http2=SUPABASE_HTTP2,
+                limits=self._limits(),
+                retries=SUPABASE_HTTP_RETRIES,
+            ),
+            follow_redirects=True,
+        )
+        self._sessions.append(session)
+        return session
+
+
+# Global client manager and the default clients it hands out
+client_manager: Optional[SupabaseClientManager] = None
 supabase: Optional[Client] = None
 
 
+def get_client_manager() -> SupabaseClientManager:
+    """
+    Get or create the global Supabase client manager.
+    
+    Returns:
+        SupabaseClientManager: Manager closed by the application lifespan
+    """
+    global client_manager
+    
+    if client_manager is None:
+        client_manager = SupabaseClientManager()
+    
+    return client_manager
+
+
 def get_supabase_client() -> Client:
     """
     Get or create a Supabase client instance.
@@ -29,40 +261,58 @@ def get_supabase_client() -> Client:
     """
     global supabase
     
-    if supabase is not None:
-        return supabase
+    supabase = get_client_manager().get_client(ANON_ROLE)
+    return supabase
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """
+    Get or create the async Supabase client instance.
     
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError(
-            "SUPABASE_URL and SUPABASE_KEY environment variables must be set"
-        )
+    Every coroutine in the worker shares the client's pooled HTTP/2
+    sessions instead of opening new connections.
     
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-        return supabase
-    except Exception as e:
-        raise ConnectionError(f"Failed to create Supabase client: {str(e)}")
+    Returns:
+        AsyncClient: Configured async Supabase client
+        
+    Raises:
+        ValueError: If required environment variables are not set
+    """
+    return await get_client_manager().get_async_client(ANON_ROLE)
 
 
 def get_service_role_client() -> Client:
     """
     Get a Supabase client with service role key for admin operations.
     
+    The client is shared, so admin operations reuse warm connections.
+    
     Returns:
         Client: Supabase client with service role permissions
         
     Raises:
         ValueError: If service role key is not set
     """
-    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-        raise ValueError(
-            "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables must be set"
-        )
+    return get_client_manager().get_client(SERVICE_ROLE)
+
+
+async def get_async_service_role_client() -> AsyncClient:
+    """
+    Get the async Supabase client with the service role key.
     
-    try:
-        return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-    except Exception as e:
-        raise ConnectionError(f"Failed to create Supabase service role client: {str(e)}")
+    Returns:
+        AsyncClient: Async Supabase client with service role permissions
+        
+    Raises:
+        ValueError: If service role key is not set
+    """
+    return await get_client_manager().get_async_client(SERVICE_ROLE)
+
+
+async def close_supabase_clients() -> None:
+    """Close the pooled sessions of every Supabase client."""
+    if client_manager is not None:
+        await client_manager.aclose()
 
 
 def test_connection() -> bool:
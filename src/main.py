@@ -1,10 +1,14 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .routers.v1 import health
-from fastapi_limiter import FastAPILimiter
-from .database import get_supabase_client, test_connection, initialize_storage
-import redis.asyncio as redis
+from .routers.v1 import health, invoices, clients, payments, exports, jobs, search, metrics
+from .utils.metrics import MetricsMiddleware
+from .utils.rate_limiting import get_rate_limiter
+from .database import (
+    get_supabase_client, test_connection, initialize_storage, get_health_monitor,
+    get_overdue_sweeper, OVERDUE_SWEEP_ENABLED, get_document_renderer, close_supabase_clients,
+    LoaderScopeMiddleware
+)
 import os
 import logging
 
@@ -13,13 +17,10 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    try:
-        redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379")
-        redis_connection = redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
-        await FastAPILimiter.init(redis_connection)
+    # Buckets are local; Redis only shares usage across processes
+    rate_limiter = get_rate_limiter()
+    if await rate_limiter.ping():
         logger.info("Rate limiter initialized successfully")
-    except Exception as e:
-        logger.warning(f"Failed to initialize rate limiter: {e}")
     
     # Initialize Supabase client
     try:
@@ -45,11 +46,29 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize Supabase: {e}")
     
+    # Refresh dependency health in the background for /v1/health
+    health_monitor = get_health_monitor()
+    health_monitor.start()
+    
+    # Move past-due invoices to overdue on a schedule
+    overdue_sweeper = get_overdue_sweeper()
+    if OVERDUE_SWEEP_ENABLED:
+        overdue_sweeper.start()
+    
     yield
     
     # Shutdown
+    await overdue_sweeper.stop()
+    await health_monitor.stop()
+    
+    # Worker processes are only started by the first render
+    get_document_renderer().close()
+    
+    # Close the pooled Supabase connections last; background tasks are stopped
+    await close_supabase_clients()
+    
     try:
-        await FastAPILimiter.close()
+        await rate_limiter.close()
         logger.info("Rate limiter closed successfully")
     except Exception as e:
         logger.warning(f"Failed to close rate limiter: {e}")
@@ -71,5 +90,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency histograms by route template, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Batched client/invoice lookups are shared within one request only
+app.add_middleware(LoaderScopeMiddleware)
+
 # Include routers
-app.include_router(health.router, prefix="/v1", tags=["health"])
\ No newline at end of file
+app.include_router(health.router, prefix="/v1", tags=["health"])
+app.include_router(clients.router, prefix="/v1", tags=["clients"])
+app.include_router(invoices.router, prefix="/v1", tags=["invoices"])
+app.include_router(payments.router, prefix="/v1", tags=["payments"])
+app.include_router(exports.router, prefix="/v1", tags=["exports"])
+app.include_router(jobs.router, prefix="/v1", tags=["jobs"])
+app.include_router(search.router, prefix="/v1", tags=["search"])
+# Scrapers expect /metrics at the root
+app.include_router(metrics.router, tags=["metrics"])
\ No newline at end of file
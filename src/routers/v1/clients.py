@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ...utils.rate_limiting import moderate_rate_limit
+from ...utils.responses import FastJSONResponse
+from ...database import get_async_crud_service, AsyncCRUDService, PaginatedResponse
+from .dependencies import PaginationParams
+
+router = APIRouter()
+
+# List clients with offset or cursor pagination
+@router.get(
+    "/clients",
+    response_model=PaginatedResponse,
+    dependencies=[moderate_rate_limit()]
+)
+async def list_clients(
+    active_only: bool = True,
+    pagination: PaginationParams = Depends(),
+    crud: AsyncCRUDService = Depends(get_async_crud_service)
+):
+    try:
+        page = await crud.get_clients(
+            active_only=active_only,
+            trusted=True,
+            **pagination.as_kwargs()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Database rows are trusted: serialize them without re-validation
+    return FastJSONResponse(page)
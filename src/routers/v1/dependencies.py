@@ -0,0 +1,47 @@
+import asyncio
+from typing import Optional, Literal, Dict, Any
+from fastapi import HTTPException, Query
+from ...database import get_job_queue, Job
+
+
+class PaginationParams:
+    """Common offset/keyset pagination query parameters for list endpoints."""
+    
+    def __init__(
+        self,
+        skip: int = Query(0, ge=0, description="Records to skip (offset mode)"),
+        limit: int = Query(100, ge=1, le=500, description="Maximum records per page"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        keyset: bool = Query(False, description="Use cursor pagination on (created_at, id)"),
+        count: Literal["exact", "planned", "estimated", "none"] = Query(
+            "exact", description="How to compute the total; 'none' skips it"
+        ),
+        fields: Optional[str] = Query(
+            None, description="'summary' or comma-separated columns to return instead of all"
+        )
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.keyset = keyset
+        self.count = None if count == "none" else count
+        self.fields = fields
+    
+    def as_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for the CRUD list methods."""
+        return {
+            "skip": self.skip,
+            "limit": self.limit,
+            "cursor": self.cursor,
+            "keyset": self.keyset,
+            "count": self.count,
+            "fields": self.fields,
+        }
+
+
+async def enqueue_job(task: str, **kwargs) -> Job:
+    """Queue a background task, answering 503 when the queue is unreachable."""
+    job = await asyncio.to_thread(get_job_queue().enqueue, task, **kwargs)
+    if job is None:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    return job
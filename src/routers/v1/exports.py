@@ -0,0 +1,29 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from ...utils.rate_limiting import strict_rate_limit
+from ...database import get_export_service, ExportRequest, ExportJob
+from .dependencies import enqueue_job
+
+router = APIRouter()
+
+# Start an export; the work runs on the job queue so any replica can report on it
+@router.post(
+    "/exports",
+    response_model=ExportJob,
+    status_code=202,
+    dependencies=[strict_rate_limit()]
+)
+async def create_export(request: ExportRequest):
+    job = await asyncio.to_thread(get_export_service().create_job, request)
+    if not job:
+        raise HTTPException(status_code=503, detail="Export service unavailable")
+    await enqueue_job("exports.run", export_id=job.id)
+    return job
+
+# Poll export status and progress
+@router.get("/exports/{job_id}", response_model=ExportJob)
+def get_export(job_id: str):
+    job = get_export_service().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
@@ -1,6 +1,7 @@
+import asyncio
 from fastapi import APIRouter
-from ...utils.rate_limiting import lenient_rate_limit
-from ...database import get_supabase_client, test_connection, get_storage_service, get_crud_service
+from ...utils.rate_limiting import lenient_rate_limit, strict_rate_limit
+from ...database import get_entity_cache, get_health_monitor, get_overdue_sweeper
 
 router = APIRouter()
 
@@ -9,56 +10,22 @@ router = APIRouter()
 def read_root():
     return {"message": "API is running"}
 
-# Health endpoint should not have rate limiting for monitoring
+# Health endpoint should not have rate limiting for monitoring.
+# Served from the background monitor's snapshot, so probes never hit Supabase.
 @router.get("/health")
-def health_check():
-    health_status = {
-        "status": "ok",
-        "services": {
-            "api": "healthy"
-        }
-    }
+async def health_check():
+    health_status = get_health_monitor().snapshot()
     
-    # Check database connectivity
-    try:
-        supabase_client = get_supabase_client()
-        db_healthy = test_connection()
-        health_status["services"]["database"] = {
-            "status": "healthy" if db_healthy else "unhealthy",
-            "url": supabase_client.supabase_url
-        }
-    except Exception as e:
-        health_status["services"]["database"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    # Cache hit/miss counters (informational, never marks the API unhealthy)
+    health_status["services"]["cache"] = get_entity_cache().stats()
+    health_status["services"]["overdue_sweeper"] = get_overdue_sweeper().stats()
     
-    # Check storage service
-    try:
-        storage_service = get_storage_service()
-        # Test storage by listing buckets (this will fail if storage isn't working)
-        buckets = storage_service.client.storage.list_buckets()
-        bucket_names = [b.name for b in buckets] if buckets else []
-        
-        health_status["services"]["storage"] = {
-            "status": "healthy",
-            "buckets": bucket_names,
-            "bucket_types": list(storage_service.buckets.keys())
-        }
-    except Exception as e:
-        health_status["services"]["storage"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-    
-    # Update overall status based on services
-    unhealthy_services = [
-        name for name, service in health_status["services"].items() 
-        if isinstance(service, dict) and service.get("status") == "unhealthy"
-    ]
-    
-    if unhealthy_services:
-        health_status["status"] = "degraded"
-        health_status["unhealthy_services"] = unhealthy_services
-    
-    return health_status 
\ No newline at end of file
+    return health_status
+
+# Deep check probes every dependency now; rate limited because it is not cached
+@router.get("/health/deep", dependencies=[strict_rate_limit()])
+async def deep_health_check():
+    health_status = await asyncio.to_thread(get_health_monitor().check)
+    health_status["services"]["cache"] = get_entity_cache().stats()
+    health_status["services"]["overdue_sweeper"] = get_overdue_sweeper().stats()
+    return health_status
@@ -0,0 +1,103 @@
+import uuid
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from ...utils.rate_limiting import strict_rate_limit, moderate_rate_limit, BULK_REQUEST_COST
+from ...utils.responses import FastJSONResponse
+from ...database import (
+    get_async_crud_service, AsyncCRUDService,
+    InvoiceBatchCreate, InvoiceBatchResponse,
+    InvoiceStatus, PaginatedResponse,
+    get_document_renderer, PdfRenderRequest, PdfRenderResult, Job
+)
+from .dependencies import PaginationParams, enqueue_job
+
+router = APIRouter()
+
+# List invoices with offset or cursor pagination
+@router.get(
+    "/invoices",
+    response_model=PaginatedResponse,
+    dependencies=[moderate_rate_limit()]
+)
+async def list_invoices(
+    client_id: Optional[str] = None,
+    status: Optional[InvoiceStatus] = None,
+    pagination: PaginationParams = Depends(),
+    crud: AsyncCRUDService = Depends(get_async_crud_service)
+):
+    try:
+        page = await crud.get_invoices(
+            client_id=client_id,
+            status=status,
+            trusted=True,
+            **pagination.as_kwargs()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Database rows are trusted: serialize them without re-validation
+    return FastJSONResponse(page)
+
+# Bulk creation for ERP syncs; individual failures are reported per item
+@router.post(
+    "/invoices:batch",
+    response_model=InvoiceBatchResponse,
+    dependencies=[moderate_rate_limit(cost=BULK_REQUEST_COST)]
+)
+async def create_invoices_batch(
+    batch: InvoiceBatchCreate,
+    crud: AsyncCRUDService = Depends(get_async_crud_service)
+):
+    results = await crud.create_invoices_bulk(batch.invoices)
+    created = sum(1 for result in results if result.success)
+    
+    return InvoiceBatchResponse(
+        results=results,
+        created=created,
+        failed=len(results) - created
+    )
+
+# Queue bulk creation on the job queue; poll /v1/jobs/{id} for the per-item results
+@router.post(
+    "/invoices:batch-async",
+    response_model=Job,
+    status_code=202,
+    dependencies=[moderate_rate_limit(cost=BULK_REQUEST_COST)]
+)
+async def create_invoices_batch_async(batch: InvoiceBatchCreate):
+    return await enqueue_job("invoices.create_bulk", invoices=batch.invoices, import_id=str(uuid.uuid4()))
+
+# Queue PDF rendering for many invoices; unchanged invoices are not re-rendered
+@router.post(
+    "/invoices:render-pdf",
+    response_model=Job,
+    status_code=202,
+    dependencies=[strict_rate_limit()]
+)
+async def render_invoice_pdfs(request: PdfRenderRequest):
+    return await enqueue_job(
+        "documents.render_many",
+        invoice_ids=request.invoice_ids,
+        template=request.template,
+        force=request.force
+    )
+
+# Render one invoice and point its pdf_url at the stored document
+@router.post(
+    "/invoices/{invoice_id}/pdf",
+    response_model=PdfRenderResult,
+    dependencies=[strict_rate_limit()]
+)
+async def render_invoice_pdf(invoice_id: str, template: Optional[str] = None, force: bool = False):
+    result = await asyncio.to_thread(
+        get_document_renderer().render_invoice,
+        invoice_id,
+        template,
+        force
+    )
+    if result.error == "Invoice not found":
+        raise HTTPException(status_code=404, detail=result.error)
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.error)
+    return result
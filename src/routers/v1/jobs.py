@@ -0,0 +1,13 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from ...database import get_job_queue, Job
+
+router = APIRouter()
+
+# Poll a background job's status, attempts and result
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(get_job_queue().get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ...utils.metrics import REGISTRY, CONTENT_TYPE
+
+router = APIRouter()
+
+# Prometheus scrape endpoint; not rate limited, like the health checks
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
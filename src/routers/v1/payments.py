@@ -0,0 +1,36 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from ...utils.rate_limiting import moderate_rate_limit
+from ...utils.responses import FastJSONResponse
+from ...database import (
+    get_async_crud_service, AsyncCRUDService,
+    PaymentStatus, PaginatedResponse
+)
+from .dependencies import PaginationParams
+
+router = APIRouter()
+
+# List payments with offset or cursor pagination
+@router.get(
+    "/payments",
+    response_model=PaginatedResponse,
+    dependencies=[moderate_rate_limit()]
+)
+async def list_payments(
+    invoice_id: Optional[str] = None,
+    status: Optional[PaymentStatus] = None,
+    pagination: PaginationParams = Depends(),
+    crud: AsyncCRUDService = Depends(get_async_crud_service)
+):
+    try:
+        page = await crud.get_payments(
+            invoice_id=invoice_id,
+            status=status,
+            trusted=True,
+            **pagination.as_kwargs()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Database rows are trusted: serialize them without re-validation
+    return FastJSONResponse(page)
@@ -0,0 +1,27 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from ...utils.rate_limiting import moderate_rate_limit
+from ...database import get_async_crud_service, AsyncCRUDService, PaginatedResponse, SearchKind
+
+router = APIRouter()
+
+# Ranked search over clients and invoices, e.g. for support lookups
+@router.get(
+    "/search",
+    response_model=PaginatedResponse,
+    dependencies=[moderate_rate_limit()]
+)
+async def search(
+    q: str = Query(
+        ..., min_length=2, max_length=200,
+        description="Name, email, tax ID, invoice number, or words from notes and line items"
+    ),
+    kind: Optional[SearchKind] = None,
+    skip: int = Query(0, ge=0, le=1000, description="Results to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum results per page"),
+    crud: AsyncCRUDService = Depends(get_async_crud_service)
+):
+    try:
+        return await crud.search(q, kind=kind, skip=skip, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,459 @@
+"""
+Prometheus metrics without a client library.
+
+Counters and histograms live in a process-wide registry rendered on
+/metrics. Service calls are timed by the ``timed``/``instrumented``
+decorators, and the metered httpx transports attribute every Supabase
+round trip, row and payload byte to the service call that made it.
+"""
+
+import time
+import inspect
+import functools
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional, Dict, List, Tuple, Callable, Any
+import httpx
+
+# Latency buckets in seconds, from cache hits to slow batch calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Round trips per service call; anything past a handful is usually an N+1
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._values.get(label_values)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), series):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-1]}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template",
+    ("method", "route", "status")
+)
+OPERATION_DURATION = REGISTRY.histogram(
+    "service_operation_duration_seconds",
+    "Latency of CRUD and storage service calls",
+    ("service", "operation")
+)
+OPERATION_ROUND_TRIPS = REGISTRY.histogram(
+    "service_operation_round_trips",
+    "Supabase HTTP requests made by one service call",
+    ("service", "operation"),
+    ROUND_TRIP_BUCKETS
+)
+OPERATION_ROWS = REGISTRY.counter(
+    "service_operation_rows_total",
+    "PostgREST rows returned to service calls",
+    ("service", "operation")
+)
+OPERATION_BYTES = REGISTRY.counter(
+    "service_operation_bytes_total",
+    "Supabase payload bytes sent and received by service calls",
+    ("service", "operation")
+)
+OPERATION_ERRORS = REGISTRY.counter(
+    "service_operation_errors_total",
+    "Service calls that raised an unexpected exception",
+    ("service", "operation")
+)
+SUPABASE_REQUEST_DURATION = REGISTRY.histogram(
+    "supabase_request_duration_seconds",
+    "Supabase HTTP round trips, including reading the response body",
+    ("api", "table", "method", "status")
+)
+SUPABASE_ROWS = REGISTRY.counter(
+    "supabase_rows_total",
+    "Rows returned by PostgREST (from Content-Range)",
+    ("table", "method")
+)
+SUPABASE_RESPONSE_BYTES = REGISTRY.counter(
+    "supabase_response_bytes_total",
+    "Response payload bytes read from Supabase",
+    ("api", "table")
+)
+SUPABASE_REQUEST_BYTES = REGISTRY.counter(
+    "supabase_request_bytes_total",
+    "Request payload bytes sent to Supabase",
+    ("api", "table")
+)
+RATE_LIMIT_DECISIONS = REGISTRY.counter(
+    "rate_limit_decisions_total",
+    "Rate-limited requests by tier and outcome (allowed, limited, unavailable)",
+    ("tier", "outcome")
+)
+
+
+class _OperationScope:
+    """Round trips, rows and bytes attributed to the running service call."""
+
+    __slots__ = ("parent", "round_trips", "rows", "bytes")
+
+    def __init__(self, parent: Optional["_OperationScope"]):
+        self.parent = parent
+        self.round_trips = 0
+        self.rows = 0
+        self.bytes = 0
+
+
+_current_scope: ContextVar[Optional[_OperationScope]] = ContextVar("metrics_operation_scope", default=None)
+
+
+_STORAGE_OBJECT_ACTIONS = {"sign", "public", "authenticated", "list", "info", "move", "copy"}
+
+
+def _classify(path: str) -> Tuple[str, str]:
+    """Map a Supabase URL path to (api, table); e.g. /rest/v1/invoices -> (rest, invoices)."""
+    parts = [part for part in path.split("/") if part]
+    if len(parts) >= 3 and parts[0] == "rest":
+        if parts[2] == "rpc" and len(parts) >= 4:
+            return "rpc", parts[3]
+        return "rest", parts[2]
+    if len(parts) >= 3 and parts[0] == "storage":
+        # /storage/v1/object/[sign|public|list|...]/<bucket>/..., /storage/v1/upload/resumable
+        if parts[2] == "object" and len(parts) >= 4:
+            if parts[3] in _STORAGE_OBJECT_ACTIONS and len(parts) >= 5:
+                return "storage", parts[4]
+            return "storage", parts[3]
+        return "storage", parts[2]
+    return (parts[0] if parts else ""), ""
+
+
+def _rows_from_content_range(content_range: Optional[str]) -> int:
+    """Row count from a PostgREST Content-Range header such as ``0-24/100`` or ``*/0``."""
+    if not content_range:
+        return 0
+    span = content_range.split("/")[0]
+    if "-" not in span:
+        return 0
+    start, end = span.split("-", 1)
+    try:
+        return int(end) - int(start) + 1
+    except ValueError:
+        return 0
+
+
+def record_supabase_request(
+    request: httpx.Request,
+    response: Optional[httpx.Response],
+    response_bytes: int,
+    duration: float,
+    scope: Optional[_OperationScope]
+) -> None:
+    """Record one Supabase round trip (``response`` is None if it failed) and attribute it to its service call."""
+    api, table = _classify(request.url.path)
+    method = request.method
+    status = str(response.status_code) if response is not None else "error"
+    rows = 0
+    if response is not None and api in ("rest", "rpc"):
+        rows = _rows_from_content_range(response.headers.get("content-range"))
+    request_bytes = int(request.headers.get("content-length") or 0)
+
+    SUPABASE_REQUEST_DURATION.observe(duration, api, table, method, status)
+    SUPABASE_RESPONSE_BYTES.inc(api, table, amount=response_bytes)
+    if request_bytes:
+        SUPABASE_REQUEST_BYTES.inc(api, table, amount=request_bytes)
+    if rows:
+        SUPABASE_ROWS.inc(table, method, amount=rows)
+
+    while scope is not None:
+        scope.round_trips += 1
+        scope.rows += rows
+        scope.bytes += response_bytes + request_bytes
+        scope = scope.parent
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    def __init__(self, stream, on_close: Callable[[int], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._bytes = 0
+        self._closed = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._stream.close()
+            self._on_close(self._bytes)
+
+
+class _AsyncMeteredStream(httpx.AsyncByteStream):
+    def __init__(self, stream, on_close: Callable[[int], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._bytes = 0
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            await self._stream.aclose()
+            self._on_close(self._bytes)
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """HTTP transport that records every Supabase round trip once its body is read."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        scope = _current_scope.get()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            record_supabase_request(request, None, 0, time.perf_counter() - started, scope)
+            raise
+        response.stream = _MeteredStream(
+            response.stream,
+            lambda size: record_supabase_request(request, response, size, time.perf_counter() - started, scope)
+        )
+        return response
+
+
+class AsyncMeteredTransport(httpx.AsyncHTTPTransport):
+    """Async variant of MeteredTransport."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        scope = _current_scope.get()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            record_supabase_request(request, None, 0, time.perf_counter() - started, scope)
+            raise
+        response.stream = _AsyncMeteredStream(
+            response.stream,
+            lambda size: record_supabase_request(request, response, size, time.perf_counter() - started, scope)
+        )
+        return response
+
+
+def _finish(service: str, operation: str, started: float, failed: bool) -> None:
+    scope = _current_scope.get()
+    OPERATION_DURATION.observe(time.perf_counter() - started, service, operation)
+    OPERATION_ROUND_TRIPS.observe(scope.round_trips if scope else 0, service, operation)
+    if scope is not None and scope.rows:
+        OPERATION_ROWS.inc(service, operation, amount=scope.rows)
+    if scope is not None and scope.bytes:
+        OPERATION_BYTES.inc(service, operation, amount=scope.bytes)
+    if failed:
+        OPERATION_ERRORS.inc(service, operation)
+
+
+def timed(service: str, operation: Optional[str] = None) -> Callable:
+    """
+    Decorator recording latency, Supabase round trips and failures of a service call.
+
+    Round trips, rows and bytes are collected by the metered transports of
+    the pooled Supabase sessions while the call runs. Only unexpected
+    exceptions count as errors: None/False ("not found") returns and
+    validation ``ValueError``s are normal outcomes of a service call.
+
+    Args:
+        service: Service label, e.g. ``crud`` or ``storage``
+        operation: Operation label; defaults to the function name
+    """
+    def decorate(func: Callable) -> Callable:
+        name = operation or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                token = _current_scope.set(_OperationScope(_current_scope.get()))
+                started = time.perf_counter()
+                failed = False
+                try:
+                    return await func(*args, **kwargs)
+                except ValueError:
+                    raise
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    _finish(service, name, started, failed)
+                    _current_scope.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _current_scope.set(_OperationScope(_current_scope.get()))
+            started = time.perf_counter()
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except ValueError:
+                raise
+            except Exception:
+                failed = True
+                raise
+            finally:
+                _finish(service, name, started, failed)
+                _current_scope.reset(token)
+        return wrapper
+
+    return decorate
+
+
+def instrumented(service: str) -> Callable[[type], type]:
+    """
+    Class decorator applying ``timed(service)`` to every public method.
+
+    Generator methods are left alone because their work happens after
+    they return.
+    """
+    def decorate(cls: type) -> type:
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(member):
+                continue
+            if inspect.isgeneratorfunction(member) or inspect.isasyncgenfunction(member):
+                continue
+            setattr(cls, name, timed(service)(member))
+        return cls
+    return decorate
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by method, route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route templates keep label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, scope["method"], path, str(status["code"])
+            )
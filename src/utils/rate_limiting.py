@@ -1,17 +1,388 @@
-from fastapi import Depends
-from fastapi_limiter.depends import RateLimiter
+"""
+Tiered, per-tenant rate limiting.
+
+Every process keeps a token bucket per (tier, tenant) and decides locally,
+so a limited request costs a dict lookup and some arithmetic rather than a
+Redis round trip. Consumption is pushed to Redis in batches in the
+background, and the cluster-wide usage of the current window that comes
+back caps what the local buckets may still grant. Without Redis each
+process enforces the limits on its own (fail-open) or limited requests are
+rejected until Redis is back (fail-closed).
+"""
+
+import os
+import math
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, NamedTuple, Tuple
+from fastapi import Depends, HTTPException, Request
+import redis.asyncio as aioredis
+from .metrics import RATE_LIMIT_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+# Rate limit configuration
+RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_FAILURE_MODE: str = os.getenv("RATE_LIMIT_FAILURE_MODE", "open").lower()  # "open" or "closed"
+RATE_LIMIT_SYNC_INTERVAL_MS: float = float(os.getenv("RATE_LIMIT_SYNC_INTERVAL_MS", "250"))
+# A bucket that consumed this fraction of its limit since the last sync is pushed early
+RATE_LIMIT_SYNC_FRACTION: float = float(os.getenv("RATE_LIMIT_SYNC_FRACTION", "0.1"))
+RATE_LIMIT_MAX_BUCKETS: int = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+RATE_LIMIT_API_KEY_HEADER: str = os.getenv("RATE_LIMIT_API_KEY_HEADER", "X-API-Key")
+# Tokens charged to bulk endpoints instead of 1
+BULK_REQUEST_COST: int = int(os.getenv("RATE_LIMIT_BULK_COST", "10"))
+REDIS_URL: Optional[str] = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# After a Redis error syncing is skipped for this long
+REDIS_RETRY_AFTER_SECONDS = 30.0
+
+
+def _key_digest(api_key: str) -> str:
+    """SHA-256 of an API key, so keys never end up in memory dumps or Redis keys."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+# Issued API keys (comma-separated). Only these get a bucket of their own;
+# any other header value is ignored and the caller is limited by IP.
+RATE_LIMIT_API_KEYS: frozenset = frozenset(
+    _key_digest(key.strip()) for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()
+)
+
+
+class RateLimitTier(NamedTuple):
+    """Tokens granted per period to each caller."""
+    name: str
+    limit: int
+    period: float  # seconds
+
+
+class RateLimitDecision(NamedTuple):
+    """Outcome of charging a request: "allowed", "limited" or "unavailable"."""
+    outcome: str
+    remaining: int
+    retry_after: float  # seconds
+
+    @property
+    def allowed(self) -> bool:
+        return self.outcome == "allowed"
+
+
+def _tier(name: str, default: str) -> RateLimitTier:
+    """Tier from ``RATE_LIMIT_<NAME>`` in "<limit>/<seconds>" form."""
+    limit, period = os.getenv(f"RATE_LIMIT_{name.upper()}", default).split("/")
+    return RateLimitTier(name, int(limit), float(period))
+
+
+TIERS: Dict[str, RateLimitTier] = {
+    tier.name: tier for tier in (
+        _tier("strict", "5/60"),
+        _tier("moderate", "30/60"),
+        _tier("lenient", "100/60")
+    )
+}
+
+
+class _Bucket:
+    """Local token bucket plus this caller's cluster-wide usage in the current window."""
+
+    __slots__ = ("tier", "tokens", "updated", "window", "remote", "pending", "syncing")
+
+    def __init__(self, tier: RateLimitTier, now: float, window: int):
+        self.tier = tier
+        self.tokens = float(tier.limit)
+        self.updated = now
+        self.window = window
+        self.remote = 0  # usage in Redis as of the last sync, including ours
+        self.pending = 0  # consumed here, not yet pushed
+        self.syncing = 0  # consumed here, being pushed
+
+
+class HybridRateLimiter:
+    """
+    Token-bucket rate limiter with batched Redis synchronization.
+
+    A request is allowed when its caller's local bucket has ``cost`` tokens
+    and the caller's cluster-wide usage in the current fixed window (last
+    synced total plus unsynced local consumption) stays within the tier
+    limit. Across N processes the limit can be overshot by at most what the
+    other processes grant between two syncs.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = REDIS_URL,
+        failure_mode: str = RATE_LIMIT_FAILURE_MODE,
+        sync_interval_ms: float = RATE_LIMIT_SYNC_INTERVAL_MS,
+        sync_fraction: float = RATE_LIMIT_SYNC_FRACTION,
+        max_buckets: int = RATE_LIMIT_MAX_BUCKETS,
+        namespace: str = "einv:ratelimit",
+        connection: Optional[aioredis.Redis] = None
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            redis_url: Redis URL for cluster-wide limits, or None for local buckets only
+            failure_mode: "open" to keep limiting locally while Redis is down,
+                   "closed" to reject limited requests until it is back
+            sync_interval_ms: Maximum delay before local consumption is pushed
+            sync_fraction: Fraction of a tier's limit that triggers an early push
+            max_buckets: Hard cap on buckets kept in memory; beyond it the
+                   least recently used bucket is evicted
+            namespace: Redis key prefix
+            connection: Optional async Redis connection to use instead of redis_url
+
+        Raises:
+            ValueError: If failure_mode is not "open" or "closed"
+        """
+        if failure_mode not in ("open", "closed"):
+            raise ValueError(f"Unsupported rate limit failure mode: {failure_mode}")
+
+        self.redis_url = redis_url
+        self.failure_mode = failure_mode
+        self.sync_interval = sync_interval_ms / 1000
+        self.sync_fraction = sync_fraction
+        self.max_buckets = max_buckets
+        self.namespace = namespace
+        self._redis = connection
+        self._buckets: "OrderedDict[Tuple[str, str], _Bucket]" = OrderedDict()
+        self._dirty: set = set()
+        self._sync_task: Optional[asyncio.Task] = None
+        self._last_sync = time.monotonic()
+        self._redis_retry_at = 0.0
+        self._counters = {
+            "allowed": 0, "limited": 0, "unavailable": 0, "syncs": 0, "redis_errors": 0, "evicted": 0
+        }
+
+    @property
+    def distributed(self) -> bool:
+        """Whether limits are shared through Redis."""
+        return bool(self.redis_url) or self._redis is not None
+
+    def hit(self, tier: RateLimitTier, identity: str, cost: int = 1) -> RateLimitDecision:
+        """
+        Charge ``cost`` tokens to a caller.
+
+        Args:
+            tier: Rate limit tier of the endpoint
+            identity: Caller key from request_identity()
+            cost: Tokens the request consumes; capped at the tier limit
+
+        Returns:
+            Decision with the remaining tokens and, if rejected, when to retry
+        """
+        now = time.monotonic()
+        if self.failure_mode == "closed" and self.distributed and now < self._redis_retry_at:
+            self._counters["unavailable"] += 1
+            return RateLimitDecision("unavailable", 0, self._redis_retry_at - now)
+
+        cost = min(cost, tier.limit)
+        window = int(time.time() // tier.period)
+        key = (tier.name, identity)
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.tier != tier:
+            while len(self._buckets) >= self.max_buckets:
+                self._evict()
+            bucket = self._buckets[key] = _Bucket(tier, now, window)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(tier.limit, bucket.tokens + (now - bucket.updated) * tier.limit / tier.period)
+            bucket.updated = now
+            if bucket.window != window:
+                bucket.window = window
+                bucket.remote = bucket.pending = bucket.syncing = 0
+
+        cluster_left = tier.limit
+        if self.distributed:
+            cluster_left -= bucket.remote + bucket.syncing + bucket.pending
+        if cost <= bucket.tokens and cost <= cluster_left:
+            bucket.tokens -= cost
+            self._counters["allowed"] += 1
+            if self.distributed:
+                bucket.pending += cost
+                self._dirty.add(key)
+                self._schedule_sync(now, bucket)
+            return RateLimitDecision("allowed", int(min(bucket.tokens, cluster_left - cost)), 0.0)
+
+        self._counters["limited"] += 1
+        if cost > cluster_left:
+            retry_after = (window + 1) * tier.period - time.time()
+        else:
+            retry_after = (cost - bucket.tokens) * tier.period / tier.limit
+        return RateLimitDecision("limited", max(0, int(min(bucket.tokens, cluster_left))), retry_after)
+
+    async def sync(self) -> None:
+        """Push pending consumption to Redis and refresh cluster-wide usage."""
+        self._last_sync = time.monotonic()
+        keys, self._dirty = self._dirty, set()
+        batch = []
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket.pending:
+                batch.append((key, bucket, bucket.window))
+                bucket.syncing, bucket.pending = bucket.pending, 0
+        if not batch:
+            return
+
+        try:
+            pipe = self._redis_client().pipeline(transaction=False)
+            for (tier_name, identity), bucket, window in batch:
+                redis_key = f"{self.namespace}:{tier_name}:{identity}:{window}"
+                pipe.incrby(redis_key, bucket.syncing)
+                pipe.expire(redis_key, math.ceil(bucket.tier.period) + 1)
+            results = await pipe.execute()
+        except Exception as e:
+            for key, bucket, window in batch:
+                if bucket.window == window:
+                    bucket.pending += bucket.syncing
+                    self._dirty.add(key)
+                bucket.syncing = 0
+            self._redis_failed(e)
+            return
+
+        if self._redis_retry_at:
+            logger.info("Rate limiter Redis sync recovered")
+            self._redis_retry_at = 0.0
+        self._counters["syncs"] += 1
+        for (_, bucket, window), total in zip(batch, results[::2]):
+            if bucket.window == window:
+                bucket.remote = int(total)
+            bucket.syncing = 0
+
+    async def ping(self) -> bool:
+        """Check the Redis connection; a failure applies the failure mode."""
+        if not self.distributed:
+            return False
+        try:
+            await self._redis_client().ping()
+            return True
+        except Exception as e:
+            self._redis_failed(e)
+            return False
+
+    async def close(self) -> None:
+        """Push remaining consumption and close the Redis connection."""
+        if self._sync_task is not None:
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+        if self._redis is not None:
+            if self._dirty and time.monotonic() >= self._redis_retry_at:
+                await self.sync()
+            await self._redis.aclose()
+            self._redis = None
+
+    def stats(self) -> Dict[str, int]:
+        """Decision counters and bucket count."""
+        return {**self._counters, "buckets": len(self._buckets)}
+
+    # Helper methods
+    def _schedule_sync(self, now: float, bucket: _Bucket) -> None:
+        if self._sync_task is not None or now < self._redis_retry_at:
+            return
+        if now - self._last_sync >= self.sync_interval or bucket.pending >= bucket.tier.limit * self.sync_fraction:
+            self._sync_task = asyncio.get_running_loop().create_task(self._run_sync())
+
+    async def _run_sync(self) -> None:
+        try:
+            await self.sync()
+        finally:
+            self._sync_task = None
+
+    def _evict(self) -> None:
+        """Drop the least recently used bucket, including any unsynced usage."""
+        key, _ = self._buckets.popitem(last=False)
+        self._dirty.discard(key)
+        self._counters["evicted"] += 1
+
+    def _redis_failed(self, error: Exception) -> None:
+        self._counters["redis_errors"] += 1
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+        if self.failure_mode == "closed":
+            logger.error(f"Rate limiter Redis unavailable, rejecting limited requests: {error}")
+        else:
+            logger.warning(f"Rate limiter Redis unavailable, limiting per process only: {error}")
+
+    def _redis_client(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=0.25,
+                socket_timeout=0.25
+            )
+        return self._redis
+
+
+def request_identity(request: Request) -> str:
+    """
+    Rate limit key of a request: an issued API key, else the client IP.
+
+    Header values are only trusted when they match RATE_LIMIT_API_KEYS;
+    otherwise a caller could send a fresh value on every request and get a
+    fresh bucket each time.
+    """
+    api_key = request.headers.get(RATE_LIMIT_API_KEY_HEADER)
+    if api_key:
+        digest = _key_digest(api_key)
+        if digest in RATE_LIMIT_API_KEYS:
+            return f"key:{digest[:24]}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+class RateLimit:
+    """FastAPI dependency charging ``cost`` tokens of ``tier`` per request."""
+
+    def __init__(self, tier: RateLimitTier, cost: int = 1):
+        self.tier = tier
+        self.cost = cost
+
+    async def __call__(self, request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+
+        decision = get_rate_limiter().hit(self.tier, request_identity(request), self.cost)
+        RATE_LIMIT_DECISIONS.inc(self.tier.name, decision.outcome)
+        if decision.allowed:
+            return
+
+        headers = {"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+        if decision.outcome == "unavailable":
+            raise HTTPException(status_code=503, detail="Rate limiter unavailable", headers=headers)
+        raise HTTPException(status_code=429, detail="Too Many Requests", headers=headers)
+
+
+# Global rate limiter instance
+rate_limiter: Optional[HybridRateLimiter] = None
+
+
+def get_rate_limiter() -> HybridRateLimiter:
+    """
+    Get or create the global rate limiter instance.
+
+    Returns:
+        HybridRateLimiter: Limiter shared by all endpoints of this process
+    """
+    global rate_limiter
+
+    if rate_limiter is None:
+        rate_limiter = HybridRateLimiter()
+
+    return rate_limiter
+
 
 # Different rate limiting configurations for different endpoint types
-def strict_rate_limit():
+def strict_rate_limit(cost: int = 1):
     """For sensitive operations like authentication"""
-    return Depends(RateLimiter(times=5, seconds=60))
+    return Depends(RateLimit(TIERS["strict"], cost))
 
-def moderate_rate_limit():
+def moderate_rate_limit(cost: int = 1):
     """For general API endpoints"""
-    return Depends(RateLimiter(times=30, seconds=60))
+    return Depends(RateLimit(TIERS["moderate"], cost))
 
-def lenient_rate_limit():
+def lenient_rate_limit(cost: int = 1):
     """For less sensitive endpoints"""
-    return Depends(RateLimiter(times=100, seconds=60))
+    return Depends(RateLimit(TIERS["lenient"], cost))
 
-# No rate limiting for health checks and monitoring endpoints 
\ No newline at end of file
+# No rate limiting for health checks and monitoring endpoints
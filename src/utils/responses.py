@@ -0,0 +1,44 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode values the JSON libraries do not handle natively"""
+    if isinstance(value, BaseModel):
+        # Shallow conversion; nested models come back through this hook
+        return dict(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for trusted, database-sourced content.
+
+    Rendered with orjson when it is installed. Returning this response from
+    a route also skips FastAPI's response_model validation, so rows from
+    the fast list path (see pagination.row_factory) go straight to bytes.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content,
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":")
+        ).encode("utf-8")
@@ -0,0 +1,45 @@
+"""Background job worker for E-Invoicing application.
+
+Run one or more worker processes next to the API:
+
+    python -m src.worker --concurrency 4
+"""
+
+import argparse
+import logging
+import signal
+import threading
+from .database.jobs import JobQueue, JobWorker, JOB_QUEUE_NAME
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs from the Redis queue")
+    parser.add_argument("--queue", default=JOB_QUEUE_NAME, help="Queue name to consume")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs run in parallel by this process")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    queue = JobQueue(name=args.queue)
+    workers = [JobWorker(queue) for _ in range(max(1, args.concurrency))]
+    
+    # Finish running jobs on SIGTERM/SIGINT; unclaimed jobs stay queued
+    def shutdown(signum, frame):
+        logger.info("Shutting down job workers")
+        for worker in workers:
+            worker.stop()
+    
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    
+    threads = [threading.Thread(target=worker.run, name=f"job-worker-{i}") for i, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
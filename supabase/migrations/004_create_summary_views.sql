@@ -0,0 +1,46 @@
+-- 004_create_summary_views.sql
+-- Server-side aggregation for client and invoice detail views
+-- Lets the API fetch an entity and its computed fields in a single query
+-- instead of pulling every related invoice/payment row into the application
+
+-- ============================================================
+-- CLIENT SUMMARIES
+-- ============================================================
+
+-- Client row plus invoice count and outstanding amount (sent + overdue)
+CREATE OR REPLACE VIEW public.client_summaries
+WITH (security_invoker = true) AS
+SELECT
+    c.*,
+    COALESCE(stats.total_invoices, 0)::integer AS total_invoices,
+    COALESCE(stats.total_amount_due, 0)::decimal(12,2) AS total_amount_due
+FROM public.clients c
+LEFT JOIN LATERAL (
+    SELECT
+        count(*) AS total_invoices,
+        sum(i.total_amount) FILTER (WHERE i.status IN ('sent', 'overdue')) AS total_amount_due
+    FROM public.invoices i
+    WHERE i.client_id = c.id
+) stats ON true;
+
+-- ============================================================
+-- INVOICE SUMMARIES
+-- ============================================================
+
+-- Invoice row plus the sum of its completed payments
+CREATE OR REPLACE VIEW public.invoice_summaries
+WITH (security_invoker = true) AS
+SELECT
+    i.*,
+    COALESCE(paid.amount_paid, 0)::decimal(12,2) AS amount_paid
+FROM public.invoices i
+LEFT JOIN LATERAL (
+    SELECT sum(p.amount) AS amount_paid
+    FROM public.payments p
+    WHERE p.invoice_id = i.id
+      AND p.status = 'completed'
+) paid ON true;
+
+-- Views run with the caller's privileges, so table RLS policies still apply
+GRANT SELECT ON public.client_summaries TO anon, authenticated, service_role;
+GRANT SELECT ON public.invoice_summaries TO anon, authenticated, service_role;
@@ -0,0 +1,74 @@
+-- 005_create_invoice_number_counters.sql
+-- Gap-free invoice numbering per issue year
+-- Replaces the "count(*) + 1" numbering, which is O(n) per insert and races
+-- into UNIQUE violations on invoice_number under concurrent creation
+
+-- ============================================================
+-- COUNTER TABLE
+-- ============================================================
+
+-- One row per numbering scope: the calendar year of the invoice issue date
+CREATE TABLE IF NOT EXISTS public.invoice_number_counters (
+    scope varchar(100) PRIMARY KEY,
+    last_value bigint NOT NULL DEFAULT 0 CHECK (last_value >= 0),
+    created_at timestamp with time zone DEFAULT now(),
+    updated_at timestamp with time zone DEFAULT now()
+);
+
+CREATE TRIGGER update_invoice_number_counters_updated_at BEFORE UPDATE ON public.invoice_number_counters
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Counters are only written by assign_invoice_number()
+ALTER TABLE public.invoice_number_counters ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "invoice_number_counters_service_role_all"
+ON public.invoice_number_counters
+FOR ALL
+TO service_role
+USING (true)
+WITH CHECK (true);
+
+-- ============================================================
+-- NUMBERING TRIGGER
+-- ============================================================
+
+-- Give every new invoice without a number the next one of its issue year,
+-- formatted as INV-<year>-<000001>. The counter is incremented inside the
+-- inserting transaction, so an insert that fails or rolls back also rolls
+-- back its number and the sequence stays gap-free. The price is that
+-- concurrent inserts of the same year wait on the counter row until the
+-- first one commits. Explicit numbers (e.g. migrated invoices) are kept.
+CREATE OR REPLACE FUNCTION public.assign_invoice_number()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_year text;
+    v_value bigint;
+BEGIN
+    IF NEW.invoice_number IS NOT NULL THEN
+        RETURN NEW;
+    END IF;
+
+    v_year := to_char(COALESCE(NEW.issue_date, now()) AT TIME ZONE 'UTC', 'YYYY');
+
+    INSERT INTO public.invoice_number_counters AS c (scope, last_value)
+    VALUES (v_year, 1)
+    ON CONFLICT (scope) DO UPDATE
+        SET last_value = c.last_value + 1
+    RETURNING c.last_value INTO v_value;
+
+    NEW.invoice_number := 'INV-' || v_year || '-' || lpad(v_value::text, 6, '0');
+    RETURN NEW;
+END;
+$$;
+
+-- Only reachable as a trigger; functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.assign_invoice_number() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS assign_invoice_number ON public.invoices;
+CREATE TRIGGER assign_invoice_number
+    BEFORE INSERT ON public.invoices
+    FOR EACH ROW EXECUTE FUNCTION public.assign_invoice_number();
@@ -0,0 +1,125 @@
+-- 006_maintain_invoice_aggregates.sql
+-- Incrementally maintained payment and client aggregates
+-- Replaces the summary views from 004, which re-summed every payment and
+-- invoice on each read, with counter columns kept current by triggers.
+-- Recording a payment now touches one invoice row (and at most one client
+-- row) instead of scanning the invoice's payment history.
+
+-- ============================================================
+-- COUNTER COLUMNS
+-- ============================================================
+
+ALTER TABLE public.invoices
+    ADD COLUMN IF NOT EXISTS amount_paid decimal(12,2) NOT NULL DEFAULT 0;
+
+ALTER TABLE public.clients
+    ADD COLUMN IF NOT EXISTS total_invoices integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_amount_due decimal(12,2) NOT NULL DEFAULT 0;
+
+-- Backfill from existing history
+UPDATE public.invoices i
+SET amount_paid = paid.amount_paid
+FROM (
+    SELECT invoice_id, sum(amount) AS amount_paid
+    FROM public.payments
+    WHERE status = 'completed'
+    GROUP BY invoice_id
+) paid
+WHERE paid.invoice_id = i.id;
+
+UPDATE public.clients c
+SET total_invoices = stats.total_invoices,
+    total_amount_due = stats.total_amount_due
+FROM (
+    SELECT
+        client_id,
+        count(*) AS total_invoices,
+        COALESCE(sum(total_amount) FILTER (WHERE status IN ('sent', 'overdue')), 0) AS total_amount_due
+    FROM public.invoices
+    GROUP BY client_id
+) stats
+WHERE stats.client_id = c.id;
+
+-- ============================================================
+-- PAYMENT -> INVOICE
+-- ============================================================
+
+-- Apply the change in completed payment amount to invoices.amount_paid and
+-- mark the invoice paid once it is fully covered
+CREATE OR REPLACE FUNCTION public.apply_payment_to_invoice()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'completed' THEN
+        UPDATE public.invoices
+        SET amount_paid = amount_paid - OLD.amount
+        WHERE id = OLD.invoice_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'completed' THEN
+        UPDATE public.invoices
+        SET amount_paid = amount_paid + NEW.amount,
+            status = CASE
+                WHEN amount_paid + NEW.amount >= total_amount AND status IN ('draft', 'sent', 'overdue')
+                    THEN 'paid'
+                ELSE status
+            END
+        WHERE id = NEW.invoice_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER maintain_invoice_amount_paid
+AFTER INSERT OR DELETE OR UPDATE OF amount, status, invoice_id ON public.payments
+FOR EACH ROW EXECUTE FUNCTION public.apply_payment_to_invoice();
+
+-- ============================================================
+-- INVOICE -> CLIENT
+-- ============================================================
+
+-- Apply invoice count and outstanding amount (sent + overdue) changes to
+-- the owning client
+CREATE OR REPLACE FUNCTION public.apply_invoice_to_client()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE public.clients
+        SET total_invoices = total_invoices - 1,
+            total_amount_due = total_amount_due
+                - CASE WHEN OLD.status IN ('sent', 'overdue') THEN OLD.total_amount ELSE 0 END
+        WHERE id = OLD.client_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE public.clients
+        SET total_invoices = total_invoices + 1,
+            total_amount_due = total_amount_due
+                + CASE WHEN NEW.status IN ('sent', 'overdue') THEN NEW.total_amount ELSE 0 END
+        WHERE id = NEW.client_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- amount_paid-only updates do not affect client counters
+CREATE TRIGGER maintain_client_invoice_totals
+AFTER INSERT OR DELETE OR UPDATE OF status, total_amount, client_id ON public.invoices
+FOR EACH ROW EXECUTE FUNCTION public.apply_invoice_to_client();
+
+-- ============================================================
+-- SUMMARY VIEWS
+-- ============================================================
+
+-- The base tables now carry the computed fields
+DROP VIEW IF EXISTS public.client_summaries;
+DROP VIEW IF EXISTS public.invoice_summaries;
@@ -0,0 +1,87 @@
+-- 007_create_record_payment_function.sql
+-- Atomic, idempotent payment recording
+-- Inserting a payment, updating the invoice totals (via the 006 triggers) and
+-- the paid transition happen in one transaction and one round trip. A repeated
+-- transaction_id (e.g. a retried webhook delivery) returns the existing payment
+-- without touching any totals.
+
+-- ============================================================
+-- IDEMPOTENCY KEY
+-- ============================================================
+
+-- Gateway transaction ids identify a payment; manual payments may omit them
+CREATE UNIQUE INDEX IF NOT EXISTS idx_payments_transaction_id
+ON public.payments(transaction_id)
+WHERE transaction_id IS NOT NULL;
+
+-- ============================================================
+-- RECORD PAYMENT FUNCTION
+-- ============================================================
+
+-- Returns {"payment": <payment row>, "invoice": <invoice row>, "created": bool}
+-- SECURITY INVOKER: the caller's row level security applies to the invoice
+-- lock and the payment insert; the 006 aggregate triggers still run as
+-- their owner.
+CREATE OR REPLACE FUNCTION public.record_payment(
+    p_invoice_id uuid,
+    p_amount numeric,
+    p_payment_date timestamp with time zone,
+    p_payment_method text,
+    p_status text DEFAULT 'pending',
+    p_transaction_id text DEFAULT NULL,
+    p_notes text DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    v_payment public.payments;
+    v_invoice public.invoices;
+    v_created boolean := true;
+BEGIN
+    -- Serialize payments per invoice so totals and status are decided on
+    -- the latest committed state
+    SELECT * INTO v_invoice FROM public.invoices WHERE id = p_invoice_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Invoice % not found', p_invoice_id USING ERRCODE = 'P0002';
+    END IF;
+
+    INSERT INTO public.payments (
+        invoice_id, amount, payment_date, payment_method, status, transaction_id, notes
+    )
+    VALUES (
+        p_invoice_id, p_amount, p_payment_date, p_payment_method, p_status, p_transaction_id, p_notes
+    )
+    ON CONFLICT (transaction_id) WHERE transaction_id IS NOT NULL DO NOTHING
+    RETURNING * INTO v_payment;
+
+    IF NOT FOUND THEN
+        v_created := false;
+        SELECT * INTO v_payment FROM public.payments WHERE transaction_id = p_transaction_id;
+
+        IF v_payment.invoice_id <> p_invoice_id THEN
+            RAISE EXCEPTION 'Transaction % is already recorded for invoice %',
+                p_transaction_id, v_payment.invoice_id USING ERRCODE = '23505';
+        END IF;
+    END IF;
+
+    -- Re-read the invoice after the payments trigger applied the totals
+    SELECT * INTO v_invoice FROM public.invoices WHERE id = p_invoice_id;
+
+    RETURN jsonb_build_object(
+        'payment', to_jsonb(v_payment),
+        'invoice', to_jsonb(v_invoice),
+        'created', v_created
+    );
+END;
+$$;
+
+-- Functions are executable by PUBLIC by default. The API calls this with
+-- its service role client (CRUDService.record_payment); anon has no RLS
+-- policy on invoices or payments and must not reach the function either.
+REVOKE EXECUTE ON FUNCTION public.record_payment(uuid, numeric, timestamp with time zone, text, text, text, text)
+FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.record_payment(uuid, numeric, timestamp with time zone, text, text, text, text)
+TO authenticated, service_role;
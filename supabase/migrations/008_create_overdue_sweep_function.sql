@@ -0,0 +1,46 @@
+-- 008_create_overdue_sweep_function.sql
+-- Set-based transition of past-due invoices from 'sent' to 'overdue'
+-- Called repeatedly by the API's background sweeper; each call updates at
+-- most p_batch_size rows so no single statement holds locks for long.
+
+-- Only unpaid sent invoices are candidates, so the index stays small
+CREATE INDEX IF NOT EXISTS idx_invoices_sent_due_date
+ON public.invoices(due_date)
+WHERE status = 'sent';
+
+-- Returns the id and client_id of every invoice moved to overdue
+CREATE OR REPLACE FUNCTION public.mark_overdue_invoices(
+    p_batch_size integer DEFAULT 1000
+)
+RETURNS TABLE (id uuid, client_id uuid)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF p_batch_size IS NULL OR p_batch_size < 1 THEN
+        RAISE EXCEPTION 'p_batch_size must be a positive integer, got %', p_batch_size;
+    END IF;
+
+    -- SKIP LOCKED lets the sweep run alongside payment writes (and other
+    -- sweepers) without waiting on row locks
+    RETURN QUERY
+    UPDATE public.invoices AS i
+    SET status = 'overdue'
+    WHERE i.id IN (
+        SELECT candidate.id
+        FROM public.invoices AS candidate
+        WHERE candidate.status = 'sent'
+          AND candidate.due_date < now()
+        ORDER BY candidate.due_date
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING i.id, i.client_id;
+END;
+$$;
+
+-- SECURITY DEFINER and a mass update: only the sweeper's service role may
+-- call it. Functions are executable by PUBLIC by default.
+REVOKE EXECUTE ON FUNCTION public.mark_overdue_invoices(integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.mark_overdue_invoices(integer) TO service_role;
@@ -0,0 +1,170 @@
+-- 009_create_search_indexes.sql
+-- Ranked full-text and fuzzy search over clients and invoices
+-- Full-text vectors match whole words in names, emails, tax ids, invoice
+-- numbers, notes and line-item descriptions; trigram indexes match partial
+-- and misspelled names, emails, tax ids and invoice numbers. Everything is
+-- an expression index over IMMUTABLE helper functions, so no columns are
+-- added and `select *` responses are unchanged.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+-- ============================================================
+-- SEARCH DOCUMENTS
+-- ============================================================
+
+-- 'simple' keeps names, emails and numbers as-is instead of stemming them
+CREATE OR REPLACE FUNCTION public.client_search_vector(p_name text, p_email text, p_tax_id text)
+RETURNS tsvector
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT setweight(to_tsvector('simple'::regconfig, coalesce(p_name, '') || ' ' || coalesce(p_tax_id, '')), 'A')
+        || setweight(to_tsvector('simple'::regconfig, coalesce(p_email, '')), 'B')
+$$;
+
+-- Line-item descriptions are the only strings in items, so every string value is indexed
+CREATE OR REPLACE FUNCTION public.invoice_search_vector(
+    p_invoice_number text,
+    p_client_name text,
+    p_client_email text,
+    p_notes text,
+    p_items jsonb
+)
+RETURNS tsvector
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT setweight(to_tsvector('simple'::regconfig, coalesce(p_invoice_number, '')), 'A')
+        || setweight(to_tsvector('simple'::regconfig, coalesce(p_client_name, '') || ' ' || coalesce(p_client_email, '')), 'B')
+        || setweight(jsonb_to_tsvector('simple'::regconfig, coalesce(p_items, '[]'::jsonb), '["string"]'), 'C')
+        || setweight(to_tsvector('simple'::regconfig, coalesce(p_notes, '')), 'D')
+$$;
+
+-- Lower-cased identifiers for trigram (fuzzy and substring) matching
+CREATE OR REPLACE FUNCTION public.client_search_text(p_name text, p_email text, p_tax_id text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT lower(concat_ws(' ', p_name, p_email, p_tax_id))
+$$;
+
+CREATE OR REPLACE FUNCTION public.invoice_search_text(p_invoice_number text, p_client_name text, p_client_email text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT lower(concat_ws(' ', p_invoice_number, p_client_name, p_client_email))
+$$;
+
+-- ============================================================
+-- INDEXES
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_clients_search_vector
+ON public.clients USING gin (public.client_search_vector(name, email, tax_id));
+
+CREATE INDEX IF NOT EXISTS idx_clients_search_trgm
+ON public.clients USING gin (public.client_search_text(name, email, tax_id) extensions.gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_invoices_search_vector
+ON public.invoices USING gin (public.invoice_search_vector(invoice_number, client_name, client_email, notes, items));
+
+CREATE INDEX IF NOT EXISTS idx_invoices_search_trgm
+ON public.invoices USING gin (public.invoice_search_text(invoice_number, client_name, client_email) extensions.gin_trgm_ops);
+
+-- ============================================================
+-- SEARCH FUNCTION
+-- ============================================================
+
+-- Matches on either index; rank is the full-text cover density plus the
+-- best trigram word similarity, so an exact invoice number or email ranks
+-- first. total_count is the number of matches before LIMIT/OFFSET.
+-- SECURITY INVOKER: row level security applies as for direct selects.
+CREATE OR REPLACE FUNCTION public.search_records(
+    p_query text,
+    p_kind text DEFAULT NULL,
+    p_limit integer DEFAULT 20,
+    p_offset integer DEFAULT 0
+)
+RETURNS TABLE (
+    kind text,
+    id uuid,
+    title text,
+    subtitle text,
+    status text,
+    client_id uuid,
+    rank real,
+    total_count bigint
+)
+LANGUAGE plpgsql
+STABLE
+SET search_path = public, extensions
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_tsquery tsquery := websearch_to_tsquery('simple'::regconfig, p_query);
+    v_term text := lower(btrim(p_query));
+    v_pattern text;
+BEGIN
+    IF length(v_term) < 2 THEN
+        RAISE EXCEPTION 'Search query must be at least 2 characters' USING ERRCODE = '22023';
+    END IF;
+    IF p_kind IS NOT NULL AND p_kind NOT IN ('client', 'invoice') THEN
+        RAISE EXCEPTION 'Unsupported search kind: %', p_kind USING ERRCODE = '22023';
+    END IF;
+
+    -- Substring match with LIKE wildcards in the query escaped
+    v_pattern := '%' || replace(replace(replace(v_term, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+
+    RETURN QUERY
+    WITH matches AS (
+        SELECT
+            'client'::text AS kind,
+            c.id,
+            c.name::text AS title,
+            c.email::text AS subtitle,
+            NULL::text AS status,
+            c.id AS client_id,
+            ts_rank_cd(public.client_search_vector(c.name, c.email, c.tax_id), v_tsquery)
+                + word_similarity(v_term, public.client_search_text(c.name, c.email, c.tax_id)) AS rank
+        FROM public.clients AS c
+        WHERE (p_kind IS NULL OR p_kind = 'client')
+          AND (
+              public.client_search_vector(c.name, c.email, c.tax_id) @@ v_tsquery
+              OR v_term <% public.client_search_text(c.name, c.email, c.tax_id)
+              OR public.client_search_text(c.name, c.email, c.tax_id) LIKE v_pattern
+          )
+
+        UNION ALL
+
+        SELECT
+            'invoice'::text,
+            i.id,
+            i.invoice_number::text,
+            i.client_name::text,
+            i.status::text,
+            i.client_id,
+            ts_rank_cd(public.invoice_search_vector(i.invoice_number, i.client_name, i.client_email, i.notes, i.items), v_tsquery)
+                + word_similarity(v_term, public.invoice_search_text(i.invoice_number, i.client_name, i.client_email))
+        FROM public.invoices AS i
+        WHERE (p_kind IS NULL OR p_kind = 'invoice')
+          AND (
+              public.invoice_search_vector(i.invoice_number, i.client_name, i.client_email, i.notes, i.items) @@ v_tsquery
+              OR v_term <% public.invoice_search_text(i.invoice_number, i.client_name, i.client_email)
+              OR public.invoice_search_text(i.invoice_number, i.client_name, i.client_email) LIKE v_pattern
+          )
+    )
+    SELECT m.kind, m.id, m.title, m.subtitle, m.status, m.client_id, m.rank::real, count(*) OVER ()
+    FROM matches AS m
+    ORDER BY m.rank DESC, m.id
+    LIMIT greatest(p_limit, 1)
+    OFFSET greatest(p_offset, 0);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.search_records(text, text, integer, integer) TO authenticated, service_role;
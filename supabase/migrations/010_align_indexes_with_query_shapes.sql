@@ -0,0 +1,82 @@
+-- 010_align_indexes_with_query_shapes.sql
+-- Composite and partial indexes matching the CRUD list queries
+-- Every list endpoint (and the export stream) filters on at most one
+-- column and orders by (created_at DESC, id DESC), with offset or keyset
+-- pagination on that pair. The single-column indexes from 002 could find
+-- the filtered rows but not return them in order, so every page sorted the
+-- whole filtered set. With (filter, created_at DESC, id DESC) a page is an
+-- index range scan that stops after LIMIT rows.
+-- tests/test_query_plans.py checks these plans against a seeded database.
+--
+-- Migrations run inside a transaction, so these are not built CONCURRENTLY;
+-- on large tables run the CREATE INDEX statements by hand with
+-- CONCURRENTLY first, after which this migration is a no-op.
+
+-- ============================================================
+-- INVOICES
+-- ============================================================
+
+-- get_invoices() without filters and keyset pages of the invoice export
+CREATE INDEX IF NOT EXISTS idx_invoices_created_at
+ON public.invoices(created_at DESC, id DESC);
+
+-- get_invoices(client_id=...); also serves the client_id foreign key
+CREATE INDEX IF NOT EXISTS idx_invoices_client_created_at
+ON public.invoices(client_id, created_at DESC, id DESC);
+
+-- get_invoices(status=...)
+CREATE INDEX IF NOT EXISTS idx_invoices_status_created_at
+ON public.invoices(status, created_at DESC, id DESC);
+
+-- ============================================================
+-- CLIENTS
+-- ============================================================
+
+-- get_clients(active_only=False)
+CREATE INDEX IF NOT EXISTS idx_clients_created_at
+ON public.clients(created_at DESC, id DESC);
+
+-- get_clients(active_only=True), the default; inactive clients are rare
+CREATE INDEX IF NOT EXISTS idx_clients_active_created_at
+ON public.clients(created_at DESC, id DESC)
+WHERE is_active = true;
+
+-- ============================================================
+-- PAYMENTS
+-- ============================================================
+
+-- get_payments() without filters
+CREATE INDEX IF NOT EXISTS idx_payments_created_at
+ON public.payments(created_at DESC, id DESC);
+
+-- get_payments(invoice_id=...); also serves the invoice_id foreign key
+CREATE INDEX IF NOT EXISTS idx_payments_invoice_created_at
+ON public.payments(invoice_id, created_at DESC, id DESC);
+
+-- get_payments(status=...)
+CREATE INDEX IF NOT EXISTS idx_payments_status_created_at
+ON public.payments(status, created_at DESC, id DESC);
+
+-- Completed payments per invoice, read when amount_paid is rebuilt from
+-- history (as in the 006 backfill)
+CREATE INDEX IF NOT EXISTS idx_payments_completed_invoice_id
+ON public.payments(invoice_id)
+INCLUDE (amount)
+WHERE status = 'completed';
+
+-- ============================================================
+-- REDUNDANT INDEXES
+-- ============================================================
+
+-- Prefixes of the composites above
+DROP INDEX IF EXISTS public.idx_invoices_client_id;
+DROP INDEX IF EXISTS public.idx_invoices_status;
+DROP INDEX IF EXISTS public.idx_payments_invoice_id;
+DROP INDEX IF EXISTS public.idx_payments_status;
+
+-- Duplicates of the UNIQUE constraint indexes on the same columns
+DROP INDEX IF EXISTS public.idx_clients_email;
+DROP INDEX IF EXISTS public.idx_invoices_number;
+
+-- A boolean alone is never selective enough; replaced by the partial index
+DROP INDEX IF EXISTS public.idx_clients_active;
@@ -0,0 +1,15 @@
+-- 011_add_invoice_import_keys.sql
+-- Idempotency keys for bulk invoice imports
+-- Bulk imports run on an at-least-once job queue, so the same import can run
+-- more than once. Each imported invoice records the import's key and its
+-- position in the request; a rerun skips positions that already exist
+-- instead of creating duplicates with fresh invoice numbers.
+
+ALTER TABLE public.invoices
+    ADD COLUMN IF NOT EXISTS import_id uuid,
+    ADD COLUMN IF NOT EXISTS import_index integer;
+
+-- One invoice per import position; also serves the rerun lookup
+CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_import_key
+ON public.invoices(import_id, import_index)
+WHERE import_id IS NOT NULL;
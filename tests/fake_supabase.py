@@ -0,0 +1,551 @@
+"""
+In-memory stand-in for the Supabase client surfaces used by the services.
+
+Implements ``table()`` query builders (select/insert/update/delete, eq/neq/
+gt/gte/lt/lte/in_/or_ filters, order/range/limit, exact counts), the RPCs
+from the migrations and ``storage.from_()`` buckets. Row defaults, the
+invoice numbering trigger of 005 and the aggregate triggers of 006 are
+reproduced so service results look like the real database's. Every round
+trip is recorded and can be delayed by an injected latency, which makes the
+fake usable for load benchmarks.
+
+Not covered: auth, realtime, and the raw HTTP calls StorageService makes
+for streaming and resumable transfers.
+"""
+
+import json
+import time
+import uuid
+import random
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+from postgrest.exceptions import APIError
+
+# Column defaults applied on insert, mirroring the migrations
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "clients": {
+        "phone": None, "address": None, "city": None, "state": None, "zip_code": None,
+        "country": None, "tax_id": None, "is_active": True,
+        "total_invoices": 0, "total_amount_due": 0.0,
+    },
+    "invoices": {
+        "status": "draft", "subtotal": 0.0, "tax_rate": 0.0, "tax_amount": 0.0,
+        "discount_amount": 0.0, "total_amount": 0.0, "amount_paid": 0.0, "items": [],
+        "notes": None, "terms": None, "pdf_url": None, "attachment_urls": [],
+    },
+    "payments": {
+        "status": "pending", "transaction_id": None, "notes": None,
+    },
+}
+
+_OPERATORS = {
+    "eq": lambda value, target: value == target,
+    "neq": lambda value, target: value != target,
+    "gt": lambda value, target: value is not None and value > target,
+    "gte": lambda value, target: value is not None and value >= target,
+    "lt": lambda value, target: value is not None and value < target,
+    "lte": lambda value, target: value is not None and value <= target,
+}
+
+
+def _copy(value: Any) -> Any:
+    """Detached copy of a JSON value; faster than deepcopy for row dicts."""
+    return json.loads(json.dumps(value))
+
+
+class FakeResponse:
+    """APIResponse-like result with ``data`` and ``count``."""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    """Convert a filter value from the PostgREST string syntax to the column's type."""
+    raw = raw.strip('"')
+    if isinstance(sample, bool):
+        return raw == "true"
+    if isinstance(sample, (int, float)):
+        return float(raw)
+    return raw
+
+
+def _split_top_level(expression: str) -> List[str]:
+    """Split ``a,b,and(c,d)`` on commas outside parentheses and quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _logic_predicate(expression: str):
+    """Compile a PostgREST logic tree such as ``a.lt.1,and(a.eq.1,b.lt.2)``."""
+    for operator, combine in (("and(", all), ("or(", any)):
+        if expression.startswith(operator) and expression.endswith(")"):
+            children = [_logic_predicate(part) for part in _split_top_level(expression[len(operator):-1])]
+            return lambda row: combine(child(row) for child in children)
+
+    column, operator, raw = expression.split(".", 2)
+    compare = _OPERATORS[operator]
+    return lambda row: compare(row.get(column), _coerce(raw, row.get(column)))
+
+
+class FakeQuery:
+    """Query builder for one table; filters are evaluated on execute()."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.method = "GET"
+        self.columns = "*"
+        self.count_mode: Optional[str] = None
+        self.head = False
+        self.payload: Any = None
+        self.filters: List = []
+        self.ordering: List[Tuple[str, bool]] = []
+        self.offset = 0
+        self.row_limit: Optional[int] = None
+
+    # Operations
+    def select(self, columns: str = "*", count: Optional[str] = None, head: bool = False) -> "FakeQuery":
+        self.columns = columns
+        self.count_mode = count
+        self.head = head
+        return self
+
+    def insert(self, data: Any, **kwargs) -> "FakeQuery":
+        self.method = "POST"
+        self.payload = data
+        return self
+
+    def update(self, data: Dict[str, Any], **kwargs) -> "FakeQuery":
+        self.method = "PATCH"
+        self.payload = data
+        return self
+
+    def delete(self, **kwargs) -> "FakeQuery":
+        self.method = "DELETE"
+        return self
+
+    # Filters
+    def _filter(self, column: str, operator: str, target: Any) -> "FakeQuery":
+        compare = _OPERATORS[operator]
+        self.filters.append(lambda row: compare(row.get(column), target))
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        allowed = set(values)
+        self.filters.append(lambda row: row.get(column) in allowed)
+        return self
+
+    def or_(self, filters: str) -> "FakeQuery":
+        self.filters.append(_logic_predicate(f"or({filters})"))
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, **kwargs) -> "FakeQuery":
+        self.ordering.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def limit(self, size: int) -> "FakeQuery":
+        self.row_limit = size
+        return self
+
+    def execute(self):
+        return self.db._execute(("rest", self.table, self.method), self._run)
+
+    # Evaluation
+    def _matching(self) -> List[Dict[str, Any]]:
+        return [row for row in self.db.tables[self.table].values() if all(f(row) for f in self.filters)]
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.columns.strip() == "*":
+            return _copy(row)
+        columns = [column.strip() for column in self.columns.split(",")]
+        return _copy({column: row.get(column) for column in columns})
+
+    def _run(self) -> FakeResponse:
+        if self.method == "POST":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            return FakeResponse([self.db.insert_row(self.table, row) for row in rows])
+
+        if self.method == "PATCH":
+            return FakeResponse([self.db.update_row(self.table, row["id"], self.payload) for row in self._matching()])
+
+        if self.method == "DELETE":
+            return FakeResponse([self.db.delete_row(self.table, row["id"]) for row in self._matching()])
+
+        rows = self._matching()
+        total = len(rows) if self.count_mode else None
+        # Stable sorts applied from the last key to the first
+        for column, desc in reversed(self.ordering):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        end = None if self.row_limit is None else self.offset + self.row_limit
+        rows = rows[self.offset:end]
+        return FakeResponse([] if self.head else [self._project(row) for row in rows], total)
+
+
+class FakeRPC:
+    """Deferred RPC call."""
+
+    def __init__(self, db: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        handler = getattr(self.db, f"_rpc_{self.name}", None)
+        if handler is None:
+            raise APIError({"message": f"Could not find the function public.{self.name}", "code": "PGRST202"})
+        return self.db._execute(("rpc", self.name, "POST"), lambda: FakeResponse(handler(**self.params)))
+
+
+class _UploadResponse:
+    def __init__(self, path: str):
+        self.path = path
+        self.full_path = path
+
+
+class FakeBucket:
+    """storage3 bucket proxy over an in-memory object map."""
+
+    def __init__(self, db: "FakeSupabase", name: str):
+        self.db = db
+        self.name = name
+
+    @property
+    def objects(self) -> Dict[str, Dict[str, Any]]:
+        return self.db.buckets.setdefault(self.name, {})
+
+    def _call(self, operation: str, func):
+        return self.db._execute(("storage", self.name, operation), func)
+
+    def upload(self, path: str, file: Any, file_options: Optional[Dict[str, str]] = None):
+        content = file if isinstance(file, bytes) else file.read()
+        upsert = (file_options or {}).get("upsert") == "true"
+
+        def run():
+            if path in self.objects and not upsert:
+                raise APIError({"message": "The resource already exists", "code": "409"})
+            now = self.db.now()
+            self.objects[path] = {"content": content, "created_at": now, "updated_at": now}
+            return _UploadResponse(path)
+        return self._call("upload", run)
+
+    def download(self, path: str) -> bytes:
+        def run():
+            if path not in self.objects:
+                raise APIError({"message": "Object not found", "code": "404"})
+            return self.objects[path]["content"]
+        return self._call("download", run)
+
+    def remove(self, paths: List[str]) -> List[Dict[str, Any]]:
+        def run():
+            return [{"name": path} for path in paths if self.objects.pop(path, None) is not None]
+        return self._call("remove", run)
+
+    def list(self, path: str = "", options: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        prefix = f"{path.rstrip('/')}/" if path else ""
+        limit = (options or {}).get("limit", 100)
+
+        def run():
+            items = []
+            for key, item in sorted(self.objects.items()):
+                if key.startswith(prefix) and "/" not in key[len(prefix):]:
+                    items.append({
+                        "name": key[len(prefix):],
+                        "metadata": {"size": len(item["content"])},
+                        "created_at": item["created_at"],
+                        "updated_at": item["updated_at"],
+                    })
+            return items[:limit]
+        return self._call("list", run)
+
+    def create_signed_urls(self, paths: List[str], expires_in: int) -> List[Dict[str, Any]]:
+        def run():
+            return [
+                {
+                    "path": path,
+                    "signedURL": f"{self.db.storage_url}/object/sign/{self.name}/{path}?token=fake&expires={expires_in}"
+                    if path in self.objects else None,
+                    "error": None if path in self.objects else "Object not found",
+                }
+                for path in paths
+            ]
+        return self._call("sign", run)
+
+    def get_public_url(self, path: str) -> str:
+        # Built locally by storage3; not a round trip
+        return f"{self.db.storage_url}/object/public/{self.name}/{path}"
+
+
+class _Bucket:
+    def __init__(self, name: str):
+        self.name = name
+        self.id = name
+
+
+class FakeStorage:
+    """``client.storage`` surface: bucket management and ``from_()``."""
+
+    def __init__(self, db: "FakeSupabase"):
+        self.db = db
+
+    def list_buckets(self):
+        return self.db._execute(("storage", "", "list_buckets"), lambda: [_Bucket(name) for name in self.db.buckets])
+
+    def create_bucket(self, name: str, options: Optional[Dict[str, Any]] = None):
+        return self.db._execute(("storage", name, "create_bucket"), lambda: self.db.buckets.setdefault(name, {}))
+
+    def from_(self, name: str) -> FakeBucket:
+        return FakeBucket(self.db, name)
+
+
+class FakeSupabase:
+    """
+    In-memory Supabase client.
+
+    Args:
+        latency: Seconds added to every round trip
+        jitter: Extra uniformly distributed seconds (0..jitter) per round trip
+        url: Project URL used for storage URLs
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, url: str = "http://fake.supabase.local"):
+        self.latency = latency
+        self.jitter = jitter
+        self.supabase_url = url
+        self.storage_url = f"{url}/storage/v1"
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in TABLE_DEFAULTS}
+        self.buckets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.counters: Dict[str, int] = {}
+        self.requests: Counter = Counter()
+        self.storage = FakeStorage(self)
+        self._lock = threading.RLock()
+        self._last_timestamp = datetime.now(timezone.utc)
+
+    # Client surface
+    def table(self, name: str) -> FakeQuery:
+        if name not in self.tables:
+            raise APIError({"message": f"relation \"public.{name}\" does not exist", "code": "42P01"})
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    # Statistics
+    @property
+    def round_trips(self) -> int:
+        return sum(self.requests.values())
+
+    def reset_stats(self) -> None:
+        self.requests.clear()
+
+    # Row storage
+    def now(self) -> str:
+        """Strictly increasing timestamps, so keyset order is deterministic."""
+        with self._lock:
+            current = datetime.now(timezone.utc)
+            if current <= self._last_timestamp:
+                current = self._last_timestamp + timedelta(microseconds=1)
+            self._last_timestamp = current
+            return current.isoformat()
+
+    def insert_row(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        # PostgREST receives JSON, so values arrive as their JSON encodings
+        row = {**_copy(TABLE_DEFAULTS[table]), **json.loads(json.dumps(data, default=str))}
+        row.setdefault("id", str(uuid.uuid4()))
+        row["created_at"] = row["updated_at"] = self.now()
+        if table == "invoices" and not row.get("invoice_number"):
+            row["invoice_number"] = self._assign_invoice_number(row.get("issue_date"))
+        self.tables[table][row["id"]] = row
+        self._after_write(table, None, row)
+        return _copy(row)
+
+    def update_row(self, table: str, row_id: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        old = self.tables[table][row_id]
+        row = {**old, **json.loads(json.dumps(changes, default=str)), "updated_at": self.now()}
+        self.tables[table][row_id] = row
+        self._after_write(table, old, row, set(changes))
+        return _copy(row)
+
+    def delete_row(self, table: str, row_id: str) -> Dict[str, Any]:
+        old = self.tables[table].pop(row_id)
+        self._after_write(table, old, None)
+        return _copy(old)
+
+    # Helper methods
+    def _execute(self, request: Tuple[str, str, str], run):
+        self.requests[request] += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            return run()
+
+    def _after_write(self, table: str, old: Optional[Dict], new: Optional[Dict], changed: Optional[set] = None) -> None:
+        """Triggers from 006_maintain_invoice_aggregates.sql."""
+        if table == "payments":
+            if old and old["status"] == "completed" and old["invoice_id"] in self.tables["invoices"]:
+                invoice = self.tables["invoices"][old["invoice_id"]]
+                self.tables["invoices"][invoice["id"]] = {**invoice, "amount_paid": invoice["amount_paid"] - old["amount"]}
+            if new and new["status"] == "completed" and new["invoice_id"] in self.tables["invoices"]:
+                invoice = self.tables["invoices"][new["invoice_id"]]
+                paid = invoice["amount_paid"] + new["amount"]
+                status = invoice["status"]
+                if paid >= invoice["total_amount"] and status in ("draft", "sent", "overdue"):
+                    status = "paid"
+                updated = {**invoice, "amount_paid": paid, "status": status}
+                self.tables["invoices"][invoice["id"]] = updated
+                if status != invoice["status"]:
+                    self._after_write("invoices", invoice, updated, {"status"})
+
+        elif table == "invoices":
+            if old and new and not ({"status", "total_amount", "client_id"} & (changed or set())):
+                return
+            for row, sign in ((old, -1), (new, 1)):
+                if row and row.get("client_id") in self.tables["clients"]:
+                    client = self.tables["clients"][row["client_id"]]
+                    due = row["total_amount"] if row["status"] in ("sent", "overdue") else 0
+                    self.tables["clients"][client["id"]] = {
+                        **client,
+                        "total_invoices": client["total_invoices"] + sign,
+                        "total_amount_due": client["total_amount_due"] + sign * due,
+                    }
+
+    def _assign_invoice_number(self, issue_date: Optional[str]) -> str:
+        """Trigger from 005_create_invoice_number_counters.sql."""
+        issued = datetime.fromisoformat(issue_date) if issue_date else datetime.now(timezone.utc)
+        year = str((issued.astimezone(timezone.utc) if issued.tzinfo else issued).year)
+        self.counters[year] = self.counters.get(year, 0) + 1
+        return f"INV-{year}-{self.counters[year]:06d}"
+
+    # RPCs from the migrations
+
+    def _rpc_record_payment(
+        self,
+        p_invoice_id: str,
+        p_amount: float,
+        p_payment_date: str,
+        p_payment_method: str,
+        p_status: str = "pending",
+        p_transaction_id: Optional[str] = None,
+        p_notes: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if p_invoice_id not in self.tables["invoices"]:
+            raise APIError({"message": f"Invoice {p_invoice_id} not found", "code": "P0002"})
+
+        existing = next(
+            (row for row in self.tables["payments"].values()
+             if p_transaction_id and row["transaction_id"] == p_transaction_id),
+            None
+        )
+        if existing and existing["invoice_id"] != p_invoice_id:
+            raise APIError({"message": f"Transaction {p_transaction_id} is already recorded", "code": "23505"})
+
+        payment = _copy(existing) if existing else self.insert_row("payments", {
+            "invoice_id": p_invoice_id, "amount": p_amount, "payment_date": p_payment_date,
+            "payment_method": p_payment_method, "status": p_status,
+            "transaction_id": p_transaction_id, "notes": p_notes,
+        })
+        return {
+            "payment": payment,
+            "invoice": _copy(self.tables["invoices"][p_invoice_id]),
+            "created": existing is None,
+        }
+
+    def _rpc_mark_overdue_invoices(self, p_batch_size: int = 1000) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc).isoformat()
+        due = sorted(
+            (row for row in self.tables["invoices"].values() if row["status"] == "sent" and row["due_date"] < now),
+            key=lambda row: row["due_date"]
+        )[:p_batch_size]
+        for row in due:
+            self.update_row("invoices", row["id"], {"status": "overdue"})
+        return [{"id": row["id"], "client_id": row["client_id"]} for row in due]
+
+    def _rpc_search_records(
+        self,
+        p_query: str,
+        p_kind: Optional[str] = None,
+        p_limit: int = 20,
+        p_offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Substring stand-in for 009's full-text and trigram search; exact titles rank first."""
+        term = p_query.strip().lower()
+        matches = []
+        if p_kind in (None, "client"):
+            for row in self.tables["clients"].values():
+                text = " ".join(filter(None, (row["name"], row["email"], row["tax_id"]))).lower()
+                if term in text:
+                    matches.append({
+                        "kind": "client", "id": row["id"], "title": row["name"], "subtitle": row["email"],
+                        "status": None, "client_id": row["id"], "rank": 1.0 if term == row["name"].lower() else 0.5,
+                    })
+        if p_kind in (None, "invoice"):
+            for row in self.tables["invoices"].values():
+                descriptions = [item.get("description", "") for item in row["items"]]
+                fields = (row["invoice_number"], row["client_name"], row["client_email"], row["notes"], *descriptions)
+                if term in " ".join(filter(None, fields)).lower():
+                    matches.append({
+                        "kind": "invoice", "id": row["id"], "title": row["invoice_number"],
+                        "subtitle": row["client_name"], "status": row["status"], "client_id": row["client_id"],
+                        "rank": 1.0 if term == row["invoice_number"].lower() else 0.5,
+                    })
+        matches.sort(key=lambda match: (-match["rank"], match["id"]))
+        return [{**match, "total_count": len(matches)} for match in matches[p_offset:p_offset + p_limit]]
+
+
+class AsyncFakeSupabase(FakeSupabase):
+    """Async variant for AsyncCRUDService: ``execute()`` returns a coroutine and latency is awaited."""
+
+    def _execute(self, request: Tuple[str, str, str], run):
+        async def execute():
+            self.requests[request] += 1
+            delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                await asyncio.sleep(delay)
+            with self._lock:
+                return run()
+        return execute()
@@ -0,0 +1,146 @@
+"""
+Database tests for the aggregate triggers from 006_maintain_invoice_aggregates.sql.
+
+Each test runs in a transaction that is rolled back. Needs a Postgres database
+with the migrations applied and psycopg; see tests/test_query_plans.py.
+"""
+
+import sys
+import os
+from decimal import Decimal
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+if not DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+psycopg = pytest.importorskip("psycopg")
+
+
+@pytest.fixture
+def cursor():
+    """Cursor on a transaction that is rolled back after the test."""
+    with psycopg.connect(DATABASE_URL) as connection:
+        yield connection.cursor()
+        connection.rollback()
+
+
+def insert_client(cursor, email="triggers@example.com"):
+    cursor.execute(
+        "INSERT INTO public.clients (name, email) VALUES ('Trigger client', %s) RETURNING id",
+        (email,)
+    )
+    return cursor.fetchone()[0]
+
+
+def insert_invoice(cursor, client_id, number, total, status="draft"):
+    cursor.execute(
+        "INSERT INTO public.invoices (invoice_number, client_id, issue_date, due_date, status, "
+        "subtotal, tax_amount, total_amount, items) "
+        "VALUES (%s, %s, now(), now() + interval '30 days', %s, %s, 0, %s, '[]') RETURNING id",
+        (number, client_id, status, total, total)
+    )
+    return cursor.fetchone()[0]
+
+
+def insert_payment(cursor, invoice_id, amount, status="completed"):
+    cursor.execute(
+        "INSERT INTO public.payments (invoice_id, amount, payment_date, payment_method, status) "
+        "VALUES (%s, %s, now(), 'card', %s) RETURNING id",
+        (invoice_id, amount, status)
+    )
+    return cursor.fetchone()[0]
+
+
+def invoice_state(cursor, invoice_id):
+    cursor.execute("SELECT amount_paid, status FROM public.invoices WHERE id = %s", (invoice_id,))
+    return cursor.fetchone()
+
+
+def client_totals(cursor, client_id):
+    cursor.execute("SELECT total_invoices, total_amount_due FROM public.clients WHERE id = %s", (client_id,))
+    return cursor.fetchone()
+
+
+def test_completed_payments_maintain_amount_paid(cursor):
+    """Test that inserting, updating and deleting payments adjusts amount_paid"""
+    client_id = insert_client(cursor)
+    invoice_id = insert_invoice(cursor, client_id, "TRG-1", 100, status="sent")
+
+    pending = insert_payment(cursor, invoice_id, 30, status="pending")
+    assert invoice_state(cursor, invoice_id) == (Decimal("0.00"), "sent")
+
+    cursor.execute("UPDATE public.payments SET status = 'completed' WHERE id = %s", (pending,))
+    assert invoice_state(cursor, invoice_id) == (Decimal("30.00"), "sent")
+
+    cursor.execute("UPDATE public.payments SET amount = 40 WHERE id = %s", (pending,))
+    assert invoice_state(cursor, invoice_id)[0] == Decimal("40.00")
+
+    second = insert_payment(cursor, invoice_id, 25)
+    cursor.execute("UPDATE public.payments SET status = 'refunded' WHERE id = %s", (second,))
+    assert invoice_state(cursor, invoice_id)[0] == Decimal("40.00")
+
+    cursor.execute("DELETE FROM public.payments WHERE id = %s", (pending,))
+    assert invoice_state(cursor, invoice_id)[0] == Decimal("0.00")
+
+
+def test_moving_a_payment_between_invoices(cursor):
+    """Test that changing invoice_id moves the amount from the old invoice to the new one"""
+    client_id = insert_client(cursor)
+    first = insert_invoice(cursor, client_id, "TRG-1", 100, status="sent")
+    second = insert_invoice(cursor, client_id, "TRG-2", 100, status="sent")
+    payment_id = insert_payment(cursor, first, 60)
+
+    cursor.execute("UPDATE public.payments SET invoice_id = %s WHERE id = %s", (second, payment_id))
+
+    assert invoice_state(cursor, first)[0] == Decimal("0.00")
+    assert invoice_state(cursor, second)[0] == Decimal("60.00")
+
+
+def test_full_payment_marks_invoice_paid_and_clears_client_due(cursor):
+    """Test that covering the total flips the invoice to paid and the client total follows"""
+    client_id = insert_client(cursor)
+    invoice_id = insert_invoice(cursor, client_id, "TRG-1", 100, status="sent")
+    assert client_totals(cursor, client_id) == (1, Decimal("100.00"))
+
+    insert_payment(cursor, invoice_id, 60)
+    assert invoice_state(cursor, invoice_id) == (Decimal("60.00"), "sent")
+
+    insert_payment(cursor, invoice_id, 40)
+    assert invoice_state(cursor, invoice_id) == (Decimal("100.00"), "paid")
+    assert client_totals(cursor, client_id) == (1, Decimal("0.00"))
+
+
+def test_cancelled_invoices_are_not_marked_paid(cursor):
+    """Test that only draft, sent and overdue invoices move to paid"""
+    client_id = insert_client(cursor)
+    invoice_id = insert_invoice(cursor, client_id, "TRG-1", 50, status="cancelled")
+
+    insert_payment(cursor, invoice_id, 50)
+
+    assert invoice_state(cursor, invoice_id) == (Decimal("50.00"), "cancelled")
+
+
+def test_invoice_changes_maintain_client_totals(cursor):
+    """Test that invoice inserts, status and total changes, moves and deletes update client totals"""
+    client_id = insert_client(cursor)
+    other_id = insert_client(cursor, "other-triggers@example.com")
+
+    draft = insert_invoice(cursor, client_id, "TRG-1", 100)
+    overdue = insert_invoice(cursor, client_id, "TRG-2", 50, status="overdue")
+    assert client_totals(cursor, client_id) == (2, Decimal("50.00"))
+
+    cursor.execute("UPDATE public.invoices SET status = 'sent' WHERE id = %s", (draft,))
+    assert client_totals(cursor, client_id) == (2, Decimal("150.00"))
+
+    cursor.execute("UPDATE public.invoices SET total_amount = 120, subtotal = 120 WHERE id = %s", (draft,))
+    assert client_totals(cursor, client_id) == (2, Decimal("170.00"))
+
+    cursor.execute("UPDATE public.invoices SET client_id = %s WHERE id = %s", (other_id, overdue))
+    assert client_totals(cursor, client_id) == (1, Decimal("120.00"))
+    assert client_totals(cursor, other_id) == (1, Decimal("50.00"))
+
+    cursor.execute("DELETE FROM public.invoices WHERE id = %s", (draft,))
+    assert client_totals(cursor, client_id) == (0, Decimal("0.00"))
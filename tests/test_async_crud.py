@@ -0,0 +1,130 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timezone, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.async_crud import AsyncCRUDService
+from src.database.crud import CRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.models import (
+    ClientCreate, ClientUpdate, InvoiceCreate, InvoiceItem, InvoiceUpdate, InvoiceStatus,
+    PaymentCreate, PaymentUpdate, PaymentStatus
+)
+from tests.fake_supabase import FakeSupabase, AsyncFakeSupabase
+
+
+def make_crud():
+    return AsyncCRUDService(client=AsyncFakeSupabase(), cache=EntityCache(local=LRUCache(), redis_url=None))
+
+
+def make_invoice(client_id, total=100.0):
+    now = datetime.now(timezone.utc)
+    return InvoiceCreate(
+        client_id=client_id, issue_date=now, due_date=now + timedelta(days=30),
+        items=[InvoiceItem(description="Work", quantity=1, unit_price=total, total=total)]
+    )
+
+
+def test_client_crud():
+    """Test async create, get, list, update and soft delete of clients"""
+    crud = make_crud()
+
+    async def run():
+        client = await crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+        fetched = await crud.get_client(client.id)
+        updated = await crud.update_client(client.id, ClientUpdate(name="Acme Ltd"))
+        renamed = await crud.get_client(client.id)
+        listed = await crud.get_clients()
+        deleted = await crud.delete_client(client.id)
+        return client, fetched, updated, renamed, listed, deleted, await crud.get_clients()
+
+    client, fetched, updated, renamed, listed, deleted, after_delete = asyncio.run(run())
+    assert fetched.email == "billing@acme.com"
+    assert updated.name == renamed.name == "Acme Ltd"
+    assert [item.id for item in listed.items] == [client.id] and listed.total == 1
+    assert deleted is True
+    assert after_delete.items == [] and after_delete.total == 0
+
+
+def test_invoice_crud():
+    """Test async create, get, list, update and delete of invoices"""
+    crud = make_crud()
+
+    async def run():
+        client = await crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+        invoice = await crud.create_invoice(make_invoice(client.id, 100.0))
+        await crud.create_invoice(make_invoice(client.id, 50.0))
+        fetched = await crud.get_invoice(invoice.id)
+        updated = await crud.update_invoice(
+            invoice.id,
+            InvoiceUpdate(status=InvoiceStatus.SENT, items=[
+                InvoiceItem(description="Work", quantity=2, unit_price=75.0, total=150.0)
+            ])
+        )
+        sent = await crud.get_invoices(status=InvoiceStatus.SENT)
+        by_client = await crud.get_invoices(client_id=client.id)
+        deleted = await crud.delete_invoice(invoice.id)
+        return invoice, fetched, updated, sent, by_client, deleted, await crud.get_invoice(invoice.id)
+
+    invoice, fetched, updated, sent, by_client, deleted, missing = asyncio.run(run())
+    assert fetched.client_name == "Acme"
+    assert fetched.total_amount == 100.0
+    assert updated.status == InvoiceStatus.SENT
+    assert updated.subtotal == 150.0
+    assert [item.id for item in sent.items] == [invoice.id]
+    assert by_client.total == 2
+    assert deleted is True
+    assert missing is None
+
+
+def test_payment_crud():
+    """Test async create, get, list, update and delete of payments"""
+    crud = make_crud()
+
+    async def run():
+        client = await crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+        invoice = await crud.create_invoice(make_invoice(client.id, 100.0))
+        payment = await crud.create_payment(PaymentCreate(
+            invoice_id=invoice.id, amount=40.0, payment_date=datetime.now(timezone.utc),
+            payment_method="card", status=PaymentStatus.COMPLETED, transaction_id="tx-1"
+        ))
+        fetched = await crud.get_payment(payment.id)
+        listed = await crud.get_payments(invoice_id=invoice.id)
+        updated = await crud.update_payment(payment.id, PaymentUpdate(status=PaymentStatus.REFUNDED))
+        refunded = await crud.get_invoice(invoice.id)
+        deleted = await crud.delete_payment(payment.id)
+        return payment, fetched, listed, updated, refunded, deleted, await crud.get_payment(payment.id)
+
+    payment, fetched, listed, updated, refunded, deleted, missing = asyncio.run(run())
+    assert fetched.amount == 40.0
+    assert [item.id for item in listed.items] == [payment.id]
+    assert updated.status == PaymentStatus.REFUNDED
+    assert refunded.amount_paid == 0
+    assert deleted is True
+    assert missing is None
+
+
+def test_bulk_create_results_match_the_sync_service():
+    """Test that both services report the same results for a rerun import with an unknown client"""
+    import_id = "0b5f7f0e-2d7a-4c55-8f7e-6a3c1c9a0e11"
+    sync_crud = CRUDService(client=FakeSupabase(), cache=EntityCache(local=LRUCache(), redis_url=None))
+    async_crud = make_crud()
+
+    def outcomes(results):
+        return [(result.index, result.success, result.error) for result in results]
+
+    sync_client = sync_crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+    sync_batch = [make_invoice(sync_client.id), make_invoice("missing"), make_invoice(sync_client.id)]
+    sync_crud.create_invoices_bulk(sync_batch[:1], import_id=import_id)
+    expected = outcomes(sync_crud.create_invoices_bulk(sync_batch, import_id=import_id))
+
+    async def run():
+        client = await async_crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+        batch = [make_invoice(client.id), make_invoice("missing"), make_invoice(client.id)]
+        await async_crud.create_invoices_bulk(batch[:1], import_id=import_id)
+        return await async_crud.create_invoices_bulk(batch, import_id=import_id)
+
+    assert outcomes(asyncio.run(run())) == expected == [
+        (0, True, None), (1, False, "Client missing not found"), (2, True, None)
+    ]
@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.cache import LRUCache, EntityCache
+from src.database.models import ClientResponse
+
+
+def test_lru_evicts_least_recently_used():
+    """Test that the local tier stays bounded"""
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert len(cache) == 2
+
+
+def test_lru_entries_expire():
+    """Test that entries are dropped after their TTL"""
+    cache = LRUCache(max_size=10, ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_entity_cache_read_through_and_invalidate():
+    """Test hit/miss accounting and invalidation without Redis"""
+    cache = EntityCache(local=LRUCache(max_size=10, ttl=60), redis_url=None, enabled=True)
+    client = ClientResponse(id="c1", name="Acme", email="billing@acme.com", total_invoices=3)
+
+    assert cache.get("client", "c1", ClientResponse) is None
+    cache.set("client", "c1", client)
+    cached = cache.get("client", "c1", ClientResponse)
+    assert cached == client
+    assert cached is not client
+
+    cache.invalidate("client", "c1")
+    assert cache.get("client", "c1", ClientResponse) is None
+
+    stats = cache.stats()
+    assert stats["local_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["invalidations"] == 1
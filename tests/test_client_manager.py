@@ -0,0 +1,38 @@
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from src.database.supabase_client import SupabaseClientManager, SERVICE_ROLE
+
+KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.signature"
+
+
+def test_clients_are_shared_per_role_and_use_pooled_sessions():
+    """Test that each role gets one client whose SDK sessions are pooled and closed on shutdown"""
+    manager = SupabaseClientManager("http://localhost:54321", KEY, KEY)
+
+    anon = manager.get_client()
+    admin = manager.get_client(SERVICE_ROLE)
+
+    assert manager.get_client() is anon
+    assert manager.get_client(SERVICE_ROLE) is admin
+    assert admin is not anon
+    # The storage bucket API must use the same pooled session as the storage client
+    assert anon.storage._client is anon.storage.session
+    assert str(anon.postgrest.session.base_url) == "http://localhost:54321/rest/v1/"
+
+    sessions = list(manager._sessions)
+    asyncio.run(manager.aclose())
+
+    assert all(session.is_closed for session in sessions)
+    assert manager.get_client() is not anon
+
+
+def test_missing_service_role_key_is_reported():
+    """Test that a role without a key raises the configuration error"""
+    manager = SupabaseClientManager("http://localhost:54321", KEY, "")
+
+    with pytest.raises(ValueError, match="SUPABASE_SERVICE_ROLE_KEY"):
+        manager.get_client(SERVICE_ROLE)
@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.documents import (
+    DocumentRenderer, DEFAULT_INVOICE_TEMPLATE, build_render_context,
+    content_hash, document_path, _compile_template
+)
+
+
+INVOICE = {
+    "id": "inv-1",
+    "client_id": "client-1",
+    "invoice_number": "INV-2024-0001",
+    "issue_date": "2024-01-01T00:00:00+00:00",
+    "due_date": "2024-01-31T00:00:00+00:00",
+    "items": [{"description": "Consulting", "quantity": 2, "unit_price": 1200.5, "total": 2401.0}],
+    "subtotal": 2401.0,
+    "tax_amount": 240.1,
+    "discount_amount": 0,
+    "total_amount": 2641.1,
+    "amount_paid": 0,
+    "pdf_url": None,
+    "updated_at": "2024-01-01T00:00:00+00:00",
+}
+CLIENT = {"id": "client-1", "name": "Acme <Corp>", "email": "billing@acme.test", "total_invoices": 3}
+
+
+class RowsClient:
+    """Stand-in for the Supabase client returning fixed invoice and client rows."""
+
+    def __init__(self, invoice):
+        self.rows = {"invoices": [invoice], "clients": [CLIENT]}
+
+    def table(self, name):
+        rows = self.rows[name]
+
+        class _Query:
+            def select(self, columns):
+                return self
+
+            def in_(self, column, values):
+                return self
+
+            def execute(self):
+                return type("Response", (), {"data": rows})()
+
+        return _Query()
+
+
+def test_content_hash_ignores_volatile_columns():
+    """Test that pdf_url, updated_at, amount_paid and client counters do not change the hash"""
+    context = build_render_context(INVOICE, CLIENT)
+    touched = dict(INVOICE, pdf_url="https://x/y.pdf", updated_at="2025-01-01T00:00:00+00:00", amount_paid=100.0)
+    counted = dict(CLIENT, total_invoices=4)
+
+    assert content_hash("t1", context) == content_hash("t1", build_render_context(touched, counted))
+    assert content_hash("t1", context) != content_hash("t2", context)
+    assert content_hash("t1", context) != content_hash("t1", build_render_context(dict(INVOICE, total_amount=1), CLIENT))
+
+
+def test_default_template_renders_escaped_html():
+    """Test that templates are compiled once and escape invoice data"""
+    template = _compile_template("default", DEFAULT_INVOICE_TEMPLATE)
+    html = template.render(**build_render_context(INVOICE, CLIENT))
+
+    assert _compile_template("default", DEFAULT_INVOICE_TEMPLATE) is template
+    assert "Acme &lt;Corp&gt;" in html
+    assert "2,641.10" in html
+
+
+def test_current_document_is_not_rendered_again():
+    """Test that an invoice already pointing at its content hash skips the pool"""
+    renderer = DocumentRenderer(client=RowsClient(INVOICE), workers=1)
+    renderer.templates.set("invoice.html", ("default", DEFAULT_INVOICE_TEMPLATE))
+    digest = content_hash("default", build_render_context(INVOICE, CLIENT))
+    url = f"https://storage.test/invoice-documents/{document_path('inv-1', digest)}"
+    renderer.client.rows["invoices"] = [dict(INVOICE, pdf_url=url)]
+
+    result = renderer.render_invoice("inv-1")
+
+    assert result.success and not result.rendered
+    assert result.content_hash == digest
+    assert result.pdf_url == url
+    assert renderer._pool is None
@@ -0,0 +1,161 @@
+import sys
+import os
+import io
+import csv
+import json
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pydantic import ValidationError
+from src.database.exports import (
+    ExportService, ExportRequest, ExportFormat, ExportStatus, EXPORT_TABLES, EXPORT_WRITERS, write_csv, write_parquet
+)
+from tests.fake_supabase import FakeSupabase
+
+PAGES = [
+    [{"id": "p1", "invoice_id": "i1", "amount": 10, "status": "completed", "notes": "a,b"}],
+    [{"id": "p2", "invoice_id": "i1", "amount": 2.5, "status": "pending", "notes": None}],
+]
+
+
+class FakeRedis:
+    """Keys with TTLs, like the Redis commands used for export state."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+
+class FakeStorage:
+    """Records resumable uploads to the exports bucket."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.uploads = {}
+
+    def upload_resumable(self, bucket_type, fileobj, path, size=None, content_type=None, upsert=False):
+        if self.fail:
+            return None
+        self.uploads[path] = fileobj.read()
+        return {"path": path, "public_url": f"https://storage.test/{path}"}
+
+
+def make_service(storage=None, page_size=2):
+    db = FakeSupabase()
+    for amount in (10, 20, 30):
+        db.table("payments").insert({
+            "invoice_id": "inv-1", "amount": amount, "payment_date": "2024-01-01T00:00:00+00:00",
+            "payment_method": "card", "status": "pending"
+        }).execute()
+    return ExportService(client=db, storage=storage or FakeStorage(), page_size=page_size, connection=FakeRedis())
+
+
+def test_csv_writer_streams_every_page():
+    """Test that pages are written as one CSV with a header and escaped values"""
+    columns = EXPORT_TABLES["payments"]
+    sink = io.BytesIO()
+
+    assert write_csv(iter(PAGES), columns, sink) == 2
+
+    rows = list(csv.DictReader(io.StringIO(sink.getvalue().decode("utf-8"))))
+    assert [row["id"] for row in rows] == ["p1", "p2"]
+    assert rows[0]["notes"] == "a,b"
+    assert rows[1]["amount"] == "2.5"
+    assert list(rows[0]) == list(columns)
+
+
+def test_parquet_writer_keeps_schema():
+    """Test that every page lands in the Parquet file with the export column types"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = io.BytesIO()
+
+    assert write_parquet(iter(PAGES), EXPORT_TABLES["payments"], sink) == 2
+
+    table = pq.read_table(io.BytesIO(sink.getvalue()))
+    assert table.num_rows == 2
+    assert table.column("amount").to_pylist() == [10.0, 2.5]
+    assert str(table.schema.field("amount").type) == "double"
+
+
+def test_request_rejects_unknown_filter_columns():
+    """Test that filters are checked against the table's export columns"""
+    assert ExportRequest(table="payments", filters={"status": "completed"}).filters == {"status": "completed"}
+    with pytest.raises(ValidationError):
+        ExportRequest(table="payments", filters={"client_id": "c1"})
+    with pytest.raises(ValidationError):
+        ExportRequest(table="clients")
+
+
+def test_job_moves_from_pending_to_completed():
+    """Test that job state is persisted with a TTL and reaches completed"""
+    storage = FakeStorage()
+    service = make_service(storage)
+
+    job = service.create_job(ExportRequest(table="payments", format=ExportFormat.JSONL))
+    assert service.get_job(job.id).status == ExportStatus.PENDING
+    assert service._redis.ttls[service.job_key(job.id)] == service.job_ttl
+
+    service.run_export(job.id)
+
+    stored = service.get_job(job.id)
+    assert stored.status == ExportStatus.COMPLETED
+    assert stored.rows_exported == 3
+    assert stored.progress == 1.0
+    lines = storage.uploads[stored.storage_path].decode("utf-8").splitlines()
+    assert sorted(json.loads(line)["amount"] for line in lines) == [10, 20, 30]
+
+
+def test_job_failure_is_recorded():
+    """Test that a failed upload leaves the job failed and raises for a retry"""
+    storage = FakeStorage(fail=True)
+    service = make_service(storage)
+
+    job = service.create_job(ExportRequest(table="payments"))
+    with pytest.raises(IOError):
+        service.run_export(job.id)
+
+    stored = service.get_job(job.id)
+    assert stored.status == ExportStatus.FAILED
+    assert stored.error == "Upload to storage failed"
+    assert stored.finished_at is not None
+
+    storage.fail = False
+    assert service.run_export(job.id).status == ExportStatus.COMPLETED
+
+
+def test_invalid_export_fails_without_retry(monkeypatch):
+    """Test that a ValueError fails the job for good instead of raising"""
+    def missing_pyarrow(pages, columns, sink):
+        raise ValueError("Parquet exports require the 'pyarrow' package (the 'parquet' extra)")
+
+    monkeypatch.setitem(EXPORT_WRITERS, ExportFormat.PARQUET, missing_pyarrow)
+    service = make_service()
+    job = service.create_job(ExportRequest(table="payments", format=ExportFormat.PARQUET))
+
+    stored = service.run_export(job.id)
+
+    assert stored.status == ExportStatus.FAILED
+    assert "pyarrow" in stored.error
+    assert service.get_job(job.id).status == ExportStatus.FAILED
+
+
+def test_redelivered_export_is_not_run_again():
+    """Test that a completed export is returned as is when its task runs again"""
+    storage = FakeStorage()
+    service = make_service(storage)
+    job = service.create_job(ExportRequest(table="payments"))
+
+    service.run_export(job.id)
+    storage.uploads.clear()
+    rerun = service.run_export(job.id)
+
+    assert rerun.status == ExportStatus.COMPLETED
+    assert rerun.rows_exported == 3
+    assert storage.uploads == {}
@@ -0,0 +1,97 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timezone, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.crud import CRUDService
+from src.database.async_crud import AsyncCRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.models import (
+    ClientCreate, InvoiceCreate, InvoiceItem, InvoiceUpdate, InvoiceStatus, PaymentCreate, PaymentStatus,
+    PaymentUpdate
+)
+from tests.fake_supabase import FakeSupabase, AsyncFakeSupabase
+
+
+def make_invoice(client_id, total=100.0):
+    now = datetime.now(timezone.utc)
+    return InvoiceCreate(
+        client_id=client_id, issue_date=now, due_date=now + timedelta(days=30),
+        items=[InvoiceItem(description="Work", quantity=1, unit_price=total, total=total)]
+    )
+
+
+def make_payment(invoice_id, amount, transaction_id):
+    return PaymentCreate(
+        invoice_id=invoice_id, amount=amount, payment_date=datetime.now(timezone.utc),
+        payment_method="card", status=PaymentStatus.COMPLETED, transaction_id=transaction_id
+    )
+
+
+def make_crud(db, service=CRUDService):
+    return service(client=db, cache=EntityCache(local=LRUCache(), redis_url=None))
+
+
+def test_invoice_lifecycle_keeps_aggregates_current():
+    """Test that the fake's triggers update client and invoice totals like the database"""
+    db = FakeSupabase()
+    crud = make_crud(db)
+
+    client = crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+    invoice = crud.create_invoice(make_invoice(client.id, 100.0))
+    assert invoice.invoice_number == f"INV-{datetime.now(timezone.utc).year}-000001"
+
+    crud.update_invoice(invoice.id, InvoiceUpdate(status=InvoiceStatus.SENT))
+    assert crud.get_client(client.id).total_amount_due == 100.0
+
+    db.reset_stats()
+    result = crud.record_payment(make_payment(invoice.id, 100.0, "tx-1"))
+    assert result.created is True
+    assert result.invoice.status == InvoiceStatus.PAID
+    assert db.round_trips == 1
+
+    retry = crud.record_payment(make_payment(invoice.id, 100.0, "tx-1"))
+    assert retry.created is False
+    assert crud.get_invoice(invoice.id).amount_paid == 100.0
+    assert crud.get_client(client.id).total_amount_due == 0
+
+
+def test_payment_update_refreshes_cached_client_without_cached_invoice():
+    """Test that a payment update invalidates the client even when the invoice is not cached"""
+    db = FakeSupabase()
+    crud = make_crud(db)
+    client = crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+    invoice = crud.create_invoice(make_invoice(client.id, 100.0))
+    crud.update_invoice(invoice.id, InvoiceUpdate(status=InvoiceStatus.SENT))
+    payment = crud.create_payment(make_payment(invoice.id, 100.0, "tx-1").model_copy(
+        update={"status": PaymentStatus.PENDING}
+    ))
+
+    assert crud.get_client(client.id).total_amount_due == 100.0
+    crud.cache.invalidate("invoice", invoice.id)
+
+    # Completing the payment marks the invoice paid, which clears the client's due amount
+    crud.update_payment(payment.id, PaymentUpdate(status=PaymentStatus.COMPLETED))
+    assert crud.get_client(client.id).total_amount_due == 0
+
+
+def test_keyset_pages_cover_every_invoice_once():
+    """Test that keyset pagination over the fake returns each row exactly once"""
+    db = AsyncFakeSupabase()
+    crud = make_crud(db, AsyncCRUDService)
+
+    async def run():
+        client = await crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+        created = await crud.create_invoices_bulk([make_invoice(client.id, 10.0 + i) for i in range(7)])
+        seen, cursor = [], None
+        while True:
+            page = await crud.get_invoices(limit=3, cursor=cursor, keyset=True, count=None)
+            seen.extend(invoice.id for invoice in page.items)
+            cursor = page.next_cursor
+            if not cursor:
+                return created, seen
+
+    created, seen = asyncio.run(run())
+    assert sorted(seen) == sorted(result.invoice.id for result in created)
+    assert db.requests[("rest", "invoices", "GET")] == 3
@@ -0,0 +1,48 @@
+import sys
+import os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database import health
+from src.database.health import HealthMonitor
+
+
+def failing_storage():
+    raise RuntimeError("storage down")
+
+
+def test_snapshot_serves_last_check(monkeypatch):
+    """Test that probes run in check() and snapshot() only reads the cache"""
+    calls = []
+    monkeypatch.setattr(health, "get_supabase_client", lambda: SimpleNamespace(supabase_url="http://db"))
+    monkeypatch.setattr(health, "test_connection", lambda: calls.append(1) or True)
+    monkeypatch.setattr(health, "get_storage_service", failing_storage)
+    
+    monitor = HealthMonitor(interval=60)
+    assert monitor.snapshot()["status"] == "starting"
+    
+    monitor.check()
+    snapshot = monitor.snapshot()
+    
+    assert len(calls) == 1
+    assert snapshot["status"] == "degraded"
+    assert snapshot["unhealthy_services"] == ["storage"]
+    assert snapshot["services"]["database"]["status"] == "healthy"
+    assert snapshot["age_seconds"] is not None
+
+
+def test_snapshot_reports_stale(monkeypatch):
+    """Test that an old healthy snapshot is reported as stale"""
+    monkeypatch.setattr(health, "get_supabase_client", lambda: SimpleNamespace(supabase_url="http://db"))
+    monkeypatch.setattr(health, "test_connection", lambda: True)
+    monkeypatch.setattr(health, "get_storage_service", lambda: SimpleNamespace(
+        client=SimpleNamespace(storage=SimpleNamespace(list_buckets=lambda: [])),
+        buckets={}
+    ))
+    
+    monitor = HealthMonitor(interval=1)
+    monitor.check()
+    assert monitor.snapshot()["status"] == "ok"
+    
+    monitor._checked_at -= 10
+    assert monitor.snapshot()["status"] == "stale"
@@ -0,0 +1,144 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime, timezone, timedelta
+from src.database import jobs
+from src.database.jobs import JobQueue, JobWorker, JobStatus, job_task
+from src.database.crud import CRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.models import ClientCreate, InvoiceCreate, InvoiceItem
+from tests.fake_supabase import FakeSupabase
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands used by the job queue."""
+
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+        self.zsets = {}
+
+    def register_script(self, source):
+        def claim(keys, args):
+            ready, delayed, inflight = keys
+            now, deadline = args
+            for zset in (delayed, inflight):
+                for job_id, score in list(self.zsets.get(zset, {}).items()):
+                    if score <= now:
+                        self.zrem(zset, job_id)
+                        self.lpush(ready, job_id)
+            job_id = self.lists.get(ready, []).pop() if self.lists.get(ready) else None
+            if job_id:
+                self.zadd(inflight, {job_id: deadline})
+            return job_id
+        return claim
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def zadd(self, key, mapping, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or member in zset:
+                zset[member] = score
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+
+calls = []
+
+
+@job_task("tests.flaky")
+def flaky(fail_times):
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise RuntimeError("temporary failure")
+    return {"calls": len(calls)}
+
+
+def make_queue(**kwargs):
+    return JobQueue(connection=FakeRedis(), retry_backoff=0, **kwargs)
+
+
+def test_failed_job_is_retried_until_it_succeeds():
+    """Test that a failing job is rescheduled and succeeds on a later attempt"""
+    calls.clear()
+    queue = make_queue()
+    worker = JobWorker(queue)
+    job = queue.enqueue("tests.flaky", fail_times=1)
+
+    assert worker.run_once().status == JobStatus.RETRYING
+    assert worker.run_once().status == JobStatus.SUCCEEDED
+
+    stored = queue.get_job(job.id)
+    assert stored.attempts == 2
+    assert stored.result == {"calls": 2}
+    assert worker.run_once() is None
+
+
+def test_job_fails_after_max_attempts():
+    """Test that retries stop once max_attempts is reached"""
+    calls.clear()
+    queue = make_queue()
+    worker = JobWorker(queue)
+    job = queue.enqueue("tests.flaky", max_attempts=2, fail_times=5)
+
+    worker.run_once()
+    worker.run_once()
+
+    stored = queue.get_job(job.id)
+    assert stored.status == JobStatus.FAILED
+    assert stored.error == "temporary failure"
+    assert worker.run_once() is None
+
+
+def test_expired_claim_is_redelivered():
+    """Test that a job claimed by a dead worker becomes visible again"""
+    queue = make_queue(visibility_timeout=0)
+    job = queue.enqueue("tests.flaky", fail_times=0)
+
+    assert queue.claim().id == job.id
+    # The first claimant never acknowledged; the deadline has already passed
+    assert queue.claim().id == job.id
+
+
+def test_redelivered_bulk_import_does_not_duplicate_invoices(monkeypatch):
+    """Test that rerunning an import only creates the invoices the first run did not"""
+    db = FakeSupabase()
+    crud = CRUDService(client=db, cache=EntityCache(local=LRUCache(), redis_url=None))
+    monkeypatch.setattr(jobs, "get_crud_service", lambda: crud)
+    client = crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+    now = datetime.now(timezone.utc)
+    invoices = [
+        InvoiceCreate(
+            client_id=client.id, issue_date=now, due_date=now + timedelta(days=30),
+            items=[InvoiceItem(description=f"Item {i}", quantity=1, unit_price=10.0, total=10.0)]
+        ).model_dump(mode="json")
+        for i in range(3)
+    ]
+    import_id = "6f1c9a52-4c1e-4d7e-9d1e-1f6a0c2b3d4e"
+
+    # A first delivery that died after inserting the first two invoices
+    first = jobs.create_invoices_bulk_task(invoices[:2], import_id=import_id)
+    results = jobs.create_invoices_bulk_task(invoices, import_id=import_id)
+
+    assert [result.invoice.id for result in results[:2]] == [result.invoice.id for result in first]
+    assert all(result.success for result in results)
+    assert len(db.tables["invoices"]) == 3
+    assert sorted(row["invoice_number"] for row in db.tables["invoices"].values()) == [
+        f"INV-{now.year}-{i:06d}" for i in (1, 2, 3)
+    ]
@@ -0,0 +1,89 @@
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.async_crud import AsyncCRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.loader import BatchLoader, LoaderScopeMiddleware, loader_scope, peek_request_loader
+from src.database.models import ClientCreate
+from tests.fake_supabase import AsyncFakeSupabase
+
+
+def test_concurrent_lookups_share_one_query():
+    """Test that concurrent get_client cache misses are coalesced into one in_() query"""
+    db = AsyncFakeSupabase(latency=0.005)
+    crud = AsyncCRUDService(client=db, cache=EntityCache(local=LRUCache(), redis_url=None, enabled=False))
+
+    async def run():
+        ids = []
+        for i in range(5):
+            client = await crud.create_client(ClientCreate(name=f"Client {i}", email=f"client{i}@example.com"))
+            ids.append(client.id)
+        db.reset_stats()
+        with loader_scope():
+            clients = await asyncio.gather(*(crud.get_client(ids[i % 5]) for i in range(50)))
+            stats = peek_request_loader(crud, "client").stats()
+        return ids, clients, stats
+
+    ids, clients, stats = asyncio.run(run())
+    assert [client.id for client in clients[:5]] == ids
+    assert db.round_trips == 1
+    assert stats == {"loads": 50, "batches": 1, "coalesced": 45}
+
+
+def test_loaders_are_not_shared_between_requests():
+    """Test that each request gets fresh loaders that are dropped when it ends"""
+    db = AsyncFakeSupabase()
+    crud = AsyncCRUDService(client=db, cache=EntityCache(local=LRUCache(), redis_url=None, enabled=False))
+    seen = []
+
+    async def app(scope, receive, send):
+        await crud.get_client("missing")
+        seen.append(peek_request_loader(crud, "client"))
+
+    async def run():
+        middleware = LoaderScopeMiddleware(app)
+        await middleware({"type": "http"}, None, None)
+        await middleware({"type": "http"}, None, None)
+        return await crud.get_client("missing")
+
+    assert asyncio.run(run()) is None
+    assert None not in seen and seen[0] is not seen[1]
+    assert peek_request_loader(crud, "client") is None
+
+
+def test_forget_detaches_in_flight_loads():
+    """Test that a load after forget() does not join a fetch sent before the write"""
+    versions = {"a": 1}
+
+    async def fetch(keys):
+        row = {"id": "a", "version": versions["a"]}
+        await asyncio.sleep(0.02)
+        return {"a": row}
+
+    async def run():
+        loader = BatchLoader(fetch, window_ms=0)
+        stale = asyncio.ensure_future(loader.load("a"))
+        await asyncio.sleep(0.005)  # the batch has been read and is in flight
+        versions["a"] = 2
+        loader.forget("a")
+        return await stale, await loader.load("a"), loader.stats()["batches"]
+
+    stale, fresh, batches = asyncio.run(run())
+    assert stale["version"] == 1
+    assert fresh["version"] == 2
+    assert batches == 2
+
+
+def test_fetch_errors_reach_every_waiter():
+    """Test that a failed batch raises in each coalesced caller"""
+    async def fetch(keys):
+        raise RuntimeError("database unavailable")
+
+    async def run():
+        loader = BatchLoader(fetch, window_ms=1)
+        return await asyncio.gather(loader.load("a"), loader.load("a"), loader.load("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
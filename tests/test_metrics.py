@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.utils.metrics import (
+    MetricsRegistry, MeteredTransport, MetricsMiddleware, timed,
+    OPERATION_ROUND_TRIPS, OPERATION_ROWS, OPERATION_ERRORS, SUPABASE_ROWS, HTTP_REQUEST_DURATION
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the Prometheus text format of a labelled histogram"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    text = registry.render()
+
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{route="/a"} 3' in text
+
+
+def test_round_trips_and_rows_are_attributed_to_the_service_call(monkeypatch):
+    """Test that each PostgREST request made inside a timed call is counted once"""
+    class Body(httpx.SyncByteStream):
+        def __iter__(self):
+            yield b"[{},{},{}]"
+
+    def fake_send(self, request):
+        return httpx.Response(200, headers={"content-range": "0-2/3"}, stream=Body())
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", fake_send)
+    session = httpx.Client(base_url="http://db/rest/v1/", transport=MeteredTransport())
+
+    @timed("test", "load_invoices")
+    def load_invoices():
+        # An N+1: one request per invoice
+        return [session.get("metrics_invoices").json() for _ in range(4)]
+
+    rows_before = SUPABASE_ROWS.value("metrics_invoices", "GET")
+    load_invoices()
+
+    assert OPERATION_ROUND_TRIPS.count("test", "load_invoices") == 1
+    assert OPERATION_ROUND_TRIPS._values[("test", "load_invoices")][-1] == 4
+    assert OPERATION_ROWS.value("test", "load_invoices") == 12
+    assert SUPABASE_ROWS.value("metrics_invoices", "GET") - rows_before == 12
+
+
+def test_only_unexpected_exceptions_count_as_errors():
+    """Test that not-found returns and validation errors are not counted as errors"""
+    @timed("metrics_test", "lookup")
+    def lookup(outcome):
+        if outcome == "invalid":
+            raise ValueError("bad input")
+        if outcome == "broken":
+            raise RuntimeError("connection reset")
+        return None if outcome == "missing" else False
+
+    lookup("missing")
+    lookup("rejected")
+    with pytest.raises(ValueError):
+        lookup("invalid")
+    assert OPERATION_ERRORS.value("metrics_test", "lookup") == 0
+
+    with pytest.raises(RuntimeError):
+        lookup("broken")
+    assert OPERATION_ERRORS.value("metrics_test", "lookup") == 1
+
+
+def test_middleware_labels_requests_by_route_template():
+    """Test that path parameters do not create a series per ID"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/v1/metrics-test/{item_id}")
+    def read_item(item_id: str):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/v1/metrics-test/1")
+    client.get("/v1/metrics-test/2")
+
+    assert HTTP_REQUEST_DURATION.count("GET", "/v1/metrics-test/{item_id}", "200") == 2
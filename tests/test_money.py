@@ -0,0 +1,68 @@
+import sys
+import os
+import random
+from decimal import Decimal, ROUND_HALF_UP
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.money import to_cents, calculate_totals, calculate_totals_batch
+from src.database.models import InvoiceItem
+
+
+def test_to_cents_rounds_half_up_on_decimal_value():
+    """Test that floats round by their decimal representation"""
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents(0.285) == 29
+    assert to_cents(1.005) == 101
+    assert to_cents("19.999") == 2000
+
+
+def test_tax_is_rounded_once_per_rate():
+    """Test multi-rate invoices and per-rate rounding"""
+    items = [
+        InvoiceItem(description="Book", quantity=1, unit_price=10.0, total=10.0, tax_rate=0.07),
+        InvoiceItem(description="Pen", quantity=3, unit_price=0.35, total=1.05),
+        InvoiceItem(description="Pad", quantity=1, unit_price=2.1, total=2.1),
+    ]
+    totals = calculate_totals(items, tax_rate=0.19, discount_amount=1.0)
+    
+    assert totals.subtotal == 1315
+    # 19% of 3.15 = 0.5985 -> 0.60, 7% of 10.00 = 0.70
+    assert [(line.rate, line.tax) for line in totals.tax_lines] == [(0.07, 70), (0.19, 60)]
+    assert totals.total == 1315 + 130 - 100
+    assert totals.as_columns() == {"subtotal": 13.15, "tax_amount": 1.3, "total_amount": 13.45}
+
+
+def reference_totals(items, tax_rate, discount):
+    """Decimal implementation of the documented rounding rules."""
+    cent = Decimal("0.01")
+    groups = {}
+    for item in items:
+        rate = Decimal(repr(item["tax_rate"] if item["tax_rate"] is not None else tax_rate))
+        line = Decimal(repr(item["total"])).quantize(cent, rounding=ROUND_HALF_UP)
+        groups[rate] = groups.get(rate, Decimal(0)) + line
+    subtotal = sum(groups.values(), Decimal(0))
+    tax = sum(
+        ((amount * rate).quantize(cent, rounding=ROUND_HALF_UP) for rate, amount in groups.items()),
+        Decimal(0)
+    )
+    return int(subtotal * 100), int(tax * 100), int((subtotal + tax - Decimal(repr(discount))) * 100)
+
+
+def test_batch_matches_decimal_reference():
+    """Test that batch totals match a straightforward Decimal computation"""
+    rng = random.Random(7)
+    invoices = [
+        (
+            [
+                {"total": rng.choice([round(rng.uniform(0, 500), 2), round(rng.uniform(0, 5), 3)]),
+                 "tax_rate": rng.choice([None, 0.05, 0.2])}
+                for _ in range(rng.randint(0, 8))
+            ],
+            rng.choice([0, 0.0825, 0.19]),
+            rng.choice([0, 5])
+        )
+        for _ in range(300)
+    ]
+
+    for invoice, totals in zip(invoices, calculate_totals_batch(invoices)):
+        assert (totals.subtotal, totals.tax, totals.total) == reference_totals(*invoice)
@@ -0,0 +1,47 @@
+import sys
+import os
+from datetime import datetime, timezone, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.crud import CRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.models import ClientCreate, InvoiceCreate, InvoiceItem
+from tests.fake_supabase import FakeSupabase
+
+
+def make_invoice(client_id, issue_date):
+    return InvoiceCreate(
+        client_id=client_id, issue_date=issue_date, due_date=issue_date + timedelta(days=30),
+        items=[InvoiceItem(description="Work", quantity=1, unit_price=10.0, total=10.0)]
+    )
+
+
+def make_crud():
+    db = FakeSupabase()
+    crud = CRUDService(client=db, cache=EntityCache(local=LRUCache(), redis_url=None))
+    client = crud.create_client(ClientCreate(name="Acme", email="billing@acme.com"))
+    return db, crud, client
+
+
+def test_invoice_numbers_are_assigned_on_insert():
+    """Test that the service leaves numbering to the database and never calls an allocation RPC"""
+    db, crud, client = make_crud()
+    issued = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+    first = crud.create_invoice(make_invoice(client.id, issued))
+    second = crud.create_invoice(make_invoice(client.id, issued))
+
+    assert (first.invoice_number, second.invoice_number) == ("INV-2025-000001", "INV-2025-000002")
+    assert not any(kind == "rpc" for kind, _, _ in db.requests)
+
+
+def test_bulk_invoices_are_numbered_in_input_order():
+    """Test that a bulk insert numbers rows in input order, per issue year"""
+    db, crud, client = make_crud()
+    dates = [datetime(2025, 12, 31, tzinfo=timezone.utc)] * 2 + [datetime(2026, 1, 1, tzinfo=timezone.utc)]
+
+    results = crud.create_invoices_bulk([make_invoice(client.id, issued) for issued in dates])
+
+    assert [result.invoice.invoice_number for result in results] == [
+        "INV-2025-000001", "INV-2025-000002", "INV-2026-000001"
+    ]
@@ -0,0 +1,78 @@
+"""
+Database tests for the invoice numbering trigger from 005_create_invoice_number_counters.sql.
+
+Each test runs in a transaction that is rolled back. Needs a Postgres database
+with the migrations applied and psycopg; see tests/test_query_plans.py.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+if not DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+psycopg = pytest.importorskip("psycopg")
+
+# A year no other data is issued in, so its counter starts at zero
+YEAR = 1999
+
+
+@pytest.fixture
+def cursor():
+    """Cursor on a transaction that is rolled back after the test."""
+    with psycopg.connect(DATABASE_URL) as connection:
+        yield connection.cursor()
+        connection.rollback()
+
+
+def insert_client(cursor):
+    cursor.execute(
+        "INSERT INTO public.clients (name, email) VALUES ('Numbering client', 'numbering@example.com') "
+        "RETURNING id"
+    )
+    return cursor.fetchone()[0]
+
+
+def insert_invoice(cursor, client_id, year=YEAR, number=None):
+    cursor.execute(
+        "INSERT INTO public.invoices (invoice_number, client_id, issue_date, due_date, "
+        "subtotal, tax_amount, total_amount, items) "
+        "VALUES (%s, %s, make_timestamptz(%s, 6, 1, 12, 0, 0, 'UTC'), "
+        "make_timestamptz(%s, 7, 1, 12, 0, 0, 'UTC'), 10, 0, 10, '[]') RETURNING invoice_number",
+        (number, client_id, year, year)
+    )
+    return cursor.fetchone()[0]
+
+
+def test_numbers_are_sequential_per_issue_year(cursor):
+    """Test that each issue year has its own sequence starting at 1"""
+    client_id = insert_client(cursor)
+
+    assert insert_invoice(cursor, client_id) == f"INV-{YEAR}-000001"
+    assert insert_invoice(cursor, client_id) == f"INV-{YEAR}-000002"
+    assert insert_invoice(cursor, client_id, year=YEAR - 1) == f"INV-{YEAR - 1}-000001"
+
+
+def test_failed_insert_does_not_leave_a_gap(cursor):
+    """Test that a rolled back insert hands its number to the next invoice"""
+    client_id = insert_client(cursor)
+    assert insert_invoice(cursor, client_id) == f"INV-{YEAR}-000001"
+
+    cursor.execute("SAVEPOINT failing_insert")
+    with pytest.raises(psycopg.errors.ForeignKeyViolation):
+        insert_invoice(cursor, "00000000-0000-0000-0000-000000000000")
+    cursor.execute("ROLLBACK TO SAVEPOINT failing_insert")
+
+    assert insert_invoice(cursor, client_id) == f"INV-{YEAR}-000002"
+
+
+def test_explicit_numbers_are_kept(cursor):
+    """Test that invoices inserted with a number keep it and do not advance the counter"""
+    client_id = insert_client(cursor)
+
+    assert insert_invoice(cursor, client_id, number="LEGACY-42") == "LEGACY-42"
+    assert insert_invoice(cursor, client_id) == f"INV-{YEAR}-000001"
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.overdue import OverdueSweeper
+from src.database.cache import EntityCache, LRUCache
+
+
+class OverdueRPC:
+    """Stand-in for the mark_overdue_invoices RPC."""
+
+    def __init__(self, pending):
+        self.pending = pending
+        self.calls = []
+
+    def rpc(self, name, params):
+        assert name == "mark_overdue_invoices"
+        self.calls.append(params["p_batch_size"])
+        size = min(self.pending, params["p_batch_size"])
+        start = self.pending
+        self.pending -= size
+        rows = [{"id": f"inv-{start - i}", "client_id": "client-1"} for i in range(size)]
+
+        class _Query:
+            def execute(self):
+                return type("Response", (), {"data": rows})()
+
+        return _Query()
+
+
+def make_sweeper(rpc, **kwargs):
+    cache = EntityCache(local=LRUCache(), redis_url=None)
+    return OverdueSweeper(client=rpc, cache=cache, redis_url=None, **kwargs)
+
+
+def test_sweep_runs_bounded_batches_until_drained():
+    """Test that the sweep stops once a batch comes back short"""
+    rpc = OverdueRPC(pending=25)
+    sweeper = make_sweeper(rpc, batch_size=10)
+
+    result = sweeper.sweep()
+
+    assert result == {"marked": 25, "batches": 3, "duration_ms": result["duration_ms"], "skipped": False}
+    assert rpc.calls == [10, 10, 10]
+    assert sweeper.stats()["invoices_marked"] == 25
+
+
+def test_sweep_respects_max_batches():
+    """Test that one sweep never issues more than max_batches updates"""
+    rpc = OverdueRPC(pending=100)
+    sweeper = make_sweeper(rpc, batch_size=10, max_batches=2)
+
+    assert sweeper.sweep()["marked"] == 20
+    assert rpc.pending == 80
@@ -0,0 +1,111 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import uuid
+from src.database.pagination import (
+    encode_cursor, decode_cursor, build_page, validate_count_mode, row_factory,
+    list_projection
+)
+from src.database.models import Payment, Invoice, InvoiceSummary
+from src.utils.responses import FastJSONResponse
+
+
+def make_rows(count):
+    return [
+        {"id": str(uuid.UUID(int=i)), "created_at": f"2024-01-01T00:00:{59 - i:02d}+00:00"}
+        for i in range(count)
+    ]
+
+
+def test_cursor_round_trip():
+    """Test that cursors decode back to the keyset position"""
+    row_id = str(uuid.uuid4())
+    row = {"id": row_id, "created_at": "2024-05-01T10:00:00.123+00:00"}
+    assert decode_cursor(encode_cursor(row)) == ("2024-05-01T10:00:00.123+00:00", row_id)
+
+
+def test_invalid_cursor_is_rejected():
+    """Test that malformed cursors and filter syntax smuggled into them raise ValueError"""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+    
+    injected = [
+        {"created_at": '2024-05-01T10:00:00+00:00",id.gt.0),or(id.neq.', "id": str(uuid.uuid4())},
+        {"created_at": "2024-05-01T10:00:00+00:00", "id": "0),or(status.eq.paid"},
+        {"created_at": None, "id": str(uuid.uuid4())}
+    ]
+    for row in injected:
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(row))
+
+
+def test_invalid_count_mode_is_rejected():
+    """Test that only PostgREST count modes are accepted"""
+    assert validate_count_mode(None) is None
+    assert validate_count_mode("planned") == "planned"
+    with pytest.raises(ValueError):
+        validate_count_mode("approximate")
+
+
+def test_keyset_page_sets_next_cursor_when_more_rows():
+    """Test that the extra row is trimmed and turned into a cursor"""
+    rows = make_rows(11)
+    page = build_page(rows, lambda row: row, skip=0, limit=10, keyset=True)
+    assert len(page.items) == 10
+    assert page.total is None and page.page is None
+    assert decode_cursor(page.next_cursor) == (rows[9]["created_at"], rows[9]["id"])
+
+
+def test_keyset_last_page_has_no_cursor():
+    """Test that the final page does not advertise another one"""
+    page = build_page(make_rows(3), lambda row: row, skip=0, limit=10, keyset=True)
+    assert page.next_cursor is None
+
+
+def test_offset_page_keeps_page_numbers():
+    """Test that offset mode still reports page and page count"""
+    page = build_page(make_rows(10), lambda row: row, skip=20, limit=10, total=45)
+    assert page.page == 3
+    assert page.pages == 5
+    assert page.next_cursor is None
+
+
+def test_trusted_page_matches_validated_page():
+    """Test that the fast path returns the same fields without validation"""
+    rows = [{
+        "id": "pay-1", "invoice_id": "inv-1", "amount": 12.5,
+        "payment_date": "2024-01-01T00:00:00+00:00", "payment_method": "card",
+        "status": "completed", "transaction_id": None, "notes": None,
+        "created_at": "2024-01-01T00:00:00+00:00", "updated_at": None,
+        "unexposed_column": "x"
+    }]
+    
+    validated = build_page(rows, row_factory(Payment), 0, 10, total=1)
+    trusted = build_page(rows, row_factory(Payment, trusted=True), 0, 10, total=1, trusted=True)
+    
+    assert trusted.items[0] == {k: v for k, v in rows[0].items() if k != "unexposed_column"}
+    assert set(trusted.items[0]) == set(validated.items[0].model_dump())
+    
+    body = json.loads(FastJSONResponse(trusted).body)
+    assert body["total"] == 1
+    assert body["items"][0]["amount"] == 12.5
+
+
+def test_list_projection_selects_requested_columns():
+    """Test that sparse fieldsets narrow the select and keep keyset columns"""
+    assert list_projection(Invoice, InvoiceSummary)[0] == "*"
+    
+    columns, _ = list_projection(Invoice, InvoiceSummary, "summary")
+    assert "items" not in columns.split(",")
+    assert "amount_paid" in columns.split(",")
+    
+    columns, factory = list_projection(Invoice, InvoiceSummary, "invoice_number,status")
+    assert columns == "id,created_at,invoice_number,status"
+    row = {"id": "1", "created_at": "t", "invoice_number": "INV-000001", "status": "sent"}
+    assert factory(row) == row
+    
+    with pytest.raises(ValueError):
+        list_projection(Invoice, InvoiceSummary, "invoice_number,password")
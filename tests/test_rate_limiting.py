@@ -0,0 +1,160 @@
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+
+from src.utils import rate_limiting
+from src.utils.rate_limiting import HybridRateLimiter, RateLimit, RateLimitTier
+
+TIER = RateLimitTier("test", 10, 60)
+
+
+class FakeAsyncRedis:
+    """Shared counters behind an async pipeline, like redis.asyncio."""
+
+    def __init__(self, store=None, fail=False):
+        self.store = {} if store is None else store
+        self.fail = fail
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def ping(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return True
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incrby(self, key, amount):
+        self.commands.append(("incrby", key, amount))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+
+    async def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("redis down")
+        results = []
+        for command, key, value in self.commands:
+            if command == "incrby":
+                self.redis.store[key] = self.redis.store.get(key, 0) + value
+                results.append(self.redis.store[key])
+            else:
+                results.append(True)
+        return results
+
+
+def test_local_buckets_are_per_caller_and_cost_weighted():
+    """Test that callers get separate buckets and bulk requests consume more tokens"""
+    limiter = HybridRateLimiter(redis_url=None)
+
+    assert limiter.hit(TIER, "tenant-a", cost=4).remaining == 6
+    assert limiter.hit(TIER, "tenant-a", cost=4).allowed
+    limited = limiter.hit(TIER, "tenant-a", cost=4)
+    assert limited.outcome == "limited"
+    assert 0 < limited.retry_after <= 12
+
+    assert limiter.hit(TIER, "tenant-b", cost=4).allowed
+
+
+def test_processes_share_usage_through_batched_syncs():
+    """Test that usage synced by one process caps what another may grant"""
+    store = {}
+    first = HybridRateLimiter(connection=FakeAsyncRedis(store), redis_url=None, sync_interval_ms=60000, sync_fraction=1)
+    second = HybridRateLimiter(connection=FakeAsyncRedis(store), redis_url=None, sync_interval_ms=60000, sync_fraction=1)
+
+    async def run():
+        for _ in range(6):
+            first.hit(TIER, "tenant-a")
+        await first.sync()
+        second.hit(TIER, "tenant-a")
+        await second.sync()
+        return [second.hit(TIER, "tenant-a").allowed for _ in range(4)]
+
+    assert asyncio.run(run()) == [True, True, True, False]
+    assert list(store.values()) == [7]
+
+
+def test_failure_mode_applies_when_redis_is_down():
+    """Test that fail-closed rejects while fail-open keeps limiting locally"""
+    closed = HybridRateLimiter(connection=FakeAsyncRedis(fail=True), redis_url=None, failure_mode="closed")
+    opened = HybridRateLimiter(connection=FakeAsyncRedis(fail=True), redis_url=None, failure_mode="open")
+
+    async def run():
+        for limiter in (closed, opened):
+            limiter.hit(TIER, "tenant-a")
+            await limiter.sync()
+        return closed.hit(TIER, "tenant-a"), opened.hit(TIER, "tenant-a")
+
+    rejected, allowed = asyncio.run(run())
+    assert rejected.outcome == "unavailable"
+    assert allowed.allowed
+
+
+def test_dependency_limits_by_api_key(monkeypatch):
+    """Test that the dependency answers 429 with Retry-After per issued API key"""
+    monkeypatch.setattr(rate_limiting, "RATE_LIMIT_API_KEYS", frozenset(
+        rate_limiting._key_digest(key) for key in ("key-1", "key-2")
+    ))
+    rate_limiting.rate_limiter = HybridRateLimiter(redis_url=None)
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(RateLimit(RateLimitTier("test-dependency", 2, 60)))])
+    def limited():
+        return {"ok": True}
+
+    try:
+        client = TestClient(app)
+        statuses = [client.get("/limited", headers={"X-API-Key": "key-1"}).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+
+        response = client.get("/limited", headers={"X-API-Key": "key-1"})
+        assert int(response.headers["Retry-After"]) > 0
+        assert client.get("/limited", headers={"X-API-Key": "key-2"}).status_code == 200
+    finally:
+        rate_limiting.rate_limiter = None
+
+
+def test_unknown_api_keys_share_the_ip_bucket(monkeypatch):
+    """Test that a fresh unverified key per request does not get a fresh bucket"""
+    monkeypatch.setattr(rate_limiting, "RATE_LIMIT_API_KEYS", frozenset())
+    rate_limiting.rate_limiter = HybridRateLimiter(redis_url=None)
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(RateLimit(RateLimitTier("test-unverified", 2, 60)))])
+    def limited():
+        return {"ok": True}
+
+    try:
+        client = TestClient(app)
+        statuses = [
+            client.get("/limited", headers={"X-API-Key": f"random-{i}"}).status_code for i in range(3)
+        ]
+        assert statuses == [200, 200, 429]
+        assert list(rate_limiting.rate_limiter._buckets) == [("test-unverified", "ip:testclient")]
+    finally:
+        rate_limiting.rate_limiter = None
+
+
+def test_bucket_count_is_capped():
+    """Test that the least recently used bucket is evicted once max_buckets is reached"""
+    limiter = HybridRateLimiter(redis_url=None, max_buckets=2)
+
+    limiter.hit(TIER, "a")
+    limiter.hit(TIER, "b")
+    limiter.hit(TIER, "a")
+    limiter.hit(TIER, "c")
+
+    assert list(limiter._buckets) == [(TIER.name, "a"), (TIER.name, "c")]
+    assert limiter._counters["evicted"] == 1
@@ -0,0 +1,87 @@
+import sys
+import os
+from datetime import datetime, timezone
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.crud import CRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.models import PaymentCreate, PaymentStatus, InvoiceStatus
+
+
+class RecordPaymentRPC:
+    """Stand-in for the record_payment RPC with transaction_id idempotency."""
+
+    def __init__(self, total_amount):
+        self.invoice = {
+            "id": "inv-1", "invoice_number": "INV-000001", "client_id": "client-1",
+            "issue_date": "2025-01-01T00:00:00+00:00", "due_date": "2025-02-01T00:00:00+00:00",
+            "status": "sent", "subtotal": total_amount, "tax_amount": 0,
+            "total_amount": total_amount, "items": [], "amount_paid": 0
+        }
+        self.payments = {}
+        self.calls = 0
+
+    def rpc(self, name, params):
+        assert name == "record_payment"
+        self.calls += 1
+        created = params["p_transaction_id"] not in self.payments
+        if created:
+            self.payments[params["p_transaction_id"]] = {
+                "id": f"pay-{len(self.payments) + 1}", "invoice_id": params["p_invoice_id"],
+                "amount": params["p_amount"], "payment_date": params["p_payment_date"],
+                "payment_method": params["p_payment_method"], "status": params["p_status"],
+                "transaction_id": params["p_transaction_id"]
+            }
+            if params["p_status"] == "completed":
+                self.invoice["amount_paid"] += params["p_amount"]
+                if self.invoice["amount_paid"] >= self.invoice["total_amount"]:
+                    self.invoice["status"] = "paid"
+        data = {
+            "payment": self.payments[params["p_transaction_id"]],
+            "invoice": dict(self.invoice),
+            "created": created
+        }
+
+        class _Query:
+            def execute(self):
+                return type("Response", (), {"data": data})()
+
+        return _Query()
+
+
+def make_payment(transaction_id, amount):
+    return PaymentCreate(
+        invoice_id="inv-1", amount=amount, payment_date=datetime.now(timezone.utc),
+        payment_method="card", status=PaymentStatus.COMPLETED, transaction_id=transaction_id
+    )
+
+
+def test_record_payment_is_one_round_trip_and_idempotent():
+    """Test that payments are recorded via the RPC and retries are no-ops"""
+    rpc = RecordPaymentRPC(total_amount=100.0)
+    crud = CRUDService(client=rpc, cache=EntityCache(local=LRUCache(), redis_url=None))
+
+    first = crud.record_payment(make_payment("tx-1", 40.0))
+    assert first.created is True
+    assert first.invoice.amount_due == 60.0
+    assert rpc.calls == 1
+
+    retry = crud.record_payment(make_payment("tx-1", 40.0))
+    assert retry.created is False
+    assert retry.payment.id == first.payment.id
+    assert retry.invoice.amount_paid == 40.0
+
+    final = crud.create_payment(make_payment("tx-2", 60.0))
+    assert final.id == "pay-2"
+    assert crud.get_invoice("inv-1").status == InvoiceStatus.PAID
+    assert rpc.calls == 3
+
+
+def test_record_payment_runs_on_the_service_client():
+    """Test that the RPC goes to the service role client, not the anon client"""
+    rpc = RecordPaymentRPC(total_amount=100.0)
+    anon = RecordPaymentRPC(total_amount=100.0)
+    crud = CRUDService(client=anon, service_client=rpc, cache=EntityCache(local=LRUCache(), redis_url=None))
+
+    assert crud.record_payment(make_payment("tx-1", 40.0)).created is True
+    assert (rpc.calls, anon.calls) == (1, 0)
@@ -0,0 +1,47 @@
+import sys
+import os
+from datetime import datetime, timezone, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from src.database.crud import CRUDService
+from src.database.cache import EntityCache, LRUCache
+from src.database.models import ClientCreate, InvoiceCreate, InvoiceItem, SearchKind
+from tests.fake_supabase import FakeSupabase
+
+
+def make_crud():
+    return CRUDService(client=FakeSupabase(), cache=EntityCache(local=LRUCache(), redis_url=None))
+
+
+def make_invoice(client_id, description):
+    now = datetime.now(timezone.utc)
+    return InvoiceCreate(
+        client_id=client_id, issue_date=now, due_date=now + timedelta(days=30),
+        items=[InvoiceItem(description=description, quantity=1, unit_price=10, total=10)]
+    )
+
+
+def test_search_ranks_and_paginates_clients_and_invoices():
+    """Test that search returns ranked, paginated matches across both kinds"""
+    crud = make_crud()
+    acme = crud.create_client(ClientCreate(name="Acme", email="billing@acme.com", tax_id="DE123"))
+    crud.create_invoice(make_invoice(acme.id, "Acme support retainer"))
+    crud.create_invoice(make_invoice(acme.id, "Hosting"))
+
+    page = crud.search("acme", limit=2)
+    assert page.total == 3
+    assert page.pages == 2
+    assert page.items[0].kind == SearchKind.CLIENT
+    assert page.items[0].title == "Acme"
+
+    invoices = crud.search("retainer", kind=SearchKind.INVOICE)
+    assert [result.title for result in invoices.items] == [f"INV-{datetime.now(timezone.utc).year}-000001"]
+    assert invoices.items[0].client_id == acme.id
+
+
+def test_search_rejects_short_queries():
+    """Test that one-character queries are refused before reaching the database"""
+    with pytest.raises(ValueError):
+        make_crud().search(" a ")
@@ -0,0 +1,157 @@
+import sys
+import os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+
+from src.database import storage
+from src.database.storage import StorageService
+
+
+class FakeBucket:
+    """Bucket stub recording multi-path remove calls"""
+    
+    def __init__(self, existing, fail_first=0):
+        self.existing = set(existing)
+        self.fail_first = fail_first
+        self.calls = []
+        self.uploaded = {}
+    
+    def _maybe_fail(self):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise RuntimeError("connection reset")
+    
+    def remove(self, paths):
+        self.calls.append(list(paths))
+        self._maybe_fail()
+        removed = [path for path in paths if path in self.existing]
+        self.existing -= set(removed)
+        return [{"name": path} for path in removed]
+    
+    def upload(self, path, file, file_options):
+        self.calls.append(path)
+        self._maybe_fail()
+        self.uploaded[path] = file if isinstance(file, bytes) else file.read()
+        self.existing.add(path)
+        return SimpleNamespace(path=path)
+    
+    def get_public_url(self, path):
+        return f"https://storage.test/{path}"
+    
+    def download(self, path):
+        self._maybe_fail()
+        if path not in self.existing:
+            raise RuntimeError("Object not found")
+        return f"content of {path}".encode()
+    
+    def create_signed_urls(self, paths, expires_in):
+        self.calls.append(list(paths))
+        self._maybe_fail()
+        return [
+            {"path": path, "signedURL": f"https://storage.test/{path}?token=1", "error": None}
+            if path in self.existing else {"path": path, "signedURL": None, "error": "Either the object does not exist"}
+            for path in paths
+        ]
+
+
+def make_service(bucket):
+    # Direct HTTP downloads read the same objects as the bucket stub
+    session = httpx.Client(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b"streamed " + request.url.path.encode())
+    ))
+    fake_storage = SimpleNamespace(from_=lambda name: bucket, session=session)
+    return StorageService(client=SimpleNamespace(storage=fake_storage, storage_url="http://storage.test"))
+
+
+def test_delete_many_batches_paths(monkeypatch):
+    """Test that deletes are sent as multi-path requests with per-file results"""
+    monkeypatch.setattr(storage, "STORAGE_BATCH_PATH_LIMIT", 2)
+    bucket = FakeBucket(["a", "b", "c"])
+    service = make_service(bucket)
+    
+    results = service.delete_many("receipts", ["a", "b", "c", "missing"])
+    
+    assert len(bucket.calls) == 2
+    assert [r["path"] for r in results] == ["a", "b", "c", "missing"]
+    assert [r["success"] for r in results] == [True, True, True, False]
+
+
+def test_delete_many_retries_failed_requests(monkeypatch):
+    """Test that a failed request is retried and the attempts are reported"""
+    monkeypatch.setattr(storage, "STORAGE_BATCH_RETRY_DELAY", 0)
+    bucket = FakeBucket(["a"], fail_first=1)
+    service = make_service(bucket)
+    
+    results = service.delete_many("receipts", ["a"], retries=1)
+    
+    assert results[0]["success"] is True
+    assert results[0]["attempts"] == 2
+    
+    bucket.fail_first = 5
+    results = service.delete_many("receipts", ["b"], retries=1)
+    assert results[0]["success"] is False
+    assert results[0]["error"] == "connection reset"
+
+
+def test_upload_many_uploads_each_file_with_retries(monkeypatch, tmp_path):
+    """Test that local files are uploaded concurrently and transient failures retried"""
+    monkeypatch.setattr(storage, "STORAGE_BATCH_RETRY_DELAY", 0)
+    bucket = FakeBucket([], fail_first=1)
+    service = make_service(bucket)
+    files = []
+    for name in ("a.pdf", "b.pdf"):
+        (tmp_path / name).write_bytes(name.encode())
+        files.append((str(tmp_path / name), f"2024/{name}"))
+    
+    results = service.upload_many("invoices", files + [(str(tmp_path / "missing.pdf"), "2024/missing.pdf")], concurrency=1)
+    
+    assert [r["success"] for r in results] == [True, True, False]
+    assert results[0]["attempts"] == 2
+    assert results[0]["result"]["public_url"] == "https://storage.test/2024/a.pdf"
+    assert results[2]["error"] == "Operation failed"
+    assert bucket.uploaded == {"2024/a.pdf": b"a.pdf", "2024/b.pdf": b"b.pdf"}
+
+
+def test_download_many_stays_inside_local_dir(tmp_path):
+    """Test that downloads land under local_dir and escaping paths are refused"""
+    service = make_service(FakeBucket(["a.pdf"]))
+    local_dir = tmp_path / "downloads"
+    escaping = ["../outside.pdf", "nested/../../outside.pdf", str(tmp_path / "absolute.pdf")]
+    
+    results = service.download_many("invoices", ["2024/a.pdf", *escaping], local_dir=str(local_dir))
+    
+    assert results[0]["success"] is True
+    assert results[0]["result"] == os.path.join(os.path.realpath(local_dir), "2024", "a.pdf")
+    assert (local_dir / "2024" / "a.pdf").read_bytes().startswith(b"streamed ")
+    assert [r["error"] for r in results[1:]] == ["Path escapes local_dir"] * 3
+    assert [r["attempts"] for r in results[1:]] == [0, 0, 0]
+    assert not (tmp_path / "outside.pdf").exists() and not (tmp_path / "absolute.pdf").exists()
+
+
+def test_download_many_returns_contents_without_local_dir(monkeypatch):
+    """Test that contents are returned in input order and missing files fail after retries"""
+    monkeypatch.setattr(storage, "STORAGE_BATCH_RETRY_DELAY", 0)
+    service = make_service(FakeBucket(["a.pdf", "b.pdf"]))
+    
+    results = service.download_many("invoices", ["b.pdf", "a.pdf", "missing.pdf"], retries=1)
+    
+    assert [r["result"] for r in results[:2]] == [b"content of b.pdf", b"content of a.pdf"]
+    assert results[2]["success"] is False
+    assert results[2]["attempts"] == 2
+
+
+def test_sign_many_batches_paths(monkeypatch):
+    """Test that signed URLs are requested per chunk and matched back to each path"""
+    monkeypatch.setattr(storage, "STORAGE_BATCH_PATH_LIMIT", 2)
+    monkeypatch.setattr(storage, "STORAGE_BATCH_RETRY_DELAY", 0)
+    bucket = FakeBucket(["a", "b", "c"], fail_first=1)
+    service = make_service(bucket)
+    
+    results = service.sign_many("invoices", ["a", "b", "c", "missing"], expires_in=60, concurrency=1, retries=1)
+    
+    assert len(bucket.calls) == 3
+    assert [r["result"] for r in results[:3]] == [f"https://storage.test/{path}?token=1" for path in "abc"]
+    assert results[0]["attempts"] == 2 and results[2]["attempts"] == 1
+    assert results[3]["error"] == "Either the object does not exist"
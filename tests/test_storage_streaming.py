@@ -0,0 +1,138 @@
+import sys
+import os
+import io
+import asyncio
+from types import SimpleNamespace
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from storage3 import SyncStorageClient
+
+from src.database import storage
+from src.database.storage import StorageService
+
+STORAGE_URL = "http://storage.test/storage/v1"
+
+
+class FakeStorageServer:
+    """Storage API with object uploads, downloads and TUS resumable uploads."""
+
+    def __init__(self, partial_failures=0, partial_bytes=0):
+        self.objects = {}
+        self.uploads = {}
+        self.patches = []
+        self.partial_failures = partial_failures
+        self.partial_bytes = partial_bytes
+
+    def __call__(self, request):
+        path = request.url.path.removeprefix("/storage/v1")
+        if path == "/upload/resumable" and request.method == "POST":
+            upload_id = f"upload-{len(self.uploads)}"
+            self.uploads[upload_id] = bytearray()
+            return httpx.Response(201, headers={"Location": f"{STORAGE_URL}/upload/resumable/{upload_id}"})
+
+        if path.startswith("/upload/resumable/"):
+            data = self.uploads[path.rsplit("/", 1)[-1]]
+            if request.method == "HEAD":
+                return httpx.Response(200, headers={"Upload-Offset": str(len(data))})
+            offset = int(request.headers["Upload-Offset"])
+            assert offset == len(data)
+            self.patches.append((offset, len(request.content)))
+            if self.partial_failures:
+                # The server keeps part of the chunk before the connection drops
+                self.partial_failures -= 1
+                data.extend(request.content[:self.partial_bytes])
+                return httpx.Response(500)
+            data.extend(request.content)
+            return httpx.Response(204, headers={"Upload-Offset": str(len(data))})
+
+        if path.startswith("/object/") and request.method == "POST":
+            self.objects[path.removeprefix("/object/")] = request.read()
+            return httpx.Response(200, json={"Key": path})
+
+        if path.startswith("/object/") and request.method == "GET":
+            return httpx.Response(200, content=self.objects[path.removeprefix("/object/")])
+
+        return httpx.Response(404, json={"message": "not found", "error": "not_found", "statusCode": 404})
+
+
+class MockedStorageClient(SyncStorageClient):
+    """storage3 client whose HTTP session talks to a mock transport."""
+
+    def __init__(self, transport):
+        self.transport = transport
+        super().__init__(STORAGE_URL, {"Authorization": "Bearer test"})
+
+    def _create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return httpx.Client(base_url=base_url, headers=headers, transport=self.transport)
+
+
+def make_service(server):
+    client = MockedStorageClient(httpx.MockTransport(server))
+    return StorageService(client=SimpleNamespace(storage=client, storage_url=STORAGE_URL))
+
+
+def test_resumable_upload_sends_fixed_size_chunks():
+    """Test that a TUS upload is sent in chunk_size pieces at increasing offsets"""
+    server = FakeStorageServer()
+    data = bytes(range(25))
+
+    result = make_service(server).upload_resumable(
+        "exports", io.BytesIO(data + b"trailing"), "big.bin", size=25, chunk_size=10
+    )
+
+    assert result["size"] == 25
+    assert server.patches == [(0, 10), (10, 10), (20, 5)]
+    assert bytes(server.uploads["upload-0"]) == data
+
+
+def test_resumable_upload_resumes_from_server_offset(monkeypatch):
+    """Test that a failed chunk resumes from the offset the server reports"""
+    monkeypatch.setattr(storage.time, "sleep", lambda seconds: None)
+    server = FakeStorageServer(partial_failures=1, partial_bytes=4)
+    data = bytes(range(20))
+
+    result = make_service(server).upload_resumable("exports", io.BytesIO(data), "big.bin", size=20, chunk_size=10)
+
+    assert result is not None
+    assert server.patches == [(0, 10), (4, 6), (10, 10)]
+    assert bytes(server.uploads["upload-0"]) == data
+
+
+def test_upload_fileobj_applies_size_to_open_files(tmp_path):
+    """Test that only ``size`` bytes of a real file are uploaded and short files are rejected"""
+    server = FakeStorageServer()
+    service = make_service(server)
+    path = tmp_path / "receipt.bin"
+    path.write_bytes(b"\x01" * 5 + b"\x02" * 5)
+
+    with open(path, "rb") as file:
+        assert service.upload_fileobj("receipts", file, "head.bin", size=5)["size"] == 5
+    body = server.objects["receipt-images/head.bin"]
+    assert b"\x01" * 5 in body and b"\x02" not in body
+
+    with open(path, "rb") as file:
+        assert service.upload_fileobj("receipts", file, "whole.bin")["size"] == 10
+    assert b"\x01" * 5 + b"\x02" * 5 in server.objects["receipt-images/whole.bin"]
+
+    with open(path, "rb") as file:
+        assert service.upload_fileobj("receipts", file, "long.bin", size=11) is None
+    assert "receipt-images/long.bin" not in server.objects
+
+
+def test_upload_stream_and_iter_download_round_trip(monkeypatch):
+    """Test that async chunks are uploaded and streamed back in download chunks"""
+    monkeypatch.setattr(storage, "RESUMABLE_UPLOAD_THRESHOLD", 8)
+    server = FakeStorageServer()
+    service = make_service(server)
+
+    async def chunks():
+        for part in (b"abc", b"defg", b"hij"):
+            yield part
+
+    result = asyncio.run(service.upload_stream("exports", chunks(), "stream.bin"))
+    assert result["size"] == 10
+    assert bytes(server.uploads["upload-0"]) == b"abcdefghij"
+
+    server.objects["exported-data/stream.bin"] = b"abcdefghij"
+    assert list(service.iter_download("exports", "stream.bin", chunk_size=4)) == [b"abcd", b"efgh", b"ij"]